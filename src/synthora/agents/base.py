@@ -27,6 +27,7 @@ try:
 except ImportError:
     from typing_extensions import Self
 
+from synthora.agents.speculation import ToolSpeculation
 from synthora.callbacks import get_callback_manager
 from synthora.callbacks.base_handler import (
     AsyncCallBackHandler,
@@ -82,6 +83,14 @@ class BaseAgent(ABC):
             Message history.
         callback_manager:
             Manages event callbacks.
+        speculative_tools:
+            Whether speculation-safe tools are started while the model
+            response is still streaming.
+
+    Tools and components are indexed by name and by source node so that
+    `get_tool` and `get_compents` do not need to walk the agent tree. Tools
+    added after construction must go through `add_tool`/`remove_tool` to keep
+    the index in sync; lookups that miss the index fall back to a full scan.
     """
 
     @staticmethod
@@ -133,6 +142,13 @@ class BaseAgent(ABC):
         self.tools = tools or []
         self.history: BaseMemory = FullContextMemory()
         self.callback_manager = get_callback_manager(handlers or [])
+        self.speculative_tools = self.config.speculative_tools
+        self.cache_prompt = self.config.cache_prompt
+        self._speculation = ToolSpeculation()
+        self._parent: Optional["BaseAgent"] = None
+        self._tool_index: Dict[str, Union[BaseFunction, "BaseAgent"]] = {}
+        self._component_index: Dict[Node, Any] = {}
+        self._index_components()
         self.schema = {
             "type": "function",
             "function": {
@@ -159,6 +175,10 @@ class BaseAgent(ABC):
         Returns:
             The agent instance.
         """
+        if self._parent is not None:
+            if self._parent._tool_index.get(self.name) is self:
+                del self._parent._tool_index[self.name]
+            self._parent._tool_index.setdefault(name, self)
         self.name = name
         self.schema["function"]["name"] = name  # type: ignore[index]
         return self
@@ -338,9 +358,9 @@ class BaseAgent(ABC):
                 if issubclass(module, BaseToolkit):
                     instance = module(**tool.args)
                     for t in instance.async_tools:
-                        t.source.ancestor = source
+                        t.set_ancestor(source)
                     for t in instance.sync_tools:
-                        t.source.ancestor = source
+                        t.set_ancestor(source)
                     tools.extend(instance.sync_tools)
                     tools.extend(instance.async_tools)
                 elif issubclass(module, BaseAgent):
@@ -349,7 +369,7 @@ class BaseAgent(ABC):
                     tools.append(instance)
                 elif issubclass(module, BaseFunction):
                     instance = module(**tool.args)
-                    instance.source.ancestor = source
+                    instance.set_ancestor(source)
                     tools.append(instance)
             except ImportError:
                 raise ImportError(f"Could not import {tool.target}")
@@ -360,7 +380,7 @@ class BaseAgent(ABC):
                 )
         for t in tools:
             if t.source:
-                t.source.ancestor = source
+                t.set_ancestor(source)
         return cls(
             config=config,
             model=model,  # type: ignore[arg-type]
@@ -383,11 +403,114 @@ class BaseAgent(ABC):
             ValueError:
                 If the tool is not found.
         """
+        if (tool := self._tool_index.get(name)) is not None:
+            return tool
         for tool in self.tools:
             if tool.name == name:
+                self._tool_index[name] = tool
                 return tool
         raise ValueError(f"Tool {name} not found in agent {self.name}")
 
+    def _register_component(self, source: Node, component: Any) -> None:
+        """Register a component under its source node.
+
+        The entry is propagated to the parent agents so that the root agent
+        can resolve the components of every nested sub-agent.
+
+        Args:
+            source:
+                The source node of the component.
+            component:
+                The component to register.
+        """
+        self._component_index[source] = component
+        if self._parent is not None:
+            self._parent._register_component(source, component)
+
+    def _unregister_component(self, source: Node) -> None:
+        """Remove a component from the index of this agent and its parents.
+
+        Args:
+            source:
+                The source node of the component.
+        """
+        self._component_index.pop(source, None)
+        if self._parent is not None:
+            self._parent._unregister_component(source)
+
+    def _index_components(self) -> None:
+        """Index the agent, its models and its tools."""
+        self._component_index.clear()
+        self._tool_index.clear()
+        self._register_component(self.source, self)
+        for model in (
+            self.model if isinstance(self.model, list) else [self.model]
+        ):
+            self._register_component(model.source, model)
+        for tool in self.tools:
+            self._index_tool(tool)
+
+    def _index_tool(self, tool: Union[BaseFunction, "BaseAgent"]) -> None:
+        """Add a tool, and the components of a sub-agent, to the index.
+
+        Args:
+            tool:
+                The tool to index.
+        """
+        self._tool_index.setdefault(tool.name, tool)
+        self._register_component(tool.source, tool)
+        if isinstance(tool, BaseAgent):
+            tool._parent = self
+            for source, component in list(tool._component_index.items()):
+                self._register_component(source, component)
+
+    def _unindex_tool(self, tool: Union[BaseFunction, "BaseAgent"]) -> None:
+        """Remove a tool, and the components of a sub-agent, from the index.
+
+        Args:
+            tool:
+                The tool to remove from the index.
+        """
+        if self._tool_index.get(tool.name) is tool:
+            del self._tool_index[tool.name]
+            for other in self.tools:
+                if other.name == tool.name:
+                    self._tool_index[tool.name] = other
+                    break
+        self._unregister_component(tool.source)
+        if isinstance(tool, BaseAgent):
+            for source in list(tool._component_index):
+                self._unregister_component(source)
+            tool._parent = None
+
+    def _with_variables(
+        self, variables: Optional[BaseMessage]
+    ) -> List[BaseMessage]:
+        """Get the messages of a request, the history followed by the message
+        of prompt variables, if any.
+
+        Args:
+            variables:
+                The message of prompt variables, see `SPLIT_PROMPT`.
+        """
+        if variables is None:
+            return self.history
+        return [*self.history, variables]
+
+    def _sort_tool_schemas(self, model: BaseModelBackend) -> None:
+        """Sort the tool schemas of a model by name when caching the prompt,
+        so that they are sent in the same order whatever the order the tools
+        were added in.
+
+        Args:
+            model:
+                The model whose tool schemas to sort.
+        """
+        if self.cache_prompt and model.config.get("tools"):
+            model.config["tools"].sort(
+                key=lambda schema: schema["function"]["name"]
+            )
+
     def add_handler(
         self,
         handler: Union[BaseCallBackHandler, AsyncCallBackHandler],
@@ -409,6 +532,26 @@ class BaseAgent(ABC):
         for tool in self.tools:
             tool.add_handler(handler, recursive=recursive)
 
+    def set_ancestor(self, ancestor: Optional[Node]) -> None:
+        """Move the agent, with its models and tools, under another node of
+        the execution tree.
+
+        Nodes are immutable, so the agent and everything below it get new
+        source nodes.
+
+        Args:
+            ancestor:
+                The new ancestor of the agent.
+        """
+        self.source = self.source.with_ancestor(ancestor)
+        for model in (
+            self.model if isinstance(self.model, list) else [self.model]
+        ):
+            model.set_ancestor(self.source)
+        for tool in self.tools:
+            tool.set_ancestor(self.source)
+        self._index_components()
+
     def call_tool(self, name: str, arguments: str) -> Result[Any, Exception]:
         """Execute a tool by name with the given arguments.
 
@@ -462,6 +605,46 @@ class BaseAgent(ABC):
         else:
             return tool.run(**tool_args)
 
+    def _run_tool_call(self, tool_call: Any) -> Result[Any, Exception]:
+        """Execute a tool call of the final model response.
+
+        Uses the speculative result when the call was already started while
+        the response was streaming.
+
+        Args:
+            tool_call:
+                The tool call to execute.
+
+        Returns:
+            The result of the tool call.
+        """
+        if (future := self._speculation.pop(tool_call)) is not None:
+            return future.result()  # type: ignore[no-any-return]
+        return self.call_tool(
+            tool_call.function.name, tool_call.function.arguments
+        )
+
+    async def _async_run_tool_call(
+        self, tool_call: Any
+    ) -> Result[Any, Exception]:
+        """Execute a tool call of the final model response asynchronously.
+
+        Uses the speculative result when the call was already started while
+        the response was streaming.
+
+        Args:
+            tool_call:
+                The tool call to execute.
+
+        Returns:
+            The result of the tool call.
+        """
+        if (future := self._speculation.pop(tool_call)) is not None:
+            return await future  # type: ignore[no-any-return, misc]
+        return await self.async_call_tool(
+            tool_call.function.name, tool_call.function.arguments
+        )
+
     def on_start(
         self,
         message: Union[List[BaseMessage], BaseMessage],
@@ -661,8 +844,29 @@ class BaseAgent(ABC):
     ) -> Optional[Union[Self, BaseFunction, BaseModelBackend, "BaseAgent"]]:
         """Retrieve component by source node.
 
-        Recursively searches through the agent's components (self, models,
-        tools) to find the component matching the given source node.
+        Looks the source node up in the component index first and falls back
+        to recursively searching the agent's components (self, models, tools)
+        for an equal node. Hits found by the fallback are cached.
+
+        Args:
+            source:
+                The source node to search for.
+
+        Returns:
+            The matching component if found, None otherwise.
+        """
+        component = self._component_index.get(source)
+        if component is not None:
+            return component  # type: ignore[no-any-return]
+        component = self._search_compents(source)
+        if component is not None:
+            self._component_index[source] = component
+        return component
+
+    def _search_compents(
+        self, source: Node
+    ) -> Optional[Union[Self, BaseFunction, BaseModelBackend, "BaseAgent"]]:
+        """Recursively search the agent's components for a source node.
 
         Args:
             source:
@@ -682,7 +886,7 @@ class BaseAgent(ABC):
             if tool.source == source:
                 return tool
             if isinstance(tool, BaseAgent):
-                comp = tool.get_compents(source)
+                comp = tool._search_compents(source)
                 if comp:
                     return comp
         return None
@@ -50,8 +50,8 @@ from synthora.types.enums import (
 from synthora.types.node import Node
 from synthora.utils.macros import (
     ASYNC_GET_FINAL_MESSAGE,
-    FORMAT_PROMPT,
     GET_FINAL_MESSAGE,
+    SPLIT_PROMPT,
     STR_TO_USERMESSAGE,
     UPDATE_SYSTEM,
 )
@@ -163,6 +163,7 @@ class ReactAgent(BaseAgent):
             self.model[0] if isinstance(self.model, list) else self.model
         )
         self.tools.append(finish)
+        self._index_tool(finish)
         self.model.config["tools"] = [tool.schema for tool in tools] + [
             finish.schema
         ]
@@ -172,6 +173,7 @@ class ReactAgent(BaseAgent):
             else self.prompt
         )
         self.prompt: BasePrompt = BasePrompt(self.prompt)
+        self._sort_tool_schemas(self.model)
 
     def step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
@@ -194,7 +196,8 @@ class ReactAgent(BaseAgent):
                 - The model's response with potential tool calls
                 - An Exception if the step failed
         """
-        UPDATE_SYSTEM(prompt=FORMAT_PROMPT())
+        prompt, variables = SPLIT_PROMPT()
+        UPDATE_SYSTEM(prompt=prompt)
         for _args in self.prompt.args:
             if _args in kwargs:
                 del kwargs[_args]
@@ -203,7 +206,10 @@ class ReactAgent(BaseAgent):
             self.history.append(message)
 
         for _ in range(2):
-            response = self.model.run(self.history, *args, **kwargs)
+            response = self.model.run(
+                self._with_variables(variables), *args, **kwargs
+            )
+            response = self._speculation.watch(self, response)
             response = GET_FINAL_MESSAGE()
             self.history.append(response)
             if response.tool_calls:
@@ -251,7 +257,7 @@ class ReactAgent(BaseAgent):
                 func = tool_call.function
                 try:
                     tool = self.get_tool(func.name)
-                    resp = self.call_tool(func.name, func.arguments)
+                    resp = self._run_tool_call(tool_call)
                     resp_value = resp.unwrap()
                 except Exception as e:
                     resp_value = f"Error: {str(e)}"
@@ -267,12 +273,15 @@ class ReactAgent(BaseAgent):
                         role=MessageRole.TOOL_RESPONSE,
                         content=str(resp_value),
                         source=tool.source,
+                        validate=False,
                     )
                 )
                 if tool.name == "finish":
+                    self._speculation.discard()
                     data.content = resp_value
                     self.on_end(data)
                     return Ok(resp_value)
+            self._speculation.discard()
 
     async def async_step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
@@ -294,7 +303,8 @@ class ReactAgent(BaseAgent):
                 - The step execution result
                 - An Exception if the step failed
         """
-        UPDATE_SYSTEM(prompt=FORMAT_PROMPT())
+        prompt, variables = SPLIT_PROMPT()
+        UPDATE_SYSTEM(prompt=prompt)
         for _args in self.prompt.args:
             del kwargs[_args]
         message = cast(BaseMessage, STR_TO_USERMESSAGE())
@@ -303,8 +313,9 @@ class ReactAgent(BaseAgent):
 
         for _ in range(2):
             response = await self.model.async_run(
-                self.history, *args, **kwargs
+                self._with_variables(variables), *args, **kwargs
             )
+            response = self._speculation.async_watch(self, response)
             response = await ASYNC_GET_FINAL_MESSAGE()
             await self.history.async_append(response)
             if response.tool_calls:
@@ -349,9 +360,7 @@ class ReactAgent(BaseAgent):
                 func = tool_call.function
                 try:
                     tool = self.get_tool(func.name)
-                    resp = await self.async_call_tool(
-                        func.name, func.arguments
-                    )
+                    resp = await self._async_run_tool_call(tool_call)
                     resp_value = resp.unwrap()
                 except Exception as e:
                     resp_value = f"Error: {str(e)}"
@@ -364,12 +373,15 @@ class ReactAgent(BaseAgent):
                         role=MessageRole.TOOL_RESPONSE,
                         content=str(resp_value),
                         source=tool.source,
+                        validate=False,
                     )
                 )
                 if tool.name == "finish":
+                    self._speculation.discard()
                     data.content = resp_value
                     await self.async_on_end(data, *args, **kwargs)
                     return Ok(resp_value)
+            self._speculation.discard()
 
     def add_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
         """Add a tool to the agent's toolset.
@@ -382,7 +394,9 @@ class ReactAgent(BaseAgent):
             The agent instance.
         """
         self.tools.append(tool)
+        self._index_tool(tool)
         self.model.config["tools"].append(tool.schema)
+        self._sort_tool_schemas(self.model)
         return self
 
     def remove_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
@@ -396,6 +410,7 @@ class ReactAgent(BaseAgent):
             The agent instance.
         """
         self.tools.remove(tool)
+        self._unindex_tool(tool)
         self.model.config["tools"].remove(tool.schema)
         return self
 
@@ -406,4 +421,5 @@ class ReactAgent(BaseAgent):
             The agent instance.
         """
         self.history.clear()
+        self._speculation.discard()
         return self
@@ -0,0 +1,235 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from synthora.messages.base import BaseMessage
+from synthora.toolkits.base import AsyncFunction, BaseFunction
+
+
+if TYPE_CHECKING:
+    from synthora.agents.base import BaseAgent
+
+
+class ToolSpeculation:
+    r"""Start speculation-safe tool calls while a response is streaming.
+
+    A tool call is started as soon as its JSON arguments are complete and
+    parse, and the tool is a `BaseFunction` marked as `speculative`. The run
+    loop then picks the result up with `pop` instead of calling the tool
+    again. Speculative results are discarded if the stream does not finish
+    or the final tool call differs from the one that was started; a tool that
+    is already running cannot be interrupted, its result is just dropped.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        r"""Get the executor shared by all speculative sync tool calls.
+
+        Returns:
+            ThreadPoolExecutor: The shared executor.
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        thread_name_prefix="synthora-speculation"
+                    )
+        return cls._executor
+
+    def __init__(self) -> None:
+        self._pending: Dict[
+            str, Tuple[str, str, Union[Future[Any], asyncio.Future[Any]]]
+        ] = {}
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ToolSpeculation":
+        # In-flight futures belong to the agent being copied.
+        return ToolSpeculation()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _ready_calls(
+        self, agent: "BaseAgent", message: BaseMessage
+    ) -> Iterator[Tuple[str, str, str, BaseFunction]]:
+        r"""Get the tool calls of a partial message that can be started.
+
+        Args:
+            agent: The agent owning the tools.
+            message: The accumulated message.
+
+        Returns:
+            Iterator[Tuple[str, str, str, BaseFunction]]: The id, name,
+                arguments and tool of each call that is ready to start.
+        """
+        for tool_call in message.tool_calls or []:
+            id = getattr(tool_call, "id", None)
+            func = getattr(tool_call, "function", None)
+            if not id or func is None or id in self._pending:
+                continue
+            try:
+                arguments = json.loads(func.arguments)
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(arguments, dict):
+                continue
+            try:
+                tool = agent.get_tool(func.name)
+            except ValueError:
+                continue
+            if isinstance(tool, BaseFunction) and tool.speculative:
+                yield id, func.name, func.arguments, tool
+
+    def watch(
+        self,
+        agent: "BaseAgent",
+        response: Union[BaseMessage, Iterator[BaseMessage]],
+    ) -> Union[BaseMessage, Iterator[BaseMessage]]:
+        r"""Wrap a streamed response to start tool calls as they complete.
+
+        Args:
+            agent: The agent owning the tools.
+            response: The model response.
+
+        Returns:
+            Union[BaseMessage, Iterator[BaseMessage]]: The response,
+                yielding the same messages.
+        """
+        if not agent.speculative_tools or isinstance(response, BaseMessage):
+            return response
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            message, finished = None, False
+            try:
+                for message in response:
+                    for id, name, arguments, _ in self._ready_calls(
+                        agent, message
+                    ):
+                        future = self.get_executor().submit(
+                            copy_context().run,
+                            agent.call_tool,
+                            name,
+                            arguments,
+                        )
+                        self._pending[id] = (name, arguments, future)
+                    yield message
+                finished = message is not None and message.is_complete
+            finally:
+                if not finished:
+                    self.discard()
+
+        return stream()
+
+    def async_watch(
+        self,
+        agent: "BaseAgent",
+        response: Union[BaseMessage, AsyncIterator[BaseMessage]],
+    ) -> Union[BaseMessage, AsyncIterator[BaseMessage]]:
+        r"""Wrap an async streamed response to start tool calls as they
+        complete.
+
+        Async tools run as tasks on the running loop, sync tools run in the
+        shared executor.
+
+        Args:
+            agent: The agent owning the tools.
+            response: The model response.
+
+        Returns:
+            Union[BaseMessage, AsyncIterator[BaseMessage]]: The response,
+                yielding the same messages.
+        """
+        if not agent.speculative_tools or isinstance(response, BaseMessage):
+            return response
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            message, finished = None, False
+            loop = asyncio.get_running_loop()
+            try:
+                async for message in response:
+                    for id, name, arguments, tool in self._ready_calls(
+                        agent, message
+                    ):
+                        future: asyncio.Future[Any]
+                        if isinstance(tool, AsyncFunction):
+                            future = asyncio.ensure_future(
+                                agent.async_call_tool(name, arguments)
+                            )
+                        else:
+                            future = loop.run_in_executor(
+                                self.get_executor(),
+                                copy_context().run,
+                                agent.call_tool,
+                                name,
+                                arguments,
+                            )
+                        self._pending[id] = (name, arguments, future)
+                    yield message
+                finished = message is not None and message.is_complete
+            finally:
+                if not finished:
+                    self.discard()
+
+        return stream()
+
+    def pop(
+        self, tool_call: Any
+    ) -> Optional[Union[Future[Any], asyncio.Future[Any]]]:
+        r"""Take the speculative result of a final tool call.
+
+        Args:
+            tool_call: The tool call of the final message.
+
+        Returns:
+            Optional[Union[Future[Any], asyncio.Future[Any]]]: The future of
+                the speculative call, or None if the call was not started or
+                its name or arguments changed.
+        """
+        entry = self._pending.pop(getattr(tool_call, "id", None) or "", None)
+        if entry is None:
+            return None
+        name, arguments, future = entry
+        func = tool_call.function
+        if name != func.name or arguments != func.arguments:
+            future.cancel()
+            return None
+        return future
+
+    def discard(self) -> None:
+        r"""Discard all speculative results that were not taken."""
+        for _, _, future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
@@ -15,8 +15,20 @@
 # limitations under the License.
 #
 
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Tuple, Type, Union, cast
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union, cast
 
 from synthora.utils.default import DEFAULT_CHAT_MODEL_BACKEND
 
@@ -58,14 +70,12 @@ from synthora.types.enums import (
 )
 from synthora.types.node import Node
 from synthora.utils.macros import (
-    FORMAT_PROMPT,
+    ASYNC_GET_FINAL_MESSAGE,
     GET_FINAL_MESSAGE,
+    SPLIT_PROMPT,
     STR_TO_USERMESSAGE,
     UPDATE_SYSTEM,
 )
-from synthora.workflows.base_task import BaseTask
-from synthora.workflows.scheduler.base import BaseScheduler
-from synthora.workflows.scheduler.thread_pool import ThreadPoolScheduler
 
 
 class EvalFormat(BaseModel):
@@ -83,11 +93,203 @@ class EvalFormat(BaseModel):
     )
 
 
+class EvaluationCache:
+    r"""A transposition table for ToT state evaluations.
+
+    Evaluations are keyed by a canonical hash of the query and the contents
+    of the state (message roles, contents, tool calls and tool results), so
+    branches that reach equivalent histories share a single value-model call.
+    The cache survives `ToTAgent.reset` and is shared by deep copies of the
+    agent. When a path is given, it is loaded from a JSON file, and new
+    evaluations are written back by `flush`, which `ToTAgent` calls at the
+    end of each run, so that they can be reused across processes.
+
+    Args:
+        path: Optional JSON file used to persist the cache.
+        max_size: The maximum number of entries, None for no limit.
+            Least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_size: Optional[int] = None,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._dirty = False
+        if self.path is not None and self.path.is_file():
+            with open(self.path, "r") as file:
+                self._entries.update(json.load(file))
+
+    @staticmethod
+    def make_key(
+        query: Optional[str], state: List[BaseMessage], namespace: str = ""
+    ) -> str:
+        r"""Compute the canonical key of a state.
+
+        Message ids and tool call ids are ignored since they differ between
+        otherwise identical branches.
+
+        Args:
+            query: The original user query.
+            state: The state to hash.
+            namespace: Extra data that scopes the key,
+                e.g. the value model and prompt.
+
+        Returns:
+            str: The hex digest identifying the state.
+        """
+        messages = []
+        for message in state:
+            tool_calls = []
+            for tool_call in message.tool_calls or []:
+                if isinstance(tool_call, dict):
+                    function = tool_call.get("function", tool_call)
+                    tool_calls.append(
+                        [function.get("name"), function.get("arguments")]
+                    )
+                else:
+                    function = getattr(tool_call, "function", tool_call)
+                    tool_calls.append([function.name, function.arguments])
+            messages.append([message.role.value, message.content, tool_calls])
+        payload = json.dumps(
+            [namespace, query, messages],
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[EvalFormat]:
+        r"""Get the cached evaluation of a state.
+
+        Args:
+            key: The key of the state.
+
+        Returns:
+            Optional[EvalFormat]: The evaluation, None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return EvalFormat(**entry)
+
+    def put(self, key: str, evaluation: EvalFormat) -> None:
+        r"""Store the evaluation of a state.
+
+        Args:
+            key: The key of the state.
+            evaluation: The evaluation to store.
+        """
+        with self._lock:
+            self._entries[key] = evaluation.model_dump()
+            self._entries.move_to_end(key)
+            while self.max_size is not None and (
+                len(self._entries) > self.max_size
+            ):
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def flush(self) -> None:
+        r"""Write the cache to its file, if any, when it has changed."""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        r"""Write the cache to its file, if any."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = json.dumps(self._entries)
+            self._dirty = False
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as file:
+            file.write(data)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        r"""Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+        if self.path is not None:
+            self.save()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "EvaluationCache":
+        return self
+
+
 class ToTAgent(BaseAgent):
     r"""A ToT (Tree of Thoughts) agent that
     can solve problems incrementally.
+
+    Proposals and evaluations of every ToT agent run on a single, lazily
+    created thread pool shared by the whole process, and all branches share
+    the model backends (and thus their HTTP clients) instead of copying them.
+
+    The search can be depth-first ("dfs"), breadth-first ("bfs"), best-first
+    over every frontier state ("best_first") or a beam search keeping the
+    `beam_width` best states of each depth ("beam"). States scoring below
+    `giveup_threshold` are pruned. When a `deadline` or a `token_budget` is
+    set, the search is anytime: once the budget is spent, or the search ends
+    without reaching `finish_threshold`, the best-scoring answer found so far
+    is returned. The deadline also bounds the waits for proposals and
+    evaluations: the model calls still running when it passes are dropped,
+    and cancelled when they are asyncio tasks.
     """
 
+    SEARCH_METHODS = ("dfs", "bfs", "best_first", "beam")
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    _executor_max_workers: Optional[int] = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        r"""Get the thread pool shared by all ToT agents.
+
+        Returns:
+            ThreadPoolExecutor: The shared executor
+        """
+        if ToTAgent._executor is None:
+            with ToTAgent._executor_lock:
+                if ToTAgent._executor is None:
+                    ToTAgent._executor = ThreadPoolExecutor(
+                        ToTAgent._executor_max_workers,
+                        thread_name_prefix="synthora-tot",
+                    )
+        return ToTAgent._executor
+
+    @classmethod
+    def set_executor_max_workers(cls, max_workers: Optional[int]) -> None:
+        r"""Set the size of the thread pool shared by all ToT agents.
+
+        The current pool, if any, is shut down after its pending work is done
+        and a new one is created on the next use.
+
+        Args:
+            max_workers: The maximum number of worker threads,
+                None for the ThreadPoolExecutor default.
+        """
+        with ToTAgent._executor_lock:
+            executor = ToTAgent._executor
+            ToTAgent._executor = None
+            ToTAgent._executor_max_workers = max_workers
+        if executor is not None:
+            executor.shutdown(wait=False)
+
     @staticmethod
     def default(  # type: ignore[override]
         propose_prompt: str = ZeroShotTOTProposePrompt,
@@ -97,6 +299,11 @@ class ToTAgent(BaseAgent):
         finish_threshold: float = 0.9,
         giveup_threshold: float = 0.2,
         search_method: str = "dfs",
+        beam_width: int = 3,
+        deadline: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        eval_cache: Optional[EvaluationCache] = None,
+        sample_proposals: bool = False,
         name: str = "TOT",
         model_type: str = "gpt-4o",
         model_backend: ModelBackendType = DEFAULT_CHAT_MODEL_BACKEND,
@@ -155,6 +362,11 @@ class ToTAgent(BaseAgent):
             search_method=search_method,
             level_size=level_size,
             max_turns=max_turns,
+            beam_width=beam_width,
+            deadline=deadline,
+            token_budget=token_budget,
+            eval_cache=eval_cache,
+            sample_proposals=sample_proposals,
         )
         if handlers:
             for handler in handlers:
@@ -173,6 +385,11 @@ class ToTAgent(BaseAgent):
         finish_threshold: float = 0.9,
         giveup_threshold: float = 0.2,
         search_method: str = "dfs",
+        beam_width: int = 3,
+        deadline: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        eval_cache: Optional[EvaluationCache] = None,
+        sample_proposals: bool = False,
     ) -> None:
         r"""Initialize a ToT agent with the specified configuration.
 
@@ -192,10 +409,26 @@ class ToTAgent(BaseAgent):
                 Should be between 0 and 1.
             giveup_threshold: The threshold for giving up on a task.
                 Should be between 0 and 1.
-            search_method: The search method to use,
-                should be either "dfs" or "bfs".
+            search_method: The search method to use, should be one of
+                "dfs", "bfs", "best_first" or "beam".
+            beam_width: The number of states kept at each depth
+                by the "beam" search method.
+            deadline: The time budget of a run in seconds.
+                Enables the anytime mode.
+            token_budget: The token budget of a run, counted from the usage
+                reported by the models. Enables the anytime mode.
+            eval_cache: The cache of state evaluations. Defaults to a new
+                in-memory cache owned by the agent.
+            sample_proposals: Whether the proposals of a level are sampled
+                with a single request for `level_size` completions, paying
+                for the prompt once, instead of a request each.
         """
         tools = tools or []
+        if search_method not in self.SEARCH_METHODS:
+            raise ValueError(
+                f"Unknown search method {search_method}, should be one of "
+                f"{', '.join(self.SEARCH_METHODS)}."
+            )
         super().__init__(config, source, model, prompt, tools)
         if len(self.model) != 2:  # type: ignore[arg-type]
             raise ValueError(
@@ -215,6 +448,7 @@ class ToTAgent(BaseAgent):
             del self.value_model.config["stream"]
 
         self.propose_model.config["tools"] = [tool.schema for tool in tools]
+        self._sort_tool_schemas(self.propose_model)
 
         self.propose_prompt = BasePrompt(
             prompt.get("propose", ZeroShotTOTProposePrompt)
@@ -224,6 +458,7 @@ class ToTAgent(BaseAgent):
         )
 
         self.level_size = level_size
+        self.sample_proposals = sample_proposals
         self.max_turns = max_turns
         self.finish_threshold = finish_threshold
         self.giveup_threshold = giveup_threshold
@@ -232,8 +467,115 @@ class ToTAgent(BaseAgent):
         self.scores: List[List[float]] = []
         self.visited: List[List[bool]] = []
         self.search_method = search_method
+        self.beam_width = beam_width
+        self.deadline = deadline
+        self.token_budget = token_budget
+        self.eval_cache = (
+            eval_cache if eval_cache is not None else EvaluationCache()
+        )
+        self._pending_evaluations: Dict[str, asyncio.Future[Any]] = {}
         self.history = FullContextMemory()
         self.cursor = 0
+        self._reset_search()
+
+    @property
+    def anytime(self) -> bool:
+        r"""Whether the search returns the best answer found on a budget."""
+        return self.deadline is not None or self.token_budget is not None
+
+    def _reset_search(self) -> None:
+        r"""Reset the frontier and the budget of the search."""
+        self._queue: Deque[Tuple[BaseMemory, int]] = deque()
+        self._frontier: List[Tuple[float, int, int, int]] = []
+        self._beam: Deque[Tuple[float, int, int, int]] = deque()
+        self._counter = itertools.count()
+        self._started_at = time.monotonic()
+        self._used_tokens = 0
+        self._best: Optional[Tuple[float, BaseMessage]] = None
+        # Number of states added by the last step, which may be fewer than
+        # `level_size` when the backend returns fewer samples.
+        self._added = 0
+
+    def _add_usage(self, message: Optional[BaseMessage]) -> None:
+        r"""Count the tokens used by a model response.
+
+        Args:
+            message: The model response.
+        """
+        if message is None:
+            return
+        usage = message.metadata.get("usage")
+        self._used_tokens += getattr(usage, "total_tokens", None) or 0
+
+    def _budget_exhausted(self) -> bool:
+        r"""Check whether the time or token budget of the run is spent.
+
+        Returns:
+            bool: True if the budget is spent.
+        """
+        if self.deadline is not None and (
+            time.monotonic() - self._started_at >= self.deadline
+        ):
+            return True
+        return self.token_budget is not None and (
+            self._used_tokens >= self.token_budget
+        )
+
+    def _remaining(self) -> Optional[float]:
+        r"""Get the time left before the deadline of the run.
+
+        Returns:
+            Optional[float]: The time left in seconds, None without deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - self._started_at))
+
+    def _deadline_error(self) -> Err[Any, Exception]:
+        r"""Get the error of a step stopped by the deadline.
+
+        Returns:
+            Err[Any, Exception]: The error result.
+        """
+        reason = "The agent has exhausted its search budget."
+        return Err(TimeoutError(reason), reason)
+
+    def _record_answer(self, state: BaseMemory, score: float) -> None:
+        r"""Remember the best-scoring answer for the anytime mode.
+
+        Args:
+            state: The evaluated state.
+            score: The score of the state.
+        """
+        answer = state[-1]
+        if answer.role != MessageRole.ASSISTANT or answer.tool_calls:
+            return
+        if self._best is None or score > self._best[0]:
+            self._best = (score, answer)
+
+    def _get_stop_error(self) -> Err[str, Exception]:
+        r"""Get the error returned when the search stops without an answer.
+
+        Returns:
+            Err[str, Exception]: The error result.
+        """
+        if self._budget_exhausted():
+            reason = "The agent has exhausted its search budget."
+        else:
+            reason = "The agent has reached the maximum number of turns."
+        return Err(Exception(reason), reason)
+
+    def _anytime_answer(self) -> Optional[BaseMessage]:
+        r"""Get the answer returned when the search stops early.
+
+        Returns:
+            Optional[BaseMessage]: The best answer found in anytime mode,
+                None otherwise.
+        """
+        if not self.anytime or self._best is None:
+            return None
+        self.history.append(self._best[1])
+        return self._best[1]
 
     def step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
@@ -252,7 +594,8 @@ class ToTAgent(BaseAgent):
                 - An Exception if the execution failed
 
         """
-        UPDATE_SYSTEM(prompt=FORMAT_PROMPT(prompt=self.propose_prompt))
+        prompt, variables = SPLIT_PROMPT(prompt=self.propose_prompt)
+        UPDATE_SYSTEM(prompt=prompt)
         for _args in self.propose_prompt.args:
             if _args in kwargs:
                 del kwargs[_args]
@@ -260,65 +603,184 @@ class ToTAgent(BaseAgent):
         if message.content:
             self.history.append(message)
 
-        scheduler = ThreadPoolScheduler()
-        tasks: List[Union[BaseTask, BaseScheduler]] = [
-            BaseTask(deepcopy(self.propose_model).run).si(
-                self.history, *args, **kwargs
-            )
-            for _ in range(self.level_size)
-        ]
-        scheduler.add_task_group(tasks)
-        results = scheduler.run()
-        if not isinstance(results, list):
-            results = [results]
-        resps = [GET_FINAL_MESSAGE(x) for x in results]
+        executor = self.get_executor()
+        futures: List[Future[Any]]
+        if self.sample_proposals:
+            futures = [
+                executor.submit(
+                    copy_context().run,
+                    self.propose_model.sample,
+                    self._with_variables(variables),
+                    self.level_size,
+                    *args,
+                    **kwargs,
+                )
+            ]
+        else:
+            futures = [
+                executor.submit(
+                    copy_context().run,
+                    self._propose,
+                    self._with_variables(variables),
+                    *args,
+                    **kwargs,
+                )
+                for _ in range(self.level_size)
+            ]
+        done, not_done = wait(futures, timeout=self._remaining())
+        for future in not_done:
+            future.cancel()
+        if not done:
+            return self._deadline_error()
+        try:
+            results = [future.result() for future in futures if future in done]
+        except Exception as e:
+            return Err(e, str(e))  # type: ignore[arg-type]
+        resps = results[0] if self.sample_proposals else results
+        for resp in resps:
+            self._add_usage(resp)
         return Ok(resps)
 
-    def _get_eval_workflow(
-        self,
-        scheduler: Type[BaseScheduler],
-        user_message: Union[BaseMessage, str],
-    ) -> BaseScheduler:
-        r"""Get the evaluation workflow for the ToT agent.
+    def _propose(
+        self, messages: List[BaseMessage], *args: Any, **kwargs: Any
+    ) -> BaseMessage:
+        r"""Request a single proposal from the propose model.
+
+        Args:
+            messages: The messages to send to the propose model.
+            *args: Additional positional arguments to pass to the model.
+            **kwargs: Additional keyword arguments to pass to the model.
+
+        Returns:
+            BaseMessage: The final proposal message.
+        """
+        return GET_FINAL_MESSAGE(
+            self.propose_model.run(messages, *args, **kwargs)
+        )
+
+    def _state_key(self, state: List[BaseMessage], query: str) -> str:
+        r"""Compute the evaluation cache key of a state.
+
+        Args:
+            state: The state to evaluate.
+            query: The original user query.
+
+        Returns:
+            str: The cache key.
+        """
+        return EvaluationCache.make_key(
+            query,
+            state,
+            f"{self.value_model.model_type}:{self.value_prompt}",
+        )
+
+    def _get_value_messages(
+        self, state: BaseMemory, query: str
+    ) -> FullContextMemory:
+        r"""Build the value model request for a state.
+
+        Args:
+            state: The state to evaluate.
+            query: The original user query.
+
+        Returns:
+            FullContextMemory: The messages sent to the value model.
+        """
+        return FullContextMemory(
+            [
+                system(self.value_prompt),
+                *state,
+                user(f"The query is:{query}"),
+            ]
+        )
+
+    @staticmethod
+    def _parse_evaluation(message: BaseMessage) -> EvalFormat:
+        r"""Extract the evaluation from a value model response.
+
+        Args:
+            message: The value model response.
+
+        Returns:
+            EvalFormat: The evaluation.
+
+        Raises:
+            ValueError: If the response has no parsed evaluation.
+        """
+        if message.parsed is None:
+            raise ValueError("The value model returned no evaluation.")
+        if isinstance(message.parsed, EvalFormat):
+            return message.parsed
+        return EvalFormat.model_validate(message.parsed)
+
+    def _evaluate(self, state: BaseMemory, query: str) -> BaseMessage:
+        r"""Evaluate a single state with the value model.
+
+        Args:
+            state: The state to evaluate.
+            query: The original user query.
+
+        Returns:
+            BaseMessage: The value model response.
+        """
+        return GET_FINAL_MESSAGE(
+            self.value_model.run(self._get_value_messages(state, query))
+        )
+
+    def _get_evaluations(
+        self, user_message: Union[BaseMessage, str]
+    ) -> List[Optional[EvalFormat]]:
+        r"""Evaluate the states of the current level concurrently.
+
+        Cached evaluations are reused and equivalent states of the level are
+        only sent to the value model once.
 
         Args:
-            scheduler: The scheduler to use for the evaluation.
             user_message: The user message to evaluate.
 
         Returns:
-            BaseScheduler: The evaluation workflow.
-        """
-        tasks: List[Union[BaseTask, BaseScheduler]] = []
-        for state in self.states[self.cursor][-self.level_size :]:
-            query = (
-                user_message.content
-                if isinstance(user_message, BaseMessage)
-                else user_message
-            )
-            tasks.append(
-                BaseTask(self.value_model.run).si(
-                    FullContextMemory(
-                        [
-                            system(self.value_prompt),
-                            *state,
-                            user(f"The query is:{query}"),
-                        ]
-                    )
-                )
+            List[Optional[EvalFormat]]: The evaluation of each state,
+                None if the evaluation failed.
+        """
+        query = cast(
+            str,
+            user_message.content
+            if isinstance(user_message, BaseMessage)
+            else user_message,
+        )
+        executor = self.get_executor()
+        states = self.states[self.cursor]
+        states = states[len(states) - self._added :]
+        keys = [self._state_key(state, query) for state in states]
+        results: Dict[str, Optional[EvalFormat]] = {}
+        futures = {}
+        for key, state in zip(keys, states):
+            if key in results or key in futures:
+                continue
+            if (cached := self.eval_cache.get(key)) is not None:
+                results[key] = cached
+                continue
+            futures[key] = executor.submit(
+                copy_context().run, self._evaluate, state, query
             )
-        workflow = scheduler()
-        workflow.add_task_group(tasks)
-        return workflow
+        for key, future in futures.items():
+            try:
+                response = future.result(timeout=self._remaining())
+                self._add_usage(response)
+                evaluation = self._parse_evaluation(response)
+                self.eval_cache.put(key, evaluation)
+                results[key] = evaluation
+            except Exception:
+                results[key] = None
+        return [results[key] for key in keys]
 
     def run(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
     ) -> Result[Any, Exception]:
-        """Execute the complete ReAct agent reasoning and action loop.
+        """Execute the complete ToT search.
 
-        Processes the input message and continues executing steps until either:
-        - A final answer is reached
-        - The 'finish' tool is called
-        - An error occurs
+        New evaluations are written to the evaluation cache file at the end
+        of the run.
 
         Args:
             message (Union[str, BaseMessage]): Input message to process
@@ -327,13 +789,25 @@ class ToTAgent(BaseAgent):
 
         Returns:
             Result[Any, Exception]: A Result containing either:
-                - The final response string
+                - The final response message
                 - An Exception if the execution failed
         """
+        try:
+            return self._search(message, *args, **kwargs)
+        finally:
+            self.eval_cache.flush()
+
+    def _search(
+        self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
+    ) -> Result[Any, Exception]:
+        r"""Run the ToT search of `run`."""
         message = cast(BaseMessage, STR_TO_USERMESSAGE())
         _ori_message = deepcopy(message)
         self.on_start(message)
+        self._reset_search()
         for _turn in range(self.max_turns):
+            if self._budget_exhausted():
+                break
             if len(self.states) <= self.cursor:
                 self.states.append([])
                 self.scores.append([])
@@ -341,10 +815,13 @@ class ToTAgent(BaseAgent):
             response = self.step(message, *args, **kwargs)
             message = ""
             if response.is_err:
+                if self._budget_exhausted():
+                    break
                 self.on_error(response)
                 return response
 
             datas = response.unwrap()
+            self._added = len(datas)
 
             for data in datas:
                 self.states[self.cursor].append(
@@ -373,26 +850,23 @@ class ToTAgent(BaseAgent):
                             role=MessageRole.TOOL_RESPONSE,
                             content=str(resp_value),
                             source=tool.source,
+                            validate=False,
                         )
                     )
 
-            workflow = self._get_eval_workflow(
-                ThreadPoolScheduler, _ori_message
-            )
-            _results = workflow.run()
-            if not isinstance(_results, list):
-                _results = [_results]
-            resps = [GET_FINAL_MESSAGE(x) for x in _results]
-            for idx, resp in enumerate(resps):
+            evaluations = self._get_evaluations(_ori_message)
+            for idx, evaluation in enumerate(evaluations):
                 try:
-                    self.scores[self.cursor].append(resp.parsed.score)  # type: ignore
+                    state = self.states[self.cursor][
+                        len(self.states[self.cursor]) - len(evaluations) + idx
+                    ]
+                    self.scores[self.cursor].append(evaluation.score)  # type: ignore[union-attr]
+                    self._record_answer(state, evaluation.score)  # type: ignore[union-attr]
                     if (
                         self.scores[self.cursor][-1] >= self.finish_threshold
-                        and resp.parsed.finished  # type: ignore
+                        and evaluation.finished  # type: ignore[union-attr]
                     ):
-                        result = self.states[self.cursor][
-                            len(resps) - self.level_size + idx
-                        ][-1]
+                        result = state[-1]
                         self.history.append(result)
                         if result.role == MessageRole.ASSISTANT:
                             self.on_end(result)
@@ -402,11 +876,16 @@ class ToTAgent(BaseAgent):
             try:
                 self._set_next_state()
             except Exception as e:
+                if (answer := self._anytime_answer()) is not None:
+                    self.on_end(answer)
+                    return Ok(answer)
                 _result = Err(e, str(e))
                 self.on_error(_result)
                 return _result
-        e = Exception("The agent has reached the maximum number of turns.")
-        _result = Err(e, "The agent has reached the maximum number of turns.")
+        if (answer := self._anytime_answer()) is not None:
+            self.on_end(answer)
+            return Ok(answer)
+        _result = self._get_stop_error()
         self.on_error(_result)
         return _result
 
@@ -431,28 +910,268 @@ class ToTAgent(BaseAgent):
                 self.cursor -= 1
             raise Exception("No valid state found.")
         elif self.search_method == "bfs":
-            if not (queue := getattr(self, "_queue", None)):
-                self._queue: List[Tuple[BaseMemory, int]] = []
-                queue = self._queue
             for idx, state in enumerate(self.states[self.cursor]):
                 if (
                     not self.visited[self.cursor][idx]
                     and self.scores[self.cursor][idx] >= self.giveup_threshold
                 ):
                     self.visited[self.cursor][idx] = True
-                    queue.append((state, self.cursor))
-            if queue:
-                self.history, self.cursor = queue.pop(0)
+                    self._queue.append((state, self.cursor))
+            if self._queue:
+                self.history, self.cursor = self._queue.popleft()
                 self.cursor += 1
                 return
             raise Exception("No valid state found.")
+        elif self.search_method == "best_first":
+            for item in self._new_frontier_items():
+                heapq.heappush(self._frontier, item)
+            if self._frontier:
+                self._visit(heapq.heappop(self._frontier))
+                return
+            raise Exception("No valid state found.")
+        elif self.search_method == "beam":
+            for item in self._new_frontier_items():
+                heapq.heappush(self._frontier, item)
+            if not self._beam:
+                # The previous depth is fully expanded, keep the best
+                # children as the beam of the next depth.
+                self._beam.extend(
+                    heapq.heappop(self._frontier)
+                    for _ in range(min(self.beam_width, len(self._frontier)))
+                )
+                self._frontier.clear()
+            if self._beam:
+                self._visit(self._beam.popleft())
+                return
+            raise Exception("No valid state found.")
+
+    def _new_frontier_items(self) -> List[Tuple[float, int, int, int]]:
+        r"""Get the heap items of the states added by the last step.
+
+        States scoring below the give-up threshold are pruned.
+
+        Returns:
+            List[Tuple[float, int, int, int]]: Items ordered by descending
+                score, then insertion order, holding the depth and index of
+                each state.
+        """
+        if self.cursor >= len(self.scores):
+            return []
+        scores = self.scores[self.cursor]
+        return [
+            (-scores[idx], next(self._counter), self.cursor, idx)
+            for idx in range(max(0, len(scores) - self._added), len(scores))
+            if scores[idx] >= self.giveup_threshold
+        ]
+
+    def _visit(self, item: Tuple[float, int, int, int]) -> None:
+        r"""Continue the search from a frontier state.
+
+        Args:
+            item: The heap item of the state.
+        """
+        _, _, depth, idx = item
+        self.visited[depth][idx] = True
+        self.history = self.states[depth][idx]
+        self.cursor = depth + 1
 
     async def async_step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
+    ) -> Result[List[Tuple[BaseMemory, Optional[EvalFormat]]], Exception]:
+        r"""Execute a single step of the ToT agent asynchronously.
+
+        All branches of the level are expanded concurrently. Each branch
+        requests a proposal, runs its tool calls concurrently and is evaluated
+        as soon as it is ready, without waiting for the other branches.
+
+        Args:
+            message: The input message to process.
+            *args: Additional positional arguments to pass to the model.
+            **kwargs: Additional keyword arguments to pass to the model.
+
+        Returns:
+            Result: A Result containing either:
+                - The new states with their evaluations,
+                  None if the evaluation failed
+                - An Exception if the execution failed
+        """
+        prompt, variables = SPLIT_PROMPT(prompt=self.propose_prompt)
+        UPDATE_SYSTEM(prompt=prompt)
+        for _args in self.propose_prompt.args:
+            if _args in kwargs:
+                del kwargs[_args]
+        message = cast(BaseMessage, STR_TO_USERMESSAGE())
+        if message.content:
+            await self.history.async_append(message)
+
+        query = next(
+            (
+                m.content
+                for m in reversed(self.history)
+                if m.role == MessageRole.USER
+            ),
+            "",
+        )
+        try:
+            proposals: List[Optional[BaseMessage]] = [None] * self.level_size
+            if self.sample_proposals:
+                proposals = list(
+                    await asyncio.wait_for(
+                        self.propose_model.async_sample(
+                            self._with_variables(variables),
+                            self.level_size,
+                            *args,
+                            **kwargs,
+                        ),
+                        self._remaining(),
+                    )
+                )
+            tasks = [
+                asyncio.ensure_future(
+                    self._async_expand(
+                        cast(str, query),
+                        self._with_variables(variables),
+                        proposal,
+                        *args,
+                        **kwargs,
+                    )
+                )
+                for proposal in proposals
+            ]
+            done, pending = await asyncio.wait(
+                tasks,
+                timeout=self._remaining(),
+                return_when=asyncio.FIRST_EXCEPTION,
+            )
+            if pending:
+                for task in pending:
+                    task.cancel()
+                for future in self._pending_evaluations.values():
+                    future.cancel()
+                await asyncio.wait(pending)
+            if not done:
+                return self._deadline_error()
+            branches = [task.result() for task in tasks if task in done]
+        except asyncio.TimeoutError:
+            return self._deadline_error()
+        except Exception as e:
+            return Err(e, str(e))  # type: ignore[arg-type]
+        return Ok(branches)
+
+    async def _async_expand(
+        self,
+        query: str,
+        messages: List[BaseMessage],
+        proposal: Optional[BaseMessage] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Tuple[BaseMemory, Optional[EvalFormat]]:
+        r"""Propose, execute and evaluate a single branch.
+
+        Args:
+            query: The original user query.
+            messages: The messages to send to the propose model.
+            proposal: The proposal of the branch, requested if None.
+            *args: Additional positional arguments to pass to the model.
+            **kwargs: Additional keyword arguments to pass to the model.
+
+        Returns:
+            Tuple: The new state and its evaluation,
+                None if the evaluation failed.
+        """
+        if proposal is None:
+            proposal = await ASYNC_GET_FINAL_MESSAGE(
+                await self.propose_model.async_run(messages, *args, **kwargs)
+            )
+        self._add_usage(proposal)
+        state = FullContextMemory(self.history + [proposal])
+        if proposal.tool_calls:
+            state.extend(
+                await asyncio.gather(
+                    *[
+                        self._async_call_tool_call(tool_call)
+                        for tool_call in proposal.tool_calls
+                    ]
+                )
+            )
+        return state, await self._async_evaluate(state, query)
+
+    async def _async_evaluate(
+        self, state: BaseMemory, query: str
+    ) -> Optional[EvalFormat]:
+        r"""Evaluate a single state asynchronously.
+
+        Cached evaluations are reused, and concurrent evaluations of
+        equivalent states wait for the same value model call.
+
+        Args:
+            state: The state to evaluate.
+            query: The original user query.
+
+        Returns:
+            Optional[EvalFormat]: The evaluation, None if it failed.
+        """
+        key = self._state_key(state, query)
+        if (cached := self.eval_cache.get(key)) is not None:
+            return cached
+        future = self._pending_evaluations.get(key)
+        if future is None:
+
+            async def request() -> BaseMessage:
+                response = await ASYNC_GET_FINAL_MESSAGE(
+                    await self.value_model.async_run(
+                        self._get_value_messages(state, query)
+                    )
+                )
+                self._add_usage(response)
+                return response
+
+            future = asyncio.ensure_future(request())
+            self._pending_evaluations[key] = future
+            future.add_done_callback(
+                lambda _: self._pending_evaluations.pop(key, None)
+            )
+        try:
+            evaluation = self._parse_evaluation(await asyncio.shield(future))
+        except Exception:
+            return None
+        self.eval_cache.put(key, evaluation)
+        return evaluation
+
+    async def _async_call_tool_call(self, tool_call: Any) -> BaseMessage:
+        r"""Execute a tool call and wrap its result in a tool message.
+
+        Args:
+            tool_call: The tool call from the proposal.
+
+        Returns:
+            BaseMessage: The tool response message.
+        """
+        func = tool_call.function
+        tool: Optional[Union[BaseAgent, BaseFunction]] = None
+        try:
+            tool = self.get_tool(func.name)
+            resp = await self.async_call_tool(func.name, func.arguments)
+            resp_value = resp.unwrap()
+        except Exception as e:
+            resp_value = f"Error: {str(e)}"
+            await self.async_on_error(Err(e, resp_value))
+        return BaseMessage.create_message(
+            id=tool_call.id,
+            tool_response=resp_value,
+            role=MessageRole.TOOL_RESPONSE,
+            content=str(resp_value),
+            source=tool.source if tool else None,
+            validate=False,
+        )
+
+    async def async_run(
+        self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
     ) -> Result[Any, Exception]:
-        """Execute a single step of the ReAct agent asynchronously.
+        """Execute the complete ToT search asynchronously.
 
-        Note: This is a placeholder for future async implementation.
+        New evaluations are written to the evaluation cache file at the end
+        of the run, off the event loop.
 
         Args:
             message (Union[str, BaseMessage]): Input message to process
@@ -461,19 +1180,72 @@ class ToTAgent(BaseAgent):
 
         Returns:
             Result[Any, Exception]: A Result containing either:
-                - The step execution result
-                - An Exception if the step failed
+                - The final response message
+                - An Exception if the execution failed
         """
-        raise NotImplementedError(
-            "Async step execution is not yet implemented."
-        )
+        try:
+            return await self._async_search(message, *args, **kwargs)
+        finally:
+            await asyncio.get_running_loop().run_in_executor(
+                self.get_executor(), self.eval_cache.flush
+            )
 
-    async def async_run(
+    async def _async_search(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
     ) -> Result[Any, Exception]:
-        raise NotImplementedError(
-            "Async run execution is not yet implemented."
-        )
+        r"""Run the ToT search of `async_run`."""
+        message = cast(BaseMessage, STR_TO_USERMESSAGE())
+        await self.async_on_start(message)
+        self._reset_search()
+        for _turn in range(self.max_turns):
+            if self._budget_exhausted():
+                break
+            if len(self.states) <= self.cursor:
+                self.states.append([])
+                self.scores.append([])
+                self.visited.append([])
+            response = await self.async_step(message, *args, **kwargs)
+            message = ""
+            if response.is_err:
+                if self._budget_exhausted():
+                    break
+                await self.async_on_error(response)
+                return response
+
+            branches = response.unwrap()
+            self._added = len(branches)
+            for state, evaluation in branches:
+                self.states[self.cursor].append(state)
+                self.visited[self.cursor].append(False)
+                try:
+                    self.scores[self.cursor].append(evaluation.score)  # type: ignore[union-attr]
+                    self._record_answer(state, evaluation.score)  # type: ignore[union-attr]
+                    if (
+                        self.scores[self.cursor][-1] >= self.finish_threshold
+                        and evaluation.finished  # type: ignore[union-attr]
+                    ):
+                        result = state[-1]
+                        await self.history.async_append(result)
+                        if result.role == MessageRole.ASSISTANT:
+                            await self.async_on_end(result)
+                            return Ok(result)
+                except Exception:
+                    self.scores[self.cursor].append(0.0)
+            try:
+                self._set_next_state()
+            except Exception as e:
+                if (answer := self._anytime_answer()) is not None:
+                    await self.async_on_end(answer)
+                    return Ok(answer)
+                _result = Err(e, str(e))
+                await self.async_on_error(_result)
+                return _result
+        if (answer := self._anytime_answer()) is not None:
+            await self.async_on_end(answer)
+            return Ok(answer)
+        _result = self._get_stop_error()
+        await self.async_on_error(_result)
+        return _result
 
     def add_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
         """Add a tool to the agent's toolset.
@@ -486,7 +1258,9 @@ class ToTAgent(BaseAgent):
             The agent instance.
         """
         self.tools.append(tool)
+        self._index_tool(tool)
         self.propose_model.config["tools"].append(tool.schema)
+        self._sort_tool_schemas(self.propose_model)
         return self
 
     def remove_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
@@ -500,6 +1274,7 @@ class ToTAgent(BaseAgent):
             The agent instance.
         """
         self.tools.remove(tool)
+        self._unindex_tool(tool)
         self.propose_model.config["tools"].remove(tool.schema)
         return self
 
@@ -514,4 +1289,5 @@ class ToTAgent(BaseAgent):
         self.states = []
         self.scores = []
         self.visited = []
+        self._reset_search()
         return self
@@ -50,8 +50,8 @@ from synthora.types.enums import (
 from synthora.types.node import Node
 from synthora.utils.macros import (
     ASYNC_GET_FINAL_MESSAGE,
-    FORMAT_PROMPT,
     GET_FINAL_MESSAGE,
+    SPLIT_PROMPT,
     STR_TO_USERMESSAGE,
     UPDATE_SYSTEM,
 )
@@ -150,6 +150,7 @@ class VanillaAgent(BaseAgent):
             else self.prompt
         )
         self.prompt: BasePrompt = BasePrompt(self.prompt)
+        self._sort_tool_schemas(self.model)
 
     def step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
@@ -172,7 +173,8 @@ class VanillaAgent(BaseAgent):
                 - The model's response
                 - An Exception if the step failed
         """
-        UPDATE_SYSTEM(prompt=FORMAT_PROMPT())
+        prompt, variables = SPLIT_PROMPT()
+        UPDATE_SYSTEM(prompt=prompt)
         for _args in self.prompt.args:
             if _args in kwargs:
                 del kwargs[_args]
@@ -180,7 +182,10 @@ class VanillaAgent(BaseAgent):
         if message.content:
             self.history.append(message)
 
-        response = self.model.run(self.history, *args, **kwargs)
+        response = self.model.run(
+            self._with_variables(variables), *args, **kwargs
+        )
+        response = self._speculation.watch(self, response)
         response = GET_FINAL_MESSAGE()
 
         self.history.append(response)
@@ -228,7 +233,7 @@ class VanillaAgent(BaseAgent):
                 func = tool_call.function
                 try:
                     tool = self.get_tool(func.name)
-                    resp = self.call_tool(func.name, func.arguments)
+                    resp = self._run_tool_call(tool_call)
                     resp_value = resp.unwrap()
                 except Exception as e:
                     resp_value = f"Error: {str(e)}"
@@ -244,8 +249,10 @@ class VanillaAgent(BaseAgent):
                         role=MessageRole.TOOL_RESPONSE,
                         content=str(resp_value),
                         source=tool.source,
+                        validate=False,
                     )
                 )
+            self._speculation.discard()
 
     async def async_step(
         self, message: Union[str, BaseMessage], *args: Any, **kwargs: Any
@@ -267,14 +274,18 @@ class VanillaAgent(BaseAgent):
                 - The step execution result
                 - An Exception if the step failed
         """
-        UPDATE_SYSTEM(prompt=FORMAT_PROMPT())
+        prompt, variables = SPLIT_PROMPT()
+        UPDATE_SYSTEM(prompt=prompt)
         for _args in self.prompt.args:
             del kwargs[_args]
         message = cast(BaseMessage, STR_TO_USERMESSAGE())
         if message.content:
             await self.history.async_append(message)
 
-        response = await self.model.async_run(self.history, *args, **kwargs)
+        response = await self.model.async_run(
+            self._with_variables(variables), *args, **kwargs
+        )
+        response = self._speculation.async_watch(self, response)
         response = await ASYNC_GET_FINAL_MESSAGE()
 
         await self.history.async_append(response)
@@ -318,9 +329,7 @@ class VanillaAgent(BaseAgent):
                 func = tool_call.function
                 try:
                     tool = self.get_tool(func.name)
-                    resp = await self.async_call_tool(
-                        func.name, func.arguments
-                    )
+                    resp = await self._async_run_tool_call(tool_call)
                     resp_value = resp.unwrap()
                 except Exception as e:
                     resp_value = f"Error: {str(e)}"
@@ -333,8 +342,10 @@ class VanillaAgent(BaseAgent):
                         role=MessageRole.TOOL_RESPONSE,
                         content=str(resp_value),
                         source=tool.source,
+                        validate=False,
                     )
                 )
+            self._speculation.discard()
 
     def add_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
         """Add a tool to the agent's toolset.
@@ -347,7 +358,9 @@ class VanillaAgent(BaseAgent):
             The agent instance.
         """
         self.tools.append(tool)
+        self._index_tool(tool)
         self.model.config["tools"].append(tool.schema)
+        self._sort_tool_schemas(self.model)
         return self
 
     def remove_tool(self, tool: Union["BaseAgent", BaseFunction]) -> Self:
@@ -361,6 +374,7 @@ class VanillaAgent(BaseAgent):
             The agent instance.
         """
         self.tools.remove(tool)
+        self._unindex_tool(tool)
         self.model.config["tools"].remove(tool.schema)
         return self
 
@@ -371,4 +385,5 @@ class VanillaAgent(BaseAgent):
             The agent instance.
         """
         self.history.clear()
+        self._speculation.discard()
         return self
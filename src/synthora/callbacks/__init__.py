@@ -20,6 +20,7 @@ from typing import List, Union
 from .base_handler import AsyncCallBackHandler, BaseCallBackHandler
 from .base_manager import AsyncCallBackManager, BaseCallBackManager
 from .rich_output_handler import RichOutputHandler
+from .usage_handler import UsageLedger, usage_scope
 
 
 def get_callback_manager(
@@ -50,4 +51,6 @@ __all__ = [
     "BaseCallBackManager",
     "AsyncCallBackManager",
     "RichOutputHandler",
+    "UsageLedger",
+    "usage_scope",
 ]
@@ -124,6 +124,30 @@ class BaseCallBackHandler(ABC):
         """
         return None
 
+    def on_llm_cache_hit(
+        self,
+        source: Node,
+        message: BaseMessage,
+        key: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Called when an LLM response is served from the response cache.
+
+        Args:
+            source:
+                Source node of the cached LLM operation.
+            message:
+                The cached message.
+            key:
+                The cache key of the request.
+            *args:
+                Additional positional arguments.
+            **kwargs:
+                Additional keyword arguments.
+        """
+        return None
+
     def on_tool_start(
         self,
         source: Node,
@@ -336,6 +360,30 @@ class AsyncCallBackHandler(BaseCallBackHandler):
         """
         return None
 
+    async def on_llm_cache_hit(  # type: ignore[override]
+        self,
+        source: Node,
+        message: BaseMessage,
+        key: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Async version of on_llm_cache_hit.
+
+        Args:
+            source:
+                Source node of the cached LLM operation.
+            message:
+                The cached message.
+            key:
+                The cache key of the request.
+            *args:
+                Additional positional arguments.
+            **kwargs:
+                Additional keyword arguments.
+        """
+        return None
+
     async def on_tool_start(  # type: ignore[override]
         self,
         source: Node,
@@ -0,0 +1,306 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from synthora.callbacks.base_handler import BaseCallBackHandler
+from synthora.messages.base import BaseMessage, get_cached_tokens
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+# USD per million input, cached input and output tokens. Models are matched
+# by the longest prefix of their name.
+DEFAULT_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "o3-mini": (1.10, 0.55, 4.40),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+
+# Fraction of the price taken off requests run as batch jobs.
+BATCH_DISCOUNT = 0.5
+
+# Dimensions usage is aggregated by.
+USAGE_DIMENSIONS = ("agent", "path", "model", "task", "request")
+
+_USAGE_SCOPE: ContextVar[Dict[str, str]] = ContextVar(
+    "synthora_usage_scope", default={}
+)
+
+
+@contextmanager
+def usage_scope(**labels: str) -> Iterator[None]:
+    r"""Attribute the model usage within the block to the given labels.
+
+    Scopes nest, inner labels taking precedence, and follow the current
+    thread or asyncio task. Work the library runs in its thread pools, such
+    as hedged requests, ToT proposals or background summaries, keeps the
+    scopes of the caller; threads started by other code start without
+    scopes unless they run in a copy of the caller's context. Workflow tasks
+    set `task` and `HttpService` sets `request` automatically.
+
+    Args:
+        **labels: The labels, such as `task` or `request`.
+    """
+    token = _USAGE_SCOPE.set({**_USAGE_SCOPE.get(), **labels})
+    try:
+        yield
+    finally:
+        _USAGE_SCOPE.reset(token)
+
+
+def _field(obj: Any, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class Usage:
+    r"""Token counts and estimated cost of a set of model requests."""
+
+    __slots__ = (
+        "requests",
+        "prompt_tokens",
+        "completion_tokens",
+        "cached_tokens",
+        "cost",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(
+        self, prompt: int, completion: int, cached: int, cost: float
+    ) -> None:
+        self.requests += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cached_tokens += cached
+        self.cost += cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "cache_hit_rate": (
+                self.cached_tokens / self.prompt_tokens
+                if self.prompt_tokens
+                else 0.0
+            ),
+            "cost": self.cost,
+        }
+
+
+class UsageLedger(BaseCallBackHandler):
+    r"""Callback handler summing the token usage and cost of model requests.
+
+    Usage is added up in total and per agent (the agent owning the model),
+    per path (the chain of agents down to it, so sub-agents are told apart),
+    per model, and per workflow task and request when a `usage_scope` gives
+    them. Cost is estimated from `prices`, in USD per million input, cached
+    input and output tokens. A ledger is shared, not copied, when the agents
+    it is attached to are copied. Responses served by a `CachedBackend`
+    are not billed, so they are not counted, and responses of batch jobs,
+    marked with `metadata["batch"]`, are billed at a discount.
+
+    Args:
+        prices: The prices per model, matched by the longest prefix of the
+            model name. Defaults to `DEFAULT_PRICES`.
+        batch_discount: The fraction of the price taken off batch requests.
+            Defaults to `BATCH_DISCOUNT`.
+    """
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        batch_discount: float = BATCH_DISCOUNT,
+    ) -> None:
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.batch_discount = batch_discount
+        self.total = Usage()
+        self.usage: Dict[str, Dict[str, Usage]] = {
+            dimension: {} for dimension in USAGE_DIMENSIONS
+        }
+        self._agent_labels: Dict[Node, Dict[str, str]] = {}
+        self._cache_hits: Dict[int, BaseMessage] = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "UsageLedger":
+        return self
+
+    def price(self, model: str) -> Tuple[float, float, float]:
+        r"""Get the prices of a model, zero if unknown.
+
+        Args:
+            model: The model name.
+
+        Returns:
+            Tuple[float, float, float]: The prices of input, cached input and
+                output tokens, in USD per million tokens.
+        """
+        match = max(
+            (prefix for prefix in self.prices if model.startswith(prefix)),
+            key=len,
+            default=None,
+        )
+        return self.prices[match] if match is not None else (0.0, 0.0, 0.0)
+
+    def _labels(self, source: Node) -> Dict[str, str]:
+        agent_labels = self._agent_labels.get(source)
+        if agent_labels is None:
+            agents = []
+            node: Optional[Node] = source
+            while node is not None:
+                if node.type == NodeType.AGENT:
+                    agents.append(node.name)
+                node = node.ancestor
+            agent_labels = (
+                {"agent": agents[0], "path": "/".join(reversed(agents))}
+                if agents
+                else {}
+            )
+            self._agent_labels[source] = agent_labels
+        return {**_USAGE_SCOPE.get(), **agent_labels}
+
+    def record(
+        self,
+        source: Node,
+        usage: Any,
+        model: Optional[str] = None,
+        batch: bool = False,
+    ) -> None:
+        r"""Add the usage of a request.
+
+        Args:
+            source: The source node of the model.
+            usage: The usage reported by the API, as an object or a dict.
+            model: The model name.
+            batch: Whether the request ran in a batch job.
+        """
+        prompt = _field(usage, "prompt_tokens") or 0
+        completion = _field(usage, "completion_tokens") or 0
+        cached = get_cached_tokens(usage)
+        model = model or "unknown"
+        input_price, cached_price, output_price = self.price(model)
+        cost = (
+            (prompt - cached) * input_price
+            + cached * cached_price
+            + completion * output_price
+        ) / 1e6
+        if batch:
+            cost *= 1 - self.batch_discount
+        labels = self._labels(source)
+        labels["model"] = model
+        with self._lock:
+            self.total.add(prompt, completion, cached, cost)
+            for dimension, label in labels.items():
+                usages = self.usage.setdefault(dimension, {})
+                if (entry := usages.get(label)) is None:
+                    entry = usages[label] = Usage()
+                entry.add(prompt, completion, cached, cost)
+
+    def on_llm_cache_hit(
+        self,
+        source: Node,
+        message: BaseMessage,
+        key: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        # The cached message still carries the usage of the original request,
+        # skip it when it is sent to `on_llm_end`.
+        with self._lock:
+            self._cache_hits[id(message)] = message
+
+    def on_llm_end(
+        self,
+        source: Node,
+        message: BaseMessage,
+        stream: bool = False,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        if message is None:
+            return
+        if self._cache_hits:
+            with self._lock:
+                if self._cache_hits.pop(id(message), None) is message:
+                    return
+        usage = message.metadata.get("usage")
+        if usage is None:
+            return
+        model = message.metadata.get("model") or kwargs.get("model")
+        self.record(source, usage, model, bool(message.metadata.get("batch")))
+
+    def snapshot(self) -> Dict[str, Any]:
+        r"""Get a copy of the usage so far.
+
+        Returns:
+            Dict[str, Any]: The total usage under "total", and the usage per
+                label under each dimension.
+        """
+        with self._lock:
+            return {
+                "total": self.total.to_dict(),
+                **{
+                    dimension: {
+                        label: usage.to_dict()
+                        for label, usage in usages.items()
+                    }
+                    for dimension, usages in self.usage.items()
+                },
+            }
+
+    def export(self, path: Optional[str] = None) -> str:
+        r"""Export the usage so far as JSON.
+
+        Args:
+            path: The file to write, if any.
+
+        Returns:
+            str: The JSON document.
+        """
+        data = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
+
+    def reset(self) -> None:
+        r"""Forget all usage."""
+        with self._lock:
+            self.total = Usage()
+            self.usage = {dimension: {} for dimension in USAGE_DIMENSIONS}
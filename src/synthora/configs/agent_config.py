@@ -50,6 +50,13 @@ class AgentConfig(BaseConfig):
             Prompt template(s) for the agent.
         tools:
             Optional list of tool configurations.
+        speculative_tools:
+            Whether to start speculation-safe tools while the model response
+            is still streaming.
+        cache_prompt:
+            Whether to keep the system prompt and the tool schemas the same
+            across turns, so the provider can cache the request prefix. The
+            values of the prompt variables are sent in a trailing message.
     """
 
     name: str
@@ -58,6 +65,8 @@ class AgentConfig(BaseConfig):
     model: Union[List[ModelConfig], ModelConfig]
     prompt: Union[BasePrompt, Dict[str, BasePrompt]]
     tools: Optional[List[ToolConfig]] = None
+    speculative_tools: bool = False
+    cache_prompt: bool = False
 
     @classmethod
     def from_file(cls: Type[Self], path: Union[str, Path]) -> Self:
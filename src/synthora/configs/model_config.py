@@ -45,6 +45,16 @@ class ModelConfig(BaseConfig):
             Optional model-specific configuration parameters.
         backend_config:
             Optional backend-specific configuration.
+        cache:
+            Optional response cache configuration. `type` is either "memory"
+            or "disk", the other keys are passed to the cache.
+        rate_limit:
+            Optional client-side rate limits (`rpm`, `tpm`,
+            `max_concurrency`, `max_retries`), shared by every backend of
+            the same deployment.
+        hedge:
+            Optional hedging options (`alternate`, `percentile`, `max_rate`,
+            `min_samples`, `window`), to duplicate slow requests.
     """
 
     model_type: str
@@ -52,6 +62,9 @@ class ModelConfig(BaseConfig):
     backend: ModelBackendType = ModelBackendType.OPENAI_CHAT
     config: Optional[Dict[str, Any]] = None
     backend_config: Optional[Dict[str, Any]] = None
+    cache: Optional[Dict[str, Any]] = None
+    rate_limit: Optional[Dict[str, Any]] = None
+    hedge: Optional[Dict[str, Any]] = None
 
     @classmethod
     def from_file(cls: Type[Self], path: Path) -> Self:
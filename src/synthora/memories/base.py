@@ -15,10 +15,79 @@
 # limitations under the License.
 #
 from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Optional
 
 from synthora.messages import BaseMessage
+from synthora.types import ChatCompletionMessageParam
+from synthora.utils.codec import from_bytes, to_bytes
+
+
+try:
+    from typing import Self
+except ImportError:
+    from typing_extensions import Self
 
 
 class BaseMemory(ABC, list[BaseMessage]):
     @abstractmethod
     async def async_append(self, message: BaseMessage) -> None: ...
+
+    def to_openai_messages(self) -> List[ChatCompletionMessageParam]:
+        r"""Get the messages in OpenAI format.
+
+        Payloads are cached by each message, so only messages added or
+        changed since the previous call are serialized again.
+
+        Returns:
+            List[ChatCompletionMessageParam]: The OpenAI messages.
+        """
+        return [message.to_openai_message() for message in self]
+
+    def to_bytes(self, codec: Optional[str] = None) -> bytes:
+        r"""Serialize the messages of the memory.
+
+        Args:
+            codec (Optional[str]): Name of the codec, defaults to the fastest
+                available.
+
+        Returns:
+            bytes: The serialized messages.
+        """
+        return to_bytes(list(self), codec)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        *args: Any,
+        codec: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Self:
+        r"""Create a memory holding the messages serialized by `to_bytes`.
+
+        Args:
+            data (bytes): The serialized messages.
+            *args: Positional arguments of the memory.
+            codec (Optional[str]): Name of the codec, detected from the data
+                by default.
+            **kwargs: Keyword arguments of the memory.
+
+        Returns:
+            Self: The memory.
+
+        Raises:
+            TypeError: If the data is not a list of messages.
+        """
+        messages = from_bytes(data, codec)
+        if not isinstance(messages, list) or not all(
+            isinstance(message, BaseMessage) for message in messages
+        ):
+            raise TypeError("Expected a list of messages")
+        memory = cls(*args, **kwargs)  # type: ignore[abstract]
+        memory._restore(messages)
+        return memory
+
+    def _restore(self, messages: Iterable[BaseMessage]) -> None:
+        r"""Load serialized messages, which were already trimmed by the
+        memory they come from."""
+        list.extend(self, messages)
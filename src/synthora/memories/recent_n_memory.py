@@ -15,28 +15,129 @@
 # limitations under the License.
 #
 
+from collections import deque
+from typing import Any, Deque, Iterable, SupportsIndex, Union
+
 from synthora.memories.base import BaseMemory
 from synthora.messages.base import BaseMessage
 from synthora.types.enums import MessageRole
 
 
+try:
+    from typing import Self
+except ImportError:
+    from typing_extensions import Self
+
+
 class RecentNMemory(BaseMemory):
+    r"""Memory keeping the system messages and the most recent messages.
+
+    System messages are pinned at the head of the memory and never evicted.
+    The other messages are grouped into turns, an assistant message calling
+    tools forming one turn with the tool responses, and the oldest turns are
+    evicted until at most `n` messages remain. A turn is never split, and
+    the latest turn is always kept, even if it alone exceeds `n` messages.
+
+    The sizes of the turns are kept in a deque, so evicting turns removes a
+    slice after the system messages without searching or comparing
+    messages. Removing the slice still shifts the remaining messages, which
+    is linear in `n`, as the memory is a list. Appending and extending are
+    incremental; the other list mutations, including `sort` and `reverse`,
+    regroup the whole memory.
+
+    Args:
+        n: The maximum number of messages.
+    """
+
     def __init__(self, n: int) -> None:
         super().__init__()
         self.n = n
+        self._pinned = 0
+        self._turns: Deque[int] = deque()
 
     def append(self, message: BaseMessage) -> None:
-        super().append(message)
+        if message.role == MessageRole.SYSTEM:
+            super().insert(self._pinned, message)
+            self._pinned += 1
+        elif message.role == MessageRole.TOOL_RESPONSE and self._turns:
+            super().append(message)
+            self._turns[-1] += 1
+        else:
+            super().append(message)
+            self._turns.append(1)
         if len(self) > self.n:
             self._remove_exceeded_messages()
 
     async def async_append(self, message: BaseMessage) -> None:
         self.append(message)
 
-    def _remove_exceeded_messages(self) -> None:
-        messages_to_remove = filter(
-            lambda message: message.role != MessageRole.SYSTEM, self
-        )
+    def extend(self, messages: Iterable[BaseMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def __iadd__(self, messages: Iterable[BaseMessage]) -> Self:  # type: ignore[override,misc]
+        self.extend(messages)
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self._pinned = 0
+        self._turns.clear()
+
+    def insert(self, index: SupportsIndex, message: BaseMessage) -> None:
+        super().insert(index, message)
+        self._regroup()
 
-        while len(self) > self.n and messages_to_remove:
-            self.remove(next(messages_to_remove))
+    def remove(self, message: BaseMessage) -> None:
+        super().remove(message)
+        self._regroup()
+
+    def pop(self, index: SupportsIndex = -1) -> BaseMessage:
+        message = super().pop(index)
+        self._regroup()
+        return message
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._regroup()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._regroup()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._regroup()
+
+    def __delitem__(self, index: Union[SupportsIndex, slice]) -> None:
+        super().__delitem__(index)
+        self._regroup()
+
+    def __reduce__(self) -> Any:
+        return self.__class__, (self.n,), None, iter(self)
+
+    def _restore(self, messages: Iterable[BaseMessage]) -> None:
+        list.extend(self, messages)
+        self._regroup()
+
+    def _regroup(self) -> None:
+        r"""Pin the system messages and rebuild the turns from the
+        messages."""
+        messages = list(self)
+        system = [m for m in messages if m.role == MessageRole.SYSTEM]
+        super().clear()
+        self._pinned = 0
+        self._turns.clear()
+        list.extend(self, system)
+        self._pinned = len(system)
+        for message in messages:
+            if message.role != MessageRole.SYSTEM:
+                self.append(message)
+
+    def _remove_exceeded_messages(self) -> None:
+        excess = len(self) - self.n
+        count = 0
+        while count < excess and len(self._turns) > 1:
+            count += self._turns.popleft()
+        if count:
+            super().__delitem__(slice(self._pinned, self._pinned + count))
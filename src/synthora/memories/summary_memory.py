@@ -15,8 +15,13 @@
 # limitations under the License.
 #
 
+import asyncio
 import textwrap
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from synthora.memories.base import BaseMemory
 from synthora.memories.full_context_memory import FullContextMemory
@@ -28,27 +33,112 @@ from synthora.types.enums import MessageRole
 
 
 class SummaryMemory(BaseMemory):
+    r"""Memory summarizing its oldest messages.
+
+    When the memory holds more than `n` messages, the oldest ones, up to
+    `cache_size` messages and the next user message, are replaced by a
+    summary. The summary is made in the background, on a worker thread by
+    `append` and in an asyncio task by `async_append`, and the memory keeps
+    all its messages until it is ready. It is then swapped in by the next
+    append, or by `wait`. An append going over `hard_limit` messages waits
+    for the summary. A background summary that fails is dropped: the model
+    reports the error to its callbacks, and the memory keeps its messages
+    until a later append summarizes them again.
+
+    Args:
+        n: The number of messages above which the memory is summarized.
+        cache_size: The number of messages summarized at once.
+        summary_model: The model making the summaries, defaults to the
+            default OpenAI chat model.
+        hard_limit: The number of messages above which appends wait for the
+            summary, defaults to twice `n`.
+        background: Whether to summarize in the background. If False, every
+            summary is made by the append going over `n` messages.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        r"""Get the executor shared by all background summaries.
+
+        Returns:
+            ThreadPoolExecutor: The shared executor.
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        thread_name_prefix="synthora-summary"
+                    )
+        return cls._executor
+
     def __init__(
         self,
         n: int = 15,
         cache_size: int = 6,
         summary_model: Optional[BaseModelBackend] = None,
+        hard_limit: Optional[int] = None,
+        background: bool = True,
     ) -> None:
         super().__init__()
         self.n = n
         self.cache_size = cache_size
         self.summary_model = summary_model or OpenAIChatBackend.default()
+        self.hard_limit = hard_limit if hard_limit is not None else 2 * n
+        self.background = background
+        self._pending: Optional[
+            Tuple[Union["Future[str]", "asyncio.Task[str]"], List[BaseMessage]]
+        ] = None
 
     def append(self, message: BaseMessage) -> None:
         super().append(message)
+        self._apply_summary()
         if len(self) > self.n:
             self._summarize()
 
     async def async_append(self, message: BaseMessage) -> None:
         super().append(message)
+        self._apply_summary()
         if len(self) > self.n:
             await self._async_summarize()
 
+    def wait(self) -> None:
+        r"""Wait for the summary in progress, if any, and swap it in."""
+        if self._pending is not None:
+            future = self._pending[0]
+            if isinstance(future, Future):
+                future.exception()
+                self._apply_summary()
+            elif not future.done():
+                raise RuntimeError(
+                    "The summary is made by an asyncio task, use async_wait."
+                )
+            else:
+                self._apply_summary()
+
+    async def async_wait(self) -> None:
+        r"""Wait for the summary in progress, if any, and swap it in."""
+        if self._pending is not None:
+            future = self._pending[0]
+            if isinstance(future, Future):
+                await asyncio.wait([asyncio.wrap_future(future)])
+            else:
+                await asyncio.wait([future])
+            self._apply_summary()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SummaryMemory":
+        # A summary in progress belongs to the memory being copied.
+        memory = self.__class__.__new__(self.__class__)
+        memo[id(self)] = memory
+        for attr, value in self.__dict__.items():
+            if attr != "_pending":
+                setattr(memory, attr, deepcopy(value, memo))
+        memory._pending = None
+        list.extend(memory, deepcopy(list(self), memo))
+        return memory
+
     def _get_history(self, messages: list[BaseMessage]) -> FullContextMemory:
         return FullContextMemory(
             [
@@ -68,8 +158,17 @@ class SummaryMemory(BaseMemory):
     def _update(
         self, summary: str, messages_to_summarize: list[BaseMessage]
     ) -> None:
-        index = self.index(messages_to_summarize[-1])
-        self[index].content = textwrap.dedent(
+        r"""Replace the summarized messages by the summary at once.
+
+        The summary is dropped if some of the messages left the memory
+        while it was made, for example because the memory was cleared.
+        """
+        summarized = {id(message) for message in messages_to_summarize}
+        if sum(id(message) in summarized for message in self) != len(
+            summarized
+        ):
+            return
+        messages_to_summarize[-1].content = textwrap.dedent(
             f"""\
             This is the summary of our previous conversation:
             <summary>
@@ -77,41 +176,89 @@ class SummaryMemory(BaseMemory):
             </summary>
             """
         )
-        for i in messages_to_summarize[:-1]:
-            self.remove(i)
+        summarized.discard(id(messages_to_summarize[-1]))
+        self[:] = [
+            message for message in self if id(message) not in summarized
+        ]
 
-    def _summarize(self) -> None:
+    def _apply_summary(self) -> None:
+        r"""Swap in the summary made in the background, if it is ready.
+
+        A failed summary is dropped, its error was reported by the model.
+        """
+        if self._pending is None or not self._pending[0].done():
+            return
+        future, messages_to_summarize = self._pending
+        self._pending = None
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._update(future.result(), messages_to_summarize)
+
+    def _select(self) -> Optional[List[BaseMessage]]:
+        r"""Get the messages to summarize, None if there are not enough."""
         messages_to_summarize = list(
             filter(lambda message: message.role != MessageRole.SYSTEM, self)
         )
         if len(messages_to_summarize) <= 1:
-            return
+            return None
         cursor = min(len(messages_to_summarize), self.cache_size) - 1
         while (
             cursor < len(messages_to_summarize)
             and messages_to_summarize[cursor].role != MessageRole.USER
         ):
             cursor += 1
-        messages_to_summarize = messages_to_summarize[: cursor + 1]
+        return messages_to_summarize[: cursor + 1]
+
+    def _run_summary(self, messages_to_summarize: List[BaseMessage]) -> str:
         history = self._get_history(messages_to_summarize)
+        return str(self.summary_model.run(history).content)
 
-        summary = self.summary_model.run(history).content
-        self._update(summary, messages_to_summarize)
+    async def _async_run_summary(
+        self, messages_to_summarize: List[BaseMessage]
+    ) -> str:
+        history = self._get_history(messages_to_summarize)
+        return str((await self.summary_model.async_run(history)).content)
 
-    async def _async_summarize(self) -> None:
-        messages_to_summarize = list(
-            filter(lambda message: message.role != MessageRole.SYSTEM, self)
-        )
-        if len(messages_to_summarize) <= 1:
+    def _summarize(self) -> None:
+        if self._pending is not None:
+            if len(self) <= self.hard_limit:
+                return
+            future = self._pending[0]
+            if isinstance(future, Future) or future.done():
+                self.wait()
+                if len(self) <= self.n:
+                    return
+            else:
+                # An asyncio task cannot be waited for here, summarize again.
+                future.cancel()
+                self._pending = None
+        messages_to_summarize = self._select()
+        if messages_to_summarize is None:
             return
-        cursor = min(len(messages_to_summarize), self.cache_size) - 1
-        while (
-            cursor < len(messages_to_summarize)
-            and messages_to_summarize[cursor].role != MessageRole.USER
-        ):
-            cursor += 1
-        messages_to_summarize = messages_to_summarize[: cursor + 1]
-        history = self._get_history(messages_to_summarize)
+        if not self.background or len(self) > self.hard_limit:
+            summary = self._run_summary(messages_to_summarize)
+            self._update(summary, messages_to_summarize)
+            return
+        future = self.get_executor().submit(
+            copy_context().run, self._run_summary, messages_to_summarize
+        )
+        self._pending = (future, messages_to_summarize)
 
-        summary = await self.summary_model.async_run(history).content  # type: ignore
-        self._update(summary, messages_to_summarize)
+    async def _async_summarize(self) -> None:
+        if self._pending is not None:
+            if len(self) <= self.hard_limit:
+                return
+            await self.async_wait()
+            if len(self) <= self.n:
+                return
+        messages_to_summarize = self._select()
+        if messages_to_summarize is None:
+            return
+        if not self.background or len(self) > self.hard_limit:
+            summary = await self._async_run_summary(messages_to_summarize)
+            self._update(summary, messages_to_summarize)
+            return
+        task = asyncio.ensure_future(
+            self._async_run_summary(messages_to_summarize)
+        )
+        self._pending = (task, messages_to_summarize)
@@ -18,6 +18,7 @@ from synthora.types.enums import MessageRole, NodeType
 from synthora.types.node import Node
 
 from .base import BaseMessage
+from .stream import ChoicesAccumulator, StreamAccumulator, create_accumulator
 
 
 def user(content: str) -> BaseMessage:
@@ -44,4 +45,12 @@ def assistant(content: str, name: str = "assitant") -> BaseMessage:
     )
 
 
-__all__ = ["BaseMessage", "user", "system", "assistant"]
+__all__ = [
+    "BaseMessage",
+    "ChoicesAccumulator",
+    "StreamAccumulator",
+    "create_accumulator",
+    "user",
+    "system",
+    "assistant",
+]
@@ -16,7 +16,7 @@
 #
 
 from copy import deepcopy
-from typing import Any, AnyStr, Dict, List, Optional, Type, Union
+from typing import Any, AnyStr, Dict, List, Optional, Tuple, Type, Union
 
 
 try:
@@ -24,7 +24,7 @@ try:
 except ImportError:
     from typing_extensions import Self
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, PrivateAttr, model_validator
 
 from synthora.types import (
     ChatCompletion,
@@ -40,7 +40,41 @@ from synthora.types import (
 )
 from synthora.types.enums import MessageRole, NodeType, Result
 from synthora.types.node import Node
-from synthora.utils.image import parse_image
+from synthora.utils.codec import from_bytes, register_type, to_bytes
+from synthora.utils.image import image_reference, parse_image
+
+
+# Default sources of the messages created without one.
+_USER = Node(name="user", type=NodeType.USER)
+_ASSISTANT = Node(name="assistant", type=NodeType.AGENT)
+
+# Field and private attribute defaults of the messages created by
+# `BaseMessage.trusted`, per message class.
+_TRUSTED_TEMPLATES: Dict[type, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+# Fields the OpenAI payload of a message is built from.
+_PAYLOAD_FIELDS = frozenset(
+    {"id", "source", "role", "content", "tool_calls", "images"}
+)
+
+
+def get_cached_tokens(usage: Any) -> int:
+    r"""Get the number of prompt tokens served from the provider's prompt
+    cache.
+
+    Args:
+        usage: The usage reported by the API, as an object or a dict.
+
+    Returns:
+        int: The number of cached prompt tokens, 0 if not reported.
+    """
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details")
+    else:
+        details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
 
 
 class BaseMessage(BaseModel):
@@ -64,7 +98,8 @@ class BaseMessage(BaseModel):
         tool_response:
             Response from tool execution.
         images:
-            List of image URLs.
+            List of image URLs, data URIs or local paths. Local images are
+            encoded when the message is sent.
         origional_response:
             Original response from OpenAI.
         metadata:
@@ -87,6 +122,15 @@ class BaseMessage(BaseModel):
 
     metadata: Dict[str, Any] = {}
 
+    _openai_message: Optional[ChatCompletionMessageParam] = PrivateAttr(
+        default=None
+    )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _PAYLOAD_FIELDS:
+            self._openai_message = None
+        super().__setattr__(name, value)
+
     @model_validator(mode="after")
     def check_empty_message(self) -> Self:
         """Validate that message has at least one content field.
@@ -127,6 +171,49 @@ class BaseMessage(BaseModel):
         """
         return bool(self.tool_calls)
 
+    @classmethod
+    def trusted(cls: Type[Self], **fields: Any) -> Self:
+        """Create a message from trusted fields, without validation.
+
+        The framework creates most messages itself, from API responses, tool
+        results and prompts, so it skips the validation of the fields and of
+        `check_empty_message` and sets the fields directly, which is faster
+        than both validation and `model_construct`. Values are stored as
+        given: the caller must pass fields of the right types, and a
+        `metadata` dict the message may own. Messages from users should be
+        created with the constructor or `create_message`.
+
+        Args:
+            **fields: The fields of the message.
+
+        Returns:
+            New message instance.
+        """
+        template = _TRUSTED_TEMPLATES.get(cls)
+        if template is None:
+            template = _TRUSTED_TEMPLATES[cls] = (
+                {
+                    name: None if field.is_required() else field.default
+                    for name, field in cls.model_fields.items()
+                },
+                {
+                    name: attr.get_default()
+                    for name, attr in cls.__private_attributes__.items()
+                },
+            )
+        values = template[0].copy()
+        values.update(fields)
+        if fields.get("metadata") is None:
+            values["metadata"] = {}
+        message = cls.__new__(cls)
+        object.__setattr__(message, "__dict__", values)
+        object.__setattr__(message, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(message, "__pydantic_extra__", None)
+        object.__setattr__(
+            message, "__pydantic_private__", template[1].copy()
+        )
+        return message
+
     @classmethod
     def create_message(
         cls: Type[Self],
@@ -137,7 +224,8 @@ class BaseMessage(BaseModel):
         tool_calls: Optional[List[Dict[str, Any]]] = None,
         tool_response: Optional[Union[Result[Any, Exception], Any]] = None,
         source: Optional[Node] = None,
-        metadata: Dict[str, Any] = {},
+        metadata: Optional[Dict[str, Any]] = None,
+        validate: bool = True,
     ) -> Self:
         """Create a new message instance.
 
@@ -158,6 +246,9 @@ class BaseMessage(BaseModel):
                 Source node, defaults to user.
             metadata:
                 Additional metadata.
+            validate:
+                Whether to validate the message. The framework turns it off
+                for the messages it creates itself, see `trusted`.
 
         Returns:
             New message instance
@@ -167,56 +258,50 @@ class BaseMessage(BaseModel):
                 If system message contains images or tool response missing ID.
         """
         if images:
-            images = [parse_image(image) for image in images]
-        source = source or Node(name="user", type=NodeType.USER)
+            images = [image_reference(image) for image in images]
         if isinstance(content, BaseMessage):
             content = content.content
+        fields: Dict[str, Any] = {
+            "role": role,
+            "content": content,
+            "source": source or _USER,
+        }
         match role:
             case MessageRole.USER:
-                return cls(
-                    source=source or Node(name="user", type=NodeType.USER),
-                    role=MessageRole.USER,
-                    content=content,
-                    images=images,
-                    metadata=metadata,
-                )
+                fields.update(images=images)
             case MessageRole.SYSTEM:
                 if images:
                     raise ValueError("System message cannot have images")
-                return cls(
-                    source=source or Node(name="system", type=NodeType.SYSTEM),
-                    role=MessageRole.SYSTEM,
-                    content=content,
-                    metadata=metadata,
-                )
             case MessageRole.ASSISTANT:
-                return cls(
-                    source=source
-                    or Node(name="assistant", type=NodeType.AGENT),
-                    role=MessageRole.ASSISTANT,
-                    content=content,
-                    tool_calls=tool_calls,
-                    images=images,
-                    metadata=metadata,
-                )
+                fields.update(tool_calls=tool_calls, images=images)
             case MessageRole.TOOL_RESPONSE:
                 if id is None:
                     raise ValueError(
                         "Function response message should have an id"
                     )
-                return cls(
+                fields.update(
                     id=id,
-                    source=source or Node(name="function", type=NodeType.TOOL),
-                    role=MessageRole.TOOL_RESPONSE,
-                    content=content,
                     tool_response=tool_response,
                     images=images,
-                    metadata=metadata,
                 )
+        if validate:
+            return cls(**fields, metadata=metadata or {})
+        if content is not None and type(content) is not str:
+            fields["content"] = (
+                content.decode()
+                if isinstance(content, bytes)
+                else str(content)
+            )
+        return cls.trusted(**fields, metadata=dict(metadata or {}))
 
     def to_openai_message(self) -> ChatCompletionMessageParam:
         """Convert to OpenAI message format.
 
+        The payload is built once and reused until a field it depends on is
+        assigned, so the returned dict must not be modified. Changes made in
+        place, like appending to `tool_calls`, are not detected; call
+        `clear_openai_message` after them.
+
         Returns:
             Message in OpenAI format.
 
@@ -224,6 +309,53 @@ class BaseMessage(BaseModel):
             ValueError:
                 If system message contains images.
         """
+        if self._openai_message is None:
+            self._openai_message = self._build_openai_message()
+        return self._openai_message
+
+    def to_bytes(self, codec: Optional[str] = None) -> bytes:
+        """Serialize the message.
+
+        The original OpenAI response is not serialized.
+
+        Args:
+            codec:
+                Name of the codec, defaults to the fastest available.
+
+        Returns:
+            The serialized message.
+        """
+        return to_bytes(self, codec)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, codec: Optional[str] = None) -> Self:
+        """Deserialize a message serialized by `to_bytes`.
+
+        The message is validated like any message built from external data.
+
+        Args:
+            data:
+                The serialized message.
+            codec:
+                Name of the codec, detected from the data by default.
+
+        Returns:
+            The message.
+
+        Raises:
+            TypeError:
+                If the data is not a message.
+        """
+        message = from_bytes(data, codec)
+        if not isinstance(message, cls):
+            raise TypeError(f"Expected a {cls.__name__}, got {type(message)}")
+        return message
+
+    def clear_openai_message(self) -> None:
+        """Drop the cached OpenAI payload of the message."""
+        self._openai_message = None
+
+    def _build_openai_message(self) -> ChatCompletionMessageParam:
         if self.role == MessageRole.TOOL_RESPONSE:
             return ChatCompletionToolMessageParam(
                 content=str(self.content),
@@ -241,7 +373,10 @@ class BaseMessage(BaseModel):
                 for image in self.images:
                     content.append(  # type: ignore[union-attr]
                         ChatCompletionContentPartImageParam(
-                            image_url={"url": image, "detail": "auto"},
+                            image_url={
+                                "url": parse_image(image),
+                                "detail": "auto",
+                            },
                             type="image_url",
                         )
                     )
@@ -275,46 +410,97 @@ class BaseMessage(BaseModel):
         cls: Type[Self],
         response: ChatCompletion,
         source: Optional[Node] = None,
+        index: int = 0,
     ) -> Self:
         """Create message from OpenAI completion response.
 
+        Legacy completion responses, whose choices hold `text` instead of a
+        message, are supported as well.
+
         Args:
             response:
                 OpenAI completion response.
             source:
                 Source node, defaults to assistant.
+            index:
+                Position of the choice to read, defaults to the first.
 
         Returns:
             New message instance.
         """
-        choice = response.choices[0]
-        source = source or Node(name="assistant", type=NodeType.AGENT)
+        choice = response.choices[index]
+        source = source or _ASSISTANT
         metadata = {
             "created": response.created,
             "model": response.model,
             "service_tier": getattr(response, "service_tier", None),
             "system_fingerprint": getattr(response, "system_fingerprint", None),
             "usage": response.usage,
+            "cached_tokens": get_cached_tokens(response.usage),
             "finish_reason": choice.finish_reason,
         }
-        tool_calls = choice.message.tool_calls
-        if not tool_calls and getattr(choice.message, "function_call", None):
-            tool_calls = [choice.message.function_call]
+        message = getattr(choice, "message", None)
+        if message is None:
+            return cls.trusted(
+                id=response.id,
+                source=source,
+                role=MessageRole.ASSISTANT,
+                content=getattr(choice, "text", None) or "",
+                metadata=metadata,
+            )
+        tool_calls = message.tool_calls
+        if not tool_calls and getattr(message, "function_call", None):
+            tool_calls = [message.function_call]
         try:
-            parsed = choice.message.parsed
+            parsed = message.parsed
         except AttributeError:
             parsed = None
-        return cls(
+        return cls.trusted(
             id=response.id,
             source=source,
             role=MessageRole.ASSISTANT,
-            content=choice.message.content,
+            content=message.content,
             metadata=metadata,
             tool_calls=tool_calls,
             # origional_response=response,
             parsed=parsed,
         )
 
+    @classmethod
+    def from_openai_chat_choices(
+        cls: Type[Self],
+        response: ChatCompletion,
+        source: Optional[Node] = None,
+    ) -> List[Self]:
+        """Create a message per choice of an OpenAI completion response, as
+        returned when several completions are requested with `n`.
+
+        Each message records the index of its choice in the `index` metadata.
+        The usage of the request is reported by the last message only, so
+        that it is counted once.
+
+        Args:
+            response:
+                OpenAI completion response.
+            source:
+                Source node, defaults to assistant.
+
+        Returns:
+            The messages, in choice order.
+        """
+        messages = [
+            cls.from_openai_chat_response(response, source, i)
+            for i in range(len(response.choices))
+        ]
+        for i, message in enumerate(messages):
+            message.metadata["index"] = getattr(
+                response.choices[i], "index", i
+            )
+            if i < len(messages) - 1:
+                message.metadata["usage"] = None
+                message.metadata["cached_tokens"] = 0
+        return messages
+
     @classmethod
     def from_openai_chat_stream_response(
         cls: Type[Self],
@@ -336,13 +522,14 @@ class BaseMessage(BaseModel):
             New or updated message instance with accumulated content.
         """
         choice = response.choices[0]
-        source = source or Node(name="assistant", type=NodeType.AGENT)
+        source = source or _ASSISTANT
         metadata = {
             "created": response.created,
             "model": response.model,
             "service_tier": response.service_tier,
             "system_fingerprint": response.system_fingerprint,
             "usage": response.usage,
+            "cached_tokens": get_cached_tokens(response.usage),
             "finish_reason": choice.finish_reason,
         }
         if choice.finish_reason and previous:
@@ -380,7 +567,7 @@ class BaseMessage(BaseModel):
                             -1
                         ].function.arguments += function.arguments  # type: ignore[index]
         content = previous.content + chunk if previous else chunk
-        return cls(
+        return cls.trusted(
             id=response.id,
             chunk=chunk,
             source=source,
@@ -390,3 +577,17 @@ class BaseMessage(BaseModel):
             tool_calls=previous_tool_calls,
             origional_response=response,
         )
+
+
+def _encode_message(message: BaseMessage) -> Dict[str, Any]:
+    fields = {
+        name: getattr(message, name)
+        for name in BaseMessage.model_fields
+        if name != "origional_response"
+    }
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+register_type(
+    "message", BaseMessage, _encode_message, BaseMessage.model_validate
+)
@@ -0,0 +1,302 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from synthora.messages.base import BaseMessage, get_cached_tokens
+from synthora.types import ChatCompletionChunk, ChatCompletionMessageToolCall
+from synthora.types.enums import MessageRole, NodeType
+from synthora.types.node import Node
+
+
+class StreamAccumulator:
+    r"""Accumulate the chunks of a streamed chat completion.
+
+    Content deltas are appended to a buffer and tool call deltas to tool call
+    builders, so accumulating a response is linear in its length. Each delta
+    is reported by a lightweight, unvalidated chunk message carrying the
+    delta in `chunk` and the tool calls built so far, but no accumulated
+    `content`. The complete message, with `content`, tool calls, usage and
+    finish reason, is built once by `finish`.
+
+    Legacy completion chunks, whose choices hold `text` instead of a delta,
+    are accumulated as content.
+
+    Args:
+        source: The source node of the messages, defaults to assistant.
+        index: The index of the choice to accumulate, defaults to the first.
+    """
+
+    def __init__(self, source: Optional[Node] = None, index: int = 0) -> None:
+        self.source = source or Node(name="assistant", type=NodeType.AGENT)
+        self.index = index
+        self.id: Optional[str] = None
+        self.parts: List[str] = []
+        self.tool_calls: List[ChatCompletionMessageToolCall] = []
+        self._tool_call_index: Dict[int, ChatCompletionMessageToolCall] = {}
+        self.metadata: Dict[str, Any] = {"finish_reason": None}
+
+    @property
+    def content(self) -> Optional[str]:
+        r"""The content accumulated so far, None if there is none."""
+        if not self.parts:
+            return None
+        if len(self.parts) > 1:
+            self.parts = ["".join(self.parts)]
+        return self.parts[0]
+
+    def _add_tool_call(self, delta: Any) -> Optional[str]:
+        index = getattr(delta, "index", None)
+        call = self._tool_call_index.get(index) if index is not None else None
+        if call is None and (
+            index is not None
+            or getattr(delta, "id", None)
+            or not self.tool_calls
+        ):
+            call = ChatCompletionMessageToolCall(
+                id=getattr(delta, "id", None) or "",
+                type="function",
+                function={"name": "", "arguments": ""},
+            )
+            self.tool_calls.append(call)
+            if index is not None:
+                self._tool_call_index[index] = call
+        elif call is None:
+            call = self.tool_calls[-1]
+        piece = None
+        if function := getattr(delta, "function", delta):
+            if getattr(function, "name", None):
+                piece = function.name
+                call.function.name += function.name
+            if getattr(function, "arguments", None):
+                piece = function.arguments
+                call.function.arguments += function.arguments
+        return piece
+
+    def add(self, chunk: ChatCompletionChunk) -> Optional[BaseMessage]:
+        r"""Add a streamed chunk.
+
+        Args:
+            chunk: The chunk.
+
+        Returns:
+            Optional[BaseMessage]: A chunk message if the chunk carries a
+                delta, otherwise None.
+        """
+        self.id = chunk.id or self.id
+        self.metadata.update(
+            created=chunk.created,
+            model=chunk.model,
+            service_tier=getattr(chunk, "service_tier", None),
+            system_fingerprint=getattr(chunk, "system_fingerprint", None),
+        )
+        if getattr(chunk, "usage", None) is not None:
+            self.metadata["usage"] = chunk.usage
+            self.metadata["cached_tokens"] = get_cached_tokens(chunk.usage)
+        choice = next(
+            (
+                choice
+                for choice in chunk.choices
+                if (getattr(choice, "index", None) or 0) == self.index
+            ),
+            None,
+        )
+        if choice is None:
+            return None
+        if choice.finish_reason:
+            self.metadata["finish_reason"] = choice.finish_reason
+        delta = getattr(choice, "delta", None)
+        if delta is None:
+            piece = getattr(choice, "text", None)
+            tool_calls: List[Any] = []
+        else:
+            piece = delta.content
+            tool_calls = delta.tool_calls or (
+                [delta.function_call] if delta.function_call else []
+            )
+        if piece:
+            self.parts.append(piece)
+        for tool_call in tool_calls:
+            piece = self._add_tool_call(tool_call) or piece
+        if not piece:
+            return None
+        return BaseMessage.trusted(
+            id=self.id,
+            source=self.source,
+            role=MessageRole.ASSISTANT,
+            chunk=piece,
+            tool_calls=self.tool_calls,
+            metadata={**self.metadata, "finish_reason": None},
+        )
+
+    def finish(self) -> BaseMessage:
+        r"""Build the complete message.
+
+        Returns:
+            BaseMessage: The accumulated message.
+        """
+        return BaseMessage.trusted(
+            id=self.id,
+            source=self.source,
+            role=MessageRole.ASSISTANT,
+            content=self.content or ("" if not self.tool_calls else None),
+            tool_calls=self.tool_calls or None,
+            metadata=dict(self.metadata),
+        )
+
+    def stream(
+        self, chunks: Iterable[ChatCompletionChunk]
+    ) -> Iterator[BaseMessage]:
+        r"""Accumulate a stream of chunks.
+
+        Args:
+            chunks: The chunks of a streamed completion.
+
+        Returns:
+            Iterator[BaseMessage]: A chunk message per delta, then the
+                complete message.
+        """
+        for chunk in chunks:
+            if (message := self.add(chunk)) is not None:
+                yield message
+        yield self.finish()
+
+    async def async_stream(
+        self, chunks: AsyncIterable[ChatCompletionChunk]
+    ) -> AsyncIterator[BaseMessage]:
+        r"""Accumulate an async stream of chunks.
+
+        Args:
+            chunks: The chunks of a streamed completion.
+
+        Returns:
+            AsyncIterator[BaseMessage]: A chunk message per delta, then the
+                complete message.
+        """
+        async for chunk in chunks:
+            if (message := self.add(chunk)) is not None:
+                yield message
+        yield self.finish()
+
+
+class ChoicesAccumulator:
+    r"""Accumulate the chunks of a streamed completion with several choices,
+    as requested with `n`.
+
+    Each choice is accumulated by a `StreamAccumulator`, and its messages
+    record the index of the choice in the `index` metadata. The complete
+    messages are built once the stream ends; the usage of the request, if
+    streamed, is reported by the last one only, so that it is counted once.
+
+    Args:
+        source: The source node of the messages, defaults to assistant.
+        n: The number of choices.
+    """
+
+    def __init__(self, source: Optional[Node] = None, n: int = 1) -> None:
+        self.choices = [StreamAccumulator(source, i) for i in range(n)]
+        for i, choice in enumerate(self.choices):
+            choice.metadata["index"] = i
+
+    def add(self, chunk: ChatCompletionChunk) -> List[BaseMessage]:
+        r"""Add a streamed chunk.
+
+        Args:
+            chunk: The chunk.
+
+        Returns:
+            List[BaseMessage]: The chunk messages of the choices with a delta.
+        """
+        messages = []
+        for choice in self.choices:
+            if (message := choice.add(chunk)) is not None:
+                messages.append(message)
+        return messages
+
+    def finish(self) -> List[BaseMessage]:
+        r"""Build the complete messages.
+
+        Returns:
+            List[BaseMessage]: The accumulated message of each choice.
+        """
+        messages = [choice.finish() for choice in self.choices]
+        for message in messages[:-1]:
+            message.metadata.pop("usage", None)
+            message.metadata.pop("cached_tokens", None)
+        return messages
+
+    def stream(
+        self, chunks: Iterable[ChatCompletionChunk]
+    ) -> Iterator[BaseMessage]:
+        r"""Accumulate a stream of chunks.
+
+        Args:
+            chunks: The chunks of a streamed completion.
+
+        Returns:
+            Iterator[BaseMessage]: The chunk messages, then the complete
+                message of each choice.
+        """
+        for chunk in chunks:
+            yield from self.add(chunk)
+        yield from self.finish()
+
+    async def async_stream(
+        self, chunks: AsyncIterable[ChatCompletionChunk]
+    ) -> AsyncIterator[BaseMessage]:
+        r"""Accumulate an async stream of chunks.
+
+        Args:
+            chunks: The chunks of a streamed completion.
+
+        Returns:
+            AsyncIterator[BaseMessage]: The chunk messages, then the complete
+                message of each choice.
+        """
+        async for chunk in chunks:
+            for message in self.add(chunk):
+                yield message
+        for message in self.finish():
+            yield message
+
+
+def create_accumulator(
+    source: Optional[Node] = None, n: Optional[int] = None
+) -> Union[StreamAccumulator, ChoicesAccumulator]:
+    r"""Create the accumulator of a stream of `n` choices.
+
+    Args:
+        source: The source node of the messages, defaults to assistant.
+        n: The number of choices, defaults to 1.
+
+    Returns:
+        Union[StreamAccumulator, ChoicesAccumulator]: A `StreamAccumulator`
+            for a single choice, otherwise a `ChoicesAccumulator`.
+    """
+    if (n or 1) > 1:
+        return ChoicesAccumulator(source, n or 1)
+    return StreamAccumulator(source)
@@ -25,7 +25,26 @@ from synthora.types.enums import ModelBackendType
 from synthora.types.node import Node
 
 from .base import BaseModelBackend
+from .batch import (
+    BatchJob,
+    BatchSubmitter,
+    LocalBatchSubmitter,
+    OpenAIBatchSubmitter,
+)
+from .cache import (
+    CachedBackend,
+    DiskResponseCache,
+    InMemoryResponseCache,
+    ResponseCache,
+    create_cache_from_config,
+)
+from .clients import CLIENT_REGISTRY, ClientRegistry
+from .hedging import HedgedBackend
+from .mock import MockBackend
 from .openai_chat import OpenAIChatBackend
+from .rate_limit import RateLimitedBackend, RateLimiter
+from .recording import RecordingBackend, ReplayBackend
+from .router import RouterBackend
 
 
 BACKEND_MAP = {
@@ -33,6 +52,10 @@ BACKEND_MAP = {
     ModelBackendType.OPENAI_COMPLETION: OpenAICompletionBackend,
     ModelBackendType.AZURE_CHAT: AzureChatBackend,
     ModelBackendType.AZURE_COMPLETION: AzureCompletionBackend,
+    ModelBackendType.RECORDING: RecordingBackend,
+    ModelBackendType.REPLAY: ReplayBackend,
+    ModelBackendType.ROUTER: RouterBackend,
+    ModelBackendType.MOCK: MockBackend,
 }
 
 
@@ -58,13 +81,41 @@ def create_model_from_config(
     if isinstance(config, list):
         return [create_model_from_config(c, source) for c in config]
     cls = BACKEND_MAP[config.backend]
-    return cls(  # type: ignore[no-any-return]
+    model = cls(
         name=config.name,
         source=source,
         model_type=config.model_type,
         config=config.config,
         **(config.backend_config or {}),
     )
+    if config.rate_limit is not None:
+        model = RateLimitedBackend(model, **config.rate_limit)
+    if config.hedge is not None:
+        model = HedgedBackend(model, **config.hedge)
+    if config.cache is not None:
+        return CachedBackend(model, create_cache_from_config(config.cache))
+    return model  # type: ignore[no-any-return]
 
 
-__all__ = ["BaseModelBackend", "OpenAIChatBackend", "create_model_from_config"]
+__all__ = [
+    "BaseModelBackend",
+    "OpenAIChatBackend",
+    "CachedBackend",
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "DiskResponseCache",
+    "RecordingBackend",
+    "ReplayBackend",
+    "RateLimitedBackend",
+    "RateLimiter",
+    "RouterBackend",
+    "HedgedBackend",
+    "MockBackend",
+    "BatchJob",
+    "BatchSubmitter",
+    "LocalBatchSubmitter",
+    "OpenAIBatchSubmitter",
+    "ClientRegistry",
+    "CLIENT_REGISTRY",
+    "create_model_from_config",
+]
@@ -33,6 +33,7 @@ from synthora.callbacks.base_handler import (
     BaseCallBackHandler,
 )
 from synthora.messages.base import BaseMessage
+from synthora.messages.stream import create_accumulator
 from synthora.models.base import BaseModelBackend
 from synthora.types.enums import CallBackEvent, ModelBackendType, NodeType
 from synthora.types.node import Node
@@ -62,7 +63,9 @@ class AzureChatBackend(BaseModelBackend):
         handlers:
             Callback handlers. Defaults to [].
         kwargs:
-            Additional keyword arguments for OpenAI client.
+            Additional keyword arguments for OpenAI client. The connection
+            pool options max_connections, max_keepalive_connections and
+            keepalive_expiry are also accepted.
     """
 
     @staticmethod
@@ -134,21 +137,17 @@ class AzureChatBackend(BaseModelBackend):
         if self.api_version is None:
             raise ValueError("API Version is required for Azure OpenAI")
         self.kwargs["api_version"] = self.api_version
-        if isinstance(self.callback_manager, AsyncCallBackHandler):
-            self.client = AsyncAzureOpenAI(**self.kwargs)
-        else:
-            self.client = AzureOpenAI(**self.kwargs)
-
-        # Lazy initialization of the OpenAI client
-        # This is done to avoid copy errors when pickling the model backend
-        self.client = None
+        # Clients are created on first use and shared through the client
+        # registry, see `BaseModelBackend._get_client`.
 
     def run(
         self,
         messages: Union[List[BaseMessage], BaseMessage],
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, Generator[BaseMessage, None, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
         """Synchronously generate chat completions.
 
         Args:
@@ -159,18 +158,20 @@ class AzureChatBackend(BaseModelBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AzureOpenAI):
-            self.client = AzureOpenAI(**self.kwargs)
+        client = self._get_client(AzureOpenAI, self.kwargs)
         if not isinstance(messages, list):
             messages = [messages]
-        stream = self.config.get("stream", False)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         messages = [message.to_openai_message() for message in messages]
         kwargs = {**self.config, **kwargs}
         if "tools" in kwargs and not kwargs["tools"]:
             del kwargs["tools"]
         kwargs["model"] = self.model_type
         kwargs["messages"] = messages
+        if stream:
+            self._request_stream_usage(kwargs)
         self.callback_manager.call(
             CallBackEvent.LLM_START,
             self.source,
@@ -179,9 +180,9 @@ class AzureChatBackend(BaseModelBackend):
         )
         try:
             if kwargs.get("response_format", None) is not None:
-                resp = self.client.beta.chat.completions.parse(*args, **kwargs)
+                resp = client.beta.chat.completions.parse(*args, **kwargs)
             else:
-                resp = self.client.chat.completions.create(*args, **kwargs)
+                resp = client.chat.completions.create(*args, **kwargs)
         except Exception as e:
             self.callback_manager.call(
                 CallBackEvent.LLM_ERROR, self.source, e, *args, **kwargs
@@ -192,12 +193,9 @@ class AzureChatBackend(BaseModelBackend):
             def stream_messages() -> Generator[BaseMessage, None, None]:
                 try:
                     previous_message = None
-                    for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).stream(resp):
                         self.callback_manager.call(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -225,6 +223,13 @@ class AzureChatBackend(BaseModelBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END, self.source, result, *args, **kwargs
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             self.callback_manager.call(
@@ -237,7 +242,9 @@ class AzureChatBackend(BaseModelBackend):
         messages: Union[List[BaseMessage], BaseMessage],
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, AsyncGenerator[BaseMessage, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
         """Asynchronously generate chat completions.
 
         Args:
@@ -248,16 +255,18 @@ class AzureChatBackend(BaseModelBackend):
         Returns:
             Generated response(s).
             If stream=True, returns an async generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AsyncAzureOpenAI):
-            self.client = AsyncAzureOpenAI(**self.kwargs)
+        client = self._get_client(AsyncAzureOpenAI, self.kwargs)
         if not isinstance(messages, list):
             messages = [messages]
-        stream = self.config.get("stream", False)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         messages = [message.to_openai_message() for message in messages]
         kwargs = {**self.config, **kwargs}
         kwargs["model"] = self.model_type
         kwargs["messages"] = messages
+        if stream:
+            self._request_stream_usage(kwargs)
         if "tools" in kwargs and not kwargs["tools"]:
             del kwargs["tools"]
         await CALL_ASYNC_CALLBACK(
@@ -268,13 +277,11 @@ class AzureChatBackend(BaseModelBackend):
         )
         try:
             if kwargs.get("response_format", None) is not None:
-                resp = await self.client.beta.chat.completions.parse(
+                resp = await client.beta.chat.completions.parse(
                     *args, **kwargs
                 )
             else:
-                resp = await self.client.chat.completions.create(
-                    *args, **kwargs
-                )
+                resp = await client.chat.completions.create(*args, **kwargs)
         except Exception as e:
             await CALL_ASYNC_CALLBACK(
                 CallBackEvent.LLM_ERROR, self.source, e, *args, **kwargs
@@ -285,12 +292,9 @@ class AzureChatBackend(BaseModelBackend):
             async def stream_messages() -> AsyncGenerator[BaseMessage, None]:
                 try:
                     previous_message = None
-                    async for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    async for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).async_stream(resp):  # type: ignore[arg-type]
                         await CALL_ASYNC_CALLBACK(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -319,6 +323,13 @@ class AzureChatBackend(BaseModelBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END, self.source, result, *args, **kwargs
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             await CALL_ASYNC_CALLBACK(
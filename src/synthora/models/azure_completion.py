@@ -32,6 +32,7 @@ from synthora.callbacks.base_handler import (
     BaseCallBackHandler,
 )
 from synthora.messages.base import BaseMessage
+from synthora.messages.stream import create_accumulator
 from synthora.models.openai_chat import OpenAIChatBackend
 from synthora.types.enums import CallBackEvent, MessageRole
 from synthora.types.node import Node
@@ -61,7 +62,9 @@ class AzureCompletionBackend(OpenAIChatBackend):
         handlers:
             Callback handlers. Defaults to [].
         kwargs:
-            Additional keyword arguments for OpenAI client.
+            Additional keyword arguments for OpenAI client. The connection
+            pool options max_connections, max_keepalive_connections and
+            keepalive_expiry are also accepted.
     """
 
     @staticmethod
@@ -96,7 +99,9 @@ class AzureCompletionBackend(OpenAIChatBackend):
         prompt: Union[str, BaseMessage],  # type: ignore[override]
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, Generator[BaseMessage, None, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
         """Synchronously generate completions.
 
         Args:
@@ -110,10 +115,10 @@ class AzureCompletionBackend(OpenAIChatBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AzureOpenAI):
-            self.client = AzureOpenAI(**self.kwargs)
-        stream = self.config.get("stream", False)
+        client = self._get_client(AzureOpenAI, self.kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         if isinstance(prompt, str):
             prompt = BaseMessage(
                 content=prompt, role=MessageRole.USER, source=self.source
@@ -121,6 +126,8 @@ class AzureCompletionBackend(OpenAIChatBackend):
         kwargs["prompt"] = prompt.content
         kwargs["model"] = self.model_type
         kwargs.update(self.config)
+        if stream:
+            self._request_stream_usage(kwargs)
 
         self.callback_manager.call(
             CallBackEvent.LLM_START,
@@ -132,7 +139,7 @@ class AzureCompletionBackend(OpenAIChatBackend):
         )
 
         try:
-            resp = self.client.completions.create(*args, **kwargs)
+            resp = client.completions.create(*args, **kwargs)
         except Exception as e:
             self.callback_manager.call(
                 CallBackEvent.LLM_ERROR,
@@ -148,12 +155,9 @@ class AzureCompletionBackend(OpenAIChatBackend):
             def stream_messages() -> Generator[BaseMessage, None, None]:
                 try:
                     previous_message = None
-                    for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).stream(resp):
                         self.callback_manager.call(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -182,6 +186,18 @@ class AzureCompletionBackend(OpenAIChatBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    result,
+                    stream,
+                    *args,
+                    **kwargs,
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             self.callback_manager.call(
@@ -199,7 +215,9 @@ class AzureCompletionBackend(OpenAIChatBackend):
         prompt: Union[str, BaseMessage],  # type: ignore[override]
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, AsyncGenerator[BaseMessage, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
         """Synchronously generate completions.
 
         Args:
@@ -210,10 +228,10 @@ class AzureCompletionBackend(OpenAIChatBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AsyncAzureOpenAI):
-            self.client = AsyncAzureOpenAI(**self.kwargs)
-        stream = self.config.get("stream", False)
+        client = self._get_client(AsyncAzureOpenAI, self.kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         if isinstance(prompt, str):
             prompt = BaseMessage(
                 content=prompt, role=MessageRole.USER, source=self.source
@@ -221,6 +239,8 @@ class AzureCompletionBackend(OpenAIChatBackend):
         kwargs["prompt"] = prompt.content
         kwargs["model"] = self.model_type
         kwargs.update(self.config)
+        if stream:
+            self._request_stream_usage(kwargs)
 
         CALL_ASYNC_CALLBACK(
             CallBackEvent.LLM_START,
@@ -232,7 +252,7 @@ class AzureCompletionBackend(OpenAIChatBackend):
         )
 
         try:
-            resp = await self.client.completions.create(*args, **kwargs)
+            resp = await client.completions.create(*args, **kwargs)
         except Exception as e:
             CALL_ASYNC_CALLBACK(
                 CallBackEvent.LLM_ERROR,
@@ -248,12 +268,9 @@ class AzureCompletionBackend(OpenAIChatBackend):
             async def stream_messages() -> AsyncGenerator[BaseMessage, None]:
                 try:
                     previous_message = None
-                    async for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    async for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).async_stream(resp):  # type: ignore[arg-type]
                         await CALL_ASYNC_CALLBACK(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -283,6 +300,18 @@ class AzureCompletionBackend(OpenAIChatBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    result,
+                    stream,
+                    *args,
+                    **kwargs,
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             await CALL_ASYNC_CALLBACK(
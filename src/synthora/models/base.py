@@ -17,7 +17,7 @@
 
 from abc import ABC, abstractmethod
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
 
 from synthora.callbacks import get_callback_manager
 from synthora.callbacks.base_handler import (
@@ -25,10 +25,14 @@ from synthora.callbacks.base_handler import (
     BaseCallBackHandler,
 )
 from synthora.messages.base import BaseMessage
+from synthora.models.clients import CLIENT_REGISTRY
 from synthora.types.enums import ModelBackendType, NodeType
 from synthora.types.node import Node
 
 
+T = TypeVar("T")
+
+
 class BaseModelBackend(ABC):
     """Abstract base class for model backends.
 
@@ -125,6 +129,101 @@ class BaseModelBackend(ABC):
         """
         ...
 
+    def sample(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        n: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> List[BaseMessage]:
+        """Generate several completions with a single request.
+
+        The request asks for `n` choices, so the prompt is sent and billed
+        once. A streamed response is consumed and its complete messages are
+        returned. Backends that do not support `n` return one completion.
+
+        Args:
+            messages (Union[List[BaseMessage], BaseMessage]): Input messages
+            n (int): The number of completions
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            List[BaseMessage]: The completions, in choice order.
+        """
+        if n > 1:
+            kwargs["n"] = n
+        response = self.run(messages, *args, **kwargs)
+        if isinstance(response, BaseMessage):
+            return [response]
+        if isinstance(response, list):
+            return response
+        return [m for m in response if m.chunk is None][-n:]
+
+    async def async_sample(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        n: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> List[BaseMessage]:
+        """Generate several completions with a single request asynchronously.
+
+        See `sample`.
+
+        Args:
+            messages (Union[List[BaseMessage], BaseMessage]): Input messages
+            n (int): The number of completions
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            List[BaseMessage]: The completions, in choice order.
+        """
+        if n > 1:
+            kwargs["n"] = n
+        response = await self.async_run(messages, *args, **kwargs)
+        if isinstance(response, BaseMessage):
+            return [response]
+        if isinstance(response, list):
+            return response
+        return [m async for m in response if m.chunk is None][-n:]
+
+    def _get_client(self, client_type: Type[T], kwargs: Dict[str, Any]) -> T:
+        """Return the shared client of the given type.
+
+        Clients come from the process-wide client registry, so backends
+        created with the same client arguments, and their copies, share a
+        single client and connection pool. Async clients are kept per event
+        loop.
+
+        Args:
+            client_type (Type[T]): Type of the client
+            kwargs (Dict[str, Any]): Keyword arguments of the client
+
+        Returns:
+            T: The client instance
+        """
+        self.client = CLIENT_REGISTRY.get(client_type, kwargs)
+        return self.client  # type: ignore[no-any-return]
+
+    @staticmethod
+    def _request_stream_usage(kwargs: Dict[str, Any]) -> None:
+        """Ask for the token usage of a streamed response.
+
+        The usage is sent in a last chunk when `stream_options.include_usage`
+        is set. It is requested unless `stream_options` is configured; set it
+        to None to send no stream options at all.
+
+        Args:
+            kwargs (Dict[str, Any]): Request parameters, updated in place
+        """
+        if (
+            kwargs.setdefault("stream_options", {"include_usage": True})
+            is None
+        ):
+            del kwargs["stream_options"]
+
     def add_handler(
         self,
         handler: Union[BaseCallBackHandler, AsyncCallBackHandler],
@@ -139,6 +238,14 @@ class BaseModelBackend(ABC):
         """
         self.callback_manager.add(handler)
 
+    def set_ancestor(self, ancestor: Optional[Node]) -> None:
+        """Move the model under another node of the execution tree.
+
+        Args:
+            ancestor (Optional[Node]): The new ancestor of the model
+        """
+        self.source = self.source.with_ancestor(ancestor)
+
     def __deepcopy__(self, memo: Dict[int, Any]) -> "BaseModelBackend":
         if id(self) in memo:
             return memo[id(self)]  # type: ignore[no-any-return]
@@ -175,3 +282,69 @@ class BaseModelBackend(ABC):
         if self.config is None:
             self.config = {}
         self.config["stream"] = stream
+
+
+class BackendWrapper(BaseModelBackend):
+    """Base class for model backends wrapping another backend.
+
+    The wrapper shares the configuration, source and callback manager of the
+    wrapped backend, so it can stand in for that backend in an agent.
+
+    Attributes:
+        backend (BaseModelBackend): The wrapped backend
+    """
+
+    def __init__(
+        self,
+        backend: BaseModelBackend,
+        backend_type: Optional[ModelBackendType] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend (BaseModelBackend): The backend to wrap
+            backend_type (Optional[ModelBackendType]): Type of the wrapper,
+                defaults to the type of the wrapped backend
+            handlers (List[Union[BaseCallBackHandler, AsyncCallBackHandler]]):
+                List of callback handlers added to the wrapped backend
+        """
+        super().__init__(
+            model_type=backend.model_type,
+            source=backend.source,
+            backend_type=backend_type or backend.backend_type,
+            config=backend.config,
+            name=backend.name,
+        )
+        self.backend = backend
+        self.source = backend.source
+        self.config = backend.config
+        self.callback_manager = backend.callback_manager
+        for handler in handlers or []:
+            self.add_handler(handler)
+
+    def add_handler(
+        self,
+        handler: Union[BaseCallBackHandler, AsyncCallBackHandler],
+        recursive: bool = True,
+    ) -> None:
+        """Add a callback handler to the wrapped model.
+
+        Args:
+            handler (Union[BaseCallBackHandler, AsyncCallBackHandler]):
+                Callback handler to add
+            recursive (bool): Whether to add handler recursively
+        """
+        self.backend.add_handler(handler, recursive)
+        self.callback_manager = self.backend.callback_manager
+
+    def set_ancestor(self, ancestor: Optional[Node]) -> None:
+        """Move the wrapped model under another node of the execution tree.
+
+        Args:
+            ancestor (Optional[Node]): The new ancestor of the model
+        """
+        self.backend.set_ancestor(ancestor)
+        self.source = self.backend.source
@@ -0,0 +1,464 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BackendWrapper, BaseModelBackend
+from synthora.types import ChatCompletion
+from synthora.types.enums import CallBackEvent
+
+
+# The maximum number of requests of an OpenAI batch file.
+MAX_BATCH_REQUESTS = 50_000
+
+_PENDING_STATUSES = frozenset({"validating", "in_progress", "finalizing"})
+_COMPLETED_STATUSES = frozenset({"completed"})
+
+
+class BatchSubmitter(ABC):
+    r"""Runs files of requests as offline batch jobs.
+
+    A batch file holds one request per line, as
+    `{"custom_id", "method", "url", "body"}`, and its results hold one line
+    per request, as `{"custom_id", "response": {"status_code", "body"},
+    "error"}`, following the OpenAI Batch API.
+    """
+
+    @abstractmethod
+    def submit(self, path: Path, endpoint: str) -> str:
+        r"""Submit a batch file.
+
+        Args:
+            path: The batch file.
+            endpoint: The endpoint of the requests.
+
+        Returns:
+            str: The identifier of the job.
+        """
+        ...
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        r"""Get the status of a job.
+
+        Args:
+            job_id: The identifier of the job.
+
+        Returns:
+            str: "pending", "completed" or "failed".
+        """
+        ...
+
+    @abstractmethod
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        r"""Get the results of a completed job.
+
+        Args:
+            job_id: The identifier of the job.
+
+        Returns:
+            List[Dict[str, Any]]: The result of each request.
+        """
+        ...
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    r"""Runs batch jobs with the OpenAI, or Azure OpenAI, Batch API.
+
+    Args:
+        client: The OpenAI or AzureOpenAI client.
+        completion_window: The time frame within which the batch should be
+            processed. Defaults to "24h".
+    """
+
+    def __init__(self, client: Any, completion_window: str = "24h") -> None:
+        self.client = client
+        self.completion_window = completion_window
+
+    @classmethod
+    def from_backend(cls, backend: BaseModelBackend) -> "OpenAIBatchSubmitter":
+        r"""Create a submitter sharing the client of a chat backend.
+
+        Args:
+            backend: The chat backend, possibly wrapped.
+
+        Returns:
+            OpenAIBatchSubmitter: The submitter.
+        """
+        from openai import AzureOpenAI, OpenAI
+
+        from synthora.models.azure_chat import AzureChatBackend
+
+        while isinstance(backend, BackendWrapper):
+            backend = backend.backend
+        if not hasattr(backend, "kwargs"):
+            raise ValueError(
+                f"{type(backend).__name__} has no client to submit batches"
+            )
+        client_type = (
+            AzureOpenAI if isinstance(backend, AzureChatBackend) else OpenAI
+        )
+        return cls(backend._get_client(client_type, backend.kwargs))
+
+    def submit(self, path: Path, endpoint: str) -> str:
+        with open(path, "rb") as f:
+            file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=file.id,
+            endpoint=endpoint,
+            completion_window=self.completion_window,
+        )
+        return str(batch.id)
+
+    def status(self, job_id: str) -> str:
+        status = self.client.batches.retrieve(job_id).status
+        if status in _PENDING_STATUSES:
+            return "pending"
+        if status in _COMPLETED_STATUSES:
+            return "completed"
+        return "failed"
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(job_id)
+        results: List[Dict[str, Any]] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = self.client.files.content(file_id).text
+                results.extend(
+                    json.loads(line) for line in text.splitlines() if line
+                )
+        return results
+
+
+def _echo(body: Dict[str, Any]) -> Dict[str, Any]:
+    r"""Answer a chat request with the content of its last message."""
+    messages = body.get("messages") or [{}]
+    content = messages[-1].get("content") or ""
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "local"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(json.dumps(messages)) // 4 + 1,
+            "completion_tokens": len(content) // 4 + 1,
+            "total_tokens": (len(json.dumps(messages)) + len(content)) // 4
+            + 2,
+        },
+    }
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    r"""Runs batch jobs in process, a stand-in for a batch API in tests and
+    offline runs.
+
+    Each request body is answered by `respond`, which returns the response
+    body as a dict, or raises to fail the request. Jobs report "pending"
+    for the first `pending_polls` status checks.
+
+    Args:
+        respond: The function answering a request body. Defaults to echoing
+            the content of the last message.
+        pending_polls: The number of status checks a job stays pending.
+            Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        respond: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        pending_polls: int = 0,
+    ) -> None:
+        self.respond = respond or _echo
+        self.pending_polls = pending_polls
+        self.jobs: Dict[str, List[Dict[str, Any]]] = {}
+        self.polls: Dict[str, int] = {}
+
+    def submit(self, path: Path, endpoint: str) -> str:
+        job_id = f"batch_{uuid.uuid4().hex}"
+        results = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                result: Dict[str, Any] = {
+                    "id": f"batch_req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": None,
+                    "error": None,
+                }
+                try:
+                    body = self.respond(request["body"])
+                    result["response"] = {"status_code": 200, "body": body}
+                except Exception as e:
+                    result["error"] = {
+                        "code": type(e).__name__,
+                        "message": str(e),
+                    }
+                results.append(result)
+        self.jobs[job_id] = results
+        self.polls[job_id] = 0
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        if job_id not in self.jobs:
+            return "failed"
+        self.polls[job_id] += 1
+        if self.polls[job_id] <= self.pending_polls:
+            return "pending"
+        return "completed"
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        return list(self.jobs[job_id])
+
+
+class BatchJob:
+    r"""An offline batch job of chat requests.
+
+    Requests are added with `add`, written to a JSON Lines file and
+    submitted together by `submit`, then `wait` polls the job and maps the
+    results back to the requests by their custom id. Batch APIs trade
+    latency, within a completion window, for a lower price and a separate,
+    larger quota, which suits bulk data generation.
+
+    Requests carry the configuration of the backend (tools, response
+    format, ...), without streaming. The completions are marked with
+    `metadata["batch"]` and reported with the LLM_END callback of the
+    backend, so usage handlers count them at the batch price.
+
+    .. code-block:: python
+
+        job = BatchJob(model)
+        ids = [job.add([user(prompt)]) for prompt in prompts]
+        results = job.run()
+
+    Args:
+        backend: The chat backend the requests are built for.
+        submitter: The submitter running the job. Defaults to the OpenAI
+            Batch API with the client of the backend.
+        path: The batch file, kept after the job is submitted. Defaults to
+            a temporary file, removed once the job is submitted.
+        endpoint: The endpoint of the requests.
+            Defaults to "/v1/chat/completions".
+        poll_interval: Seconds between status checks. Defaults to 30.
+        timeout: Seconds to wait for the job, or None to wait until it
+            ends. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        backend: BaseModelBackend,
+        submitter: Optional[BatchSubmitter] = None,
+        path: Optional[Union[str, Path]] = None,
+        endpoint: str = "/v1/chat/completions",
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.backend = backend
+        self.submitter = submitter or OpenAIBatchSubmitter.from_backend(
+            backend
+        )
+        self.path = Path(path) if path is not None else None
+        self.endpoint = endpoint
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.requests: Dict[str, Dict[str, Any]] = {}
+        self.job_id: Optional[str] = None
+
+    def _body(
+        self, messages: List[BaseMessage], kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        params = {**self.backend.config, **kwargs}
+        if "tools" in params and not params["tools"]:
+            del params["tools"]
+        for key in ("stream", "stream_options"):
+            params.pop(key, None)
+        response_format = params.get("response_format")
+        if isinstance(response_format, type) and issubclass(
+            response_format, BaseModel
+        ):
+            params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": response_format.__name__,
+                    "schema": response_format.model_json_schema(),
+                },
+            }
+        return {
+            **params,
+            "model": self.backend.model_type,
+            "messages": [m.to_openai_message() for m in messages],
+        }
+
+    def add(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        custom_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> str:
+        r"""Add a request to the job.
+
+        Args:
+            messages: Single message or list of messages to process.
+            custom_id: The identifier of the request. Defaults to a new one.
+            **kwargs: Additional request parameters.
+
+        Returns:
+            str: The identifier of the request.
+
+        Raises:
+            ValueError: If the job is submitted, full, or the identifier is
+                taken.
+        """
+        if self.job_id is not None:
+            raise ValueError("Cannot add requests to a submitted batch job")
+        if len(self.requests) >= MAX_BATCH_REQUESTS:
+            raise ValueError(
+                f"A batch job holds at most {MAX_BATCH_REQUESTS} requests"
+            )
+        if not isinstance(messages, list):
+            messages = [messages]
+        custom_id = custom_id or f"request-{len(self.requests)}"
+        if custom_id in self.requests:
+            raise ValueError(f"Duplicate batch request id: {custom_id}")
+        self.requests[custom_id] = self._body(messages, kwargs)
+        return custom_id
+
+    def submit(self) -> str:
+        r"""Write the batch file and submit it.
+
+        Returns:
+            str: The identifier of the job.
+        """
+        if self.job_id is None:
+            if self.path is not None:
+                self.job_id = self._submit(self.path)
+            else:
+                with tempfile.TemporaryDirectory(
+                    prefix="synthora-batch-"
+                ) as directory:
+                    self.job_id = self._submit(Path(directory) / "batch.jsonl")
+        return self.job_id
+
+    def _submit(self, path: Path) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            for custom_id, body in self.requests.items():
+                line = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.endpoint,
+                    "body": body,
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        return self.submitter.submit(path, self.endpoint)
+
+    def _load(self, result: Dict[str, Any]) -> Union[BaseMessage, Exception]:
+        response = result.get("response") or {}
+        if result.get("error") or response.get("status_code", 200) >= 400:
+            error = result.get("error") or response.get("body", {}).get(
+                "error"
+            )
+            return Exception(f"Batch request failed: {error}")
+        message = BaseMessage.from_openai_chat_response(
+            ChatCompletion.model_validate(response["body"]),
+            self.backend.source,
+        )
+        message.metadata["batch"] = True
+        response_format = self.requests[result["custom_id"]].get(
+            "response_format"
+        )
+        original = self.backend.config.get("response_format")
+        if (
+            response_format is not None
+            and isinstance(original, type)
+            and issubclass(original, BaseModel)
+            and message.content
+        ):
+            try:
+                message.parsed = original.model_validate_json(message.content)
+            except ValueError:
+                message.parsed = None
+        return message
+
+    def wait(self) -> Dict[str, Union[BaseMessage, Exception]]:
+        r"""Wait for the job to end and collect its results.
+
+        Returns:
+            Dict[str, Union[BaseMessage, Exception]]: The response, or the
+                error, of each request by identifier.
+
+        Raises:
+            RuntimeError: If the job failed.
+            TimeoutError: If the job did not end within the timeout.
+        """
+        job_id = self.submit()
+        started = time.monotonic()
+        while (status := self.submitter.status(job_id)) == "pending":
+            if (
+                self.timeout is not None
+                and time.monotonic() - started >= self.timeout
+            ):
+                raise TimeoutError(f"Batch job {job_id} is still pending")
+            time.sleep(self.poll_interval)
+        if status != "completed":
+            raise RuntimeError(f"Batch job {job_id} {status}")
+        results: Dict[str, Union[BaseMessage, Exception]] = {}
+        for result in self.submitter.results(job_id):
+            if result.get("custom_id") not in self.requests:
+                continue
+            results[result["custom_id"]] = loaded = self._load(result)
+            if isinstance(loaded, BaseMessage):
+                self.backend.callback_manager.call(
+                    CallBackEvent.LLM_END,
+                    self.backend.source,
+                    loaded,
+                    **self.requests[result["custom_id"]],
+                )
+        for custom_id in self.requests:
+            results.setdefault(
+                custom_id,
+                Exception(f"No result for batch request {custom_id}"),
+            )
+        return results
+
+    def run(self) -> List[Union[BaseMessage, Exception]]:
+        r"""Submit the job, wait for it and return its results.
+
+        Returns:
+            List[Union[BaseMessage, Exception]]: The response, or the error,
+                of each request in the order they were added.
+        """
+        results = self.wait()
+        return [results[custom_id] for custom_id in self.requests]
@@ -0,0 +1,547 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BackendWrapper, BaseModelBackend
+from synthora.types import ChatCompletionMessageToolCall
+from synthora.types.enums import CallBackEvent
+from synthora.utils.macros import CALL_ASYNC_CALLBACK
+
+
+# Request parameters that change how a response is delivered, not what it is.
+_UNCACHED_PARAMS = ("stream", "stream_options")
+
+
+class ResponseCache(ABC):
+    r"""Base class for stores of model responses keyed by request hash.
+
+    Caches are shared, not copied, when an agent or backend is deep-copied.
+    """
+
+    @staticmethod
+    def make_key(
+        model_type: str,
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+        *args: Any,
+    ) -> str:
+        r"""Get the key of a request.
+
+        The key is a hash of the model type, the serialized messages and the
+        request parameters (tools, response format, sampling parameters),
+        encoded as canonical JSON. Parameters that only change how the
+        response is delivered, such as `stream`, are ignored.
+
+        Args:
+            model_type: The model type.
+            messages: The request messages.
+            params: The request parameters.
+            *args: Additional positional arguments of the request.
+
+        Returns:
+            str: The key of the request.
+        """
+        payload = [
+            model_type,
+            [message.to_openai_message() for message in messages],
+            {k: v for k, v in params.items() if k not in _UNCACHED_PARAMS},
+            list(args),
+        ]
+        data = json.dumps(
+            payload,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=_encode,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[BaseMessage]:
+        r"""Get the response cached under a key.
+
+        Args:
+            key: The request key.
+
+        Returns:
+            Optional[BaseMessage]: The cached response, or None on a miss.
+        """
+        ...
+
+    @abstractmethod
+    def put(self, key: str, message: BaseMessage) -> None:
+        r"""Cache a response.
+
+        Args:
+            key: The request key.
+            message: The response.
+        """
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        r"""Remove all cached responses."""
+        ...
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ResponseCache":
+        return self
+
+
+class InMemoryResponseCache(ResponseCache):
+    r"""In-memory LRU cache of model responses.
+
+    Args:
+        max_size: The maximum number of responses kept, unlimited if None.
+        ttl: The number of seconds a response stays valid, forever if None.
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = 1024, ttl: Optional[float] = None
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, BaseMessage]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, message = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return message.model_copy(deep=True)
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        message = message.model_copy(deep=True)
+        with self._lock:
+            self._entries[key] = (time.time(), message)
+            self._entries.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+
+class DiskResponseCache(ResponseCache):
+    r"""On-disk cache of model responses, one JSON file per request.
+
+    The least recently used responses are removed once the cache holds more
+    than `max_size` responses or `max_bytes` bytes.
+
+    Args:
+        path: The directory holding the cache.
+        max_size: The maximum number of responses kept, unlimited if None.
+        max_bytes: The maximum total size of the cache, unlimited if None.
+        ttl: The number of seconds a response stays valid, forever if None.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        file = self._file(key)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - data["created"] > self.ttl:
+            file.unlink(missing_ok=True)
+            return None
+        try:
+            # The modification time tracks the last use for eviction.
+            os.utime(file)
+        except OSError:
+            pass
+        return _load_message(data["message"])
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        data = json.dumps(
+            {"created": time.time(), "message": _dump_message(message)},
+            ensure_ascii=False,
+        )
+        file = self._file(key)
+        tmp = file.with_name(f"{file.name}.{threading.get_ident()}.tmp")
+        with self._lock:
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, file)
+            self._evict()
+
+    def _evict(self) -> None:
+        r"""Remove the least recently used responses above the limits."""
+        if self.max_size is None and self.max_bytes is None:
+            return
+        entries = []
+        for file in self.path.glob("*.json"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        entries.sort(key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, file in entries:
+            if (self.max_size is None or count <= self.max_size) and (
+                self.max_bytes is None or total <= self.max_bytes
+            ):
+                break
+            file.unlink(missing_ok=True)
+            count -= 1
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for file in self.path.glob("*.json"):
+                file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.path.glob("*.json"))
+
+    def __contains__(self, key: str) -> bool:
+        return self._file(key).exists()
+
+
+def create_cache_from_config(config: Dict[str, Any]) -> ResponseCache:
+    r"""Create a response cache from configuration.
+
+    Args:
+        config: The cache configuration. `type` is either "memory" (the
+            default) or "disk", the other keys are passed to the cache.
+
+    Returns:
+        ResponseCache: The response cache.
+
+    Raises:
+        ValueError: If the cache type is unknown.
+    """
+    config = dict(config)
+    cache_type = config.pop("type", "memory")
+    if cache_type == "memory":
+        return InMemoryResponseCache(**config)
+    if cache_type == "disk":
+        return DiskResponseCache(**config)
+    raise ValueError(f"Unknown response cache type: {cache_type}")
+
+
+class CachedBackend(BackendWrapper):
+    r"""Model backend serving byte-identical requests from a response cache.
+
+    Hits are reported with the LLM_CACHE_HIT callback between the
+    usual LLM_START and LLM_END callbacks. When streaming, a hit is replayed
+    as a single chunk followed by the final message, and a miss is cached
+    once the stream completes. Requests for several completions (`n` > 1)
+    are sampled for their variety and are not cached.
+
+    Attributes:
+        backend: The wrapped backend.
+        cache: The response cache.
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        backend: BaseModelBackend,
+        cache: Optional[ResponseCache] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> "CachedBackend":
+        r"""Return a cached backend using an in-memory cache."""
+        return CachedBackend(
+            backend, cache or InMemoryResponseCache(), handlers
+        )
+
+    def __init__(
+        self,
+        backend: BaseModelBackend,
+        cache: ResponseCache,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        super().__init__(backend, handlers=handlers)
+        self.cache = cache
+
+    def _get_key(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[List[BaseMessage], Dict[str, Any], str]:
+        if not isinstance(messages, list):
+            messages = [messages]
+        params = {**self.config, **kwargs}
+        if "tools" in params and not params["tools"]:
+            del params["tools"]
+        key = self.cache.make_key(self.model_type, messages, params, *args)
+        return messages, params, key
+
+    def _load(self, key: str, params: Dict[str, Any]) -> Optional[BaseMessage]:
+        message = self.cache.get(key)
+        if message is None:
+            return None
+        response_format = params.get("response_format")
+        if (
+            isinstance(message.parsed, dict)
+            and isinstance(response_format, type)
+            and issubclass(response_format, BaseModel)
+        ):
+            message.parsed = response_format.model_validate(message.parsed)
+        return message
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Generate a response, serving it from the cache when possible.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+        """
+        messages, params, key = self._get_key(messages, args, kwargs)
+        if (params.get("n") or 1) > 1:
+            return self.backend.run(messages, *args, **kwargs)
+        message = self._load(key, params)
+        if message is None:
+            response = self.backend.run(messages, *args, **kwargs)
+            if isinstance(response, BaseMessage):
+                self.cache.put(key, response)
+                return response
+
+            def record() -> Generator[BaseMessage, None, None]:
+                message = None
+                for message in response:
+                    yield message
+                if message is not None and message.is_complete:
+                    self.cache.put(key, message)
+
+            return record()
+
+        params["model"] = self.model_type
+        params["messages"] = [m.to_openai_message() for m in messages]
+        self.callback_manager.call(
+            CallBackEvent.LLM_START, self.source, *args, **params
+        )
+        self.callback_manager.call(
+            CallBackEvent.LLM_CACHE_HIT, self.source, message, key
+        )
+        if not params.get("stream"):
+            self.callback_manager.call(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+            return message
+
+        def replay() -> Generator[BaseMessage, None, None]:
+            for chunk in _stream_chunks(message):
+                self.callback_manager.call(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    chunk,
+                    *args,
+                    **params,
+                )
+                yield chunk
+            self.callback_manager.call(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+
+        return replay()
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Generate a response asynchronously, serving it from the cache when
+        possible.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+        """
+        messages, params, key = self._get_key(messages, args, kwargs)
+        if (params.get("n") or 1) > 1:
+            return await self.backend.async_run(messages, *args, **kwargs)
+        message = self._load(key, params)
+        if message is None:
+            response = await self.backend.async_run(messages, *args, **kwargs)
+            if isinstance(response, BaseMessage):
+                self.cache.put(key, response)
+                return response
+
+            async def record() -> AsyncGenerator[BaseMessage, None]:
+                message = None
+                async for message in response:
+                    yield message
+                if message is not None and message.is_complete:
+                    self.cache.put(key, message)
+
+            return record()
+
+        params["model"] = self.model_type
+        params["messages"] = [m.to_openai_message() for m in messages]
+        await CALL_ASYNC_CALLBACK(
+            CallBackEvent.LLM_START, self.source, *args, **params
+        )
+        await CALL_ASYNC_CALLBACK(
+            CallBackEvent.LLM_CACHE_HIT, self.source, message, key
+        )
+        if not params.get("stream"):
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+            return message
+
+        async def replay() -> AsyncGenerator[BaseMessage, None]:
+            for chunk in _stream_chunks(message):
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    chunk,
+                    *args,
+                    **params,
+                )
+                yield chunk
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+
+        return replay()
+
+
+def _encode(value: Any) -> Any:
+    r"""Encode values the json module does not handle for hashing."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {
+            "type": f"{value.__module__}.{value.__qualname__}",
+            "schema": value.model_json_schema(),
+        }
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def _dump_message(message: BaseMessage) -> Dict[str, Any]:
+    return message.model_dump(mode="json", exclude={"origional_response"})
+
+
+def _load_message(data: Dict[str, Any]) -> BaseMessage:
+    message = BaseMessage.model_validate(data)
+    if message.tool_calls:
+        message.tool_calls = [
+            ChatCompletionMessageToolCall.model_validate(tool_call)
+            if isinstance(tool_call, dict)
+            else tool_call
+            for tool_call in message.tool_calls
+        ]
+    return message
+
+
+def _stream_chunks(message: BaseMessage) -> List[BaseMessage]:
+    r"""Split a cached response into the chunks of a stream.
+
+    Args:
+        message: The cached response.
+
+    Returns:
+        List[BaseMessage]: A chunk holding the whole content, unless there is
+            none, followed by the completed message.
+    """
+    chunks = []
+    if message.content:
+        chunk = message.model_copy(deep=True)
+        chunk.chunk = message.content
+        chunk.metadata = {**message.metadata, "finish_reason": None}
+        chunks.append(chunk)
+    final = message.model_copy(deep=True)
+    final.chunk = None
+    chunks.append(final)
+    return chunks
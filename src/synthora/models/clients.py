@@ -0,0 +1,171 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Hashable, Optional, Type, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient
+
+
+T = TypeVar("T")
+
+# Backend keyword arguments configuring the connection pool of a client
+# rather than the client itself.
+POOL_OPTIONS = (
+    "max_connections",
+    "max_keepalive_connections",
+    "keepalive_expiry",
+)
+
+
+class ClientRegistry:
+    r"""Process-wide registry of API clients shared by model backends.
+
+    Clients are keyed by their type and the keyword arguments they are
+    created with (API key, base URL, ...), so every backend instance and
+    every copy of it targeting the same deployment reuses one connection
+    pool. Sync clients are shared by all threads. Async clients are bound to
+    the event loop they are created in, so one is kept per loop and dropped
+    with the loop.
+
+    The pool options `max_connections`, `max_keepalive_connections` and
+    `keepalive_expiry` may be given with the client keyword arguments, or
+    set for all clients with `set_pool_options`.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[Hashable, Any] = {}
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, Dict[Hashable, Any]
+        ] = weakref.WeakKeyDictionary()
+        self._pool_options: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def set_pool_options(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+    ) -> None:
+        r"""Set the default connection pool options of new clients.
+
+        Options left to None keep the defaults of the OpenAI SDK. Clients
+        that already exist are not affected.
+
+        Args:
+            max_connections: The maximum number of connections.
+            max_keepalive_connections: The maximum number of idle
+                connections kept alive.
+            keepalive_expiry: The number of seconds an idle connection is
+                kept alive.
+        """
+        options = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+        }
+        with self._lock:
+            self._pool_options = {
+                k: v for k, v in options.items() if v is not None
+            }
+
+    @staticmethod
+    def make_key(client_type: type, kwargs: Dict[str, Any]) -> Hashable:
+        r"""Get the key of a client.
+
+        Args:
+            client_type: The type of the client.
+            kwargs: The keyword arguments of the client.
+
+        Returns:
+            Hashable: The key of the client.
+        """
+        return (
+            f"{client_type.__module__}.{client_type.__qualname__}",
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
+
+    def _create(self, client_type: Type[T], kwargs: Dict[str, Any]) -> T:
+        kwargs = dict(kwargs)
+        options = {
+            **self._pool_options,
+            **{k: kwargs.pop(k) for k in POOL_OPTIONS if k in kwargs},
+        }
+        if options and "http_client" not in kwargs:
+            limits = httpx.Limits(
+                max_connections=options.get("max_connections", 1000),
+                max_keepalive_connections=options.get(
+                    "max_keepalive_connections", 100
+                ),
+                keepalive_expiry=options.get("keepalive_expiry", 5.0),
+            )
+            if issubclass(client_type, AsyncOpenAI):
+                kwargs["http_client"] = DefaultAsyncHttpxClient(limits=limits)
+            else:
+                kwargs["http_client"] = DefaultHttpxClient(limits=limits)
+        return client_type(**kwargs)
+
+    def get(self, client_type: Type[T], kwargs: Dict[str, Any]) -> T:
+        r"""Get the shared client of a type, creating it if needed.
+
+        Args:
+            client_type: The type of the client.
+            kwargs: The keyword arguments of the client.
+
+        Returns:
+            T: The client.
+        """
+        key = (
+            self.make_key(client_type, kwargs),
+            tuple(sorted(self._pool_options.items())),
+        )
+        clients = self._clients
+        if issubclass(client_type, AsyncOpenAI):
+            try:
+                loop: Optional[asyncio.AbstractEventLoop]
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                clients = self._async_clients.get(loop)  # type: ignore[assignment]
+                if clients is None:
+                    with self._lock:
+                        clients = self._async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is not None:
+            return client  # type: ignore[no-any-return]
+        with self._lock:
+            if (client := clients.get(key)) is None:
+                client = clients[key] = self._create(client_type, kwargs)
+            return client  # type: ignore[no-any-return]
+
+    def clear(self) -> None:
+        r"""Forget all clients. Clients in use keep working."""
+        with self._lock:
+            self._clients.clear()
+            self._async_clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients) + sum(
+            len(clients) for clients in self._async_clients.values()
+        )
+
+
+CLIENT_REGISTRY = ClientRegistry()
@@ -0,0 +1,438 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import copy_context
+from typing import (
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.configs.model_config import ModelConfig
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BackendWrapper, BaseModelBackend
+
+
+# The response, its first chunk if streamed, and the time it took to get
+# the response or the first chunk.
+_Outcome = Tuple[Any, Optional[BaseMessage], float]
+
+
+class _HedgeStats:
+    r"""Recent latencies and hedging decisions, shared by the copies of a
+    hedged backend."""
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.hedged: Deque[bool] = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_HedgeStats":
+        return self
+
+    def threshold(
+        self, percentile: float, min_samples: int
+    ) -> Optional[float]:
+        r"""Get the latency percentile, or None without enough samples."""
+        with self.lock:
+            if len(self.latencies) < max(1, min_samples):
+                return None
+            values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(percentile * len(values)))]
+
+    def record(self, latency: float, hedged: bool = False) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            if not hedged:
+                self.hedged.append(False)
+
+    def allow_hedge(self, max_rate: float) -> bool:
+        r"""Reserve a hedge if the hedge rate stays within `max_rate`."""
+        with self.lock:
+            if sum(self.hedged) + 1 > max_rate * (len(self.hedged) + 1):
+                return False
+            self.hedged.append(True)
+            return True
+
+
+class HedgedBackend(BackendWrapper):
+    r"""Model backend sending a duplicate request when a response is slow.
+
+    When the response, or the first chunk of a streamed response, takes
+    longer than the `percentile` of recent latencies, the request is sent
+    again to `alternate`, or to the wrapped backend itself. The first
+    successful response is kept and the other is cancelled: async requests
+    are cancelled outright, sync requests cannot be interrupted once sent, so
+    a late sync response is just dropped and its stream closed. Hedging
+    starts once `min_samples` latencies are known, and at most `max_rate` of
+    recent requests are hedged to bound the extra cost.
+
+    Wrapping a `RouterBackend` sends hedges to another deployment, picked by
+    the router's strategy.
+
+    Args:
+        backend: The backend to wrap.
+        alternate: The backend receiving hedges, as an instance or a model
+            configuration. Defaults to the wrapped backend.
+        percentile: The latency percentile after which to hedge.
+            Defaults to 0.95.
+        max_rate: The maximum fraction of hedged requests. Defaults to 0.1.
+        min_samples: The number of latencies needed before hedging.
+            Defaults to 20.
+        window: The number of recent requests the percentile and the hedge
+            rate are computed on. Defaults to 200.
+        handlers: Callback handlers.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        r"""Get the executor shared by all hedged sync requests.
+
+        Returns:
+            ThreadPoolExecutor: The shared executor.
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        thread_name_prefix="synthora-hedge"
+                    )
+        return cls._executor
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        backend: BaseModelBackend,
+        alternate: Optional[BaseModelBackend] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> "HedgedBackend":
+        r"""Return a hedged backend."""
+        return HedgedBackend(backend, alternate, handlers=handlers)
+
+    def __init__(
+        self,
+        backend: BaseModelBackend,
+        alternate: Optional[
+            Union[BaseModelBackend, ModelConfig, Dict[str, Any]]
+        ] = None,
+        percentile: float = 0.95,
+        max_rate: float = 0.1,
+        min_samples: int = 20,
+        window: int = 200,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError(f"Invalid hedging percentile: {percentile}")
+        if alternate is not None and not isinstance(
+            alternate, BaseModelBackend
+        ):
+            from synthora.models import create_model_from_config
+
+            if not isinstance(alternate, ModelConfig):
+                alternate = ModelConfig.from_dict(alternate)
+            alternate = create_model_from_config(  # type: ignore[assignment]
+                alternate, backend.source
+            )
+        super().__init__(backend, handlers=handlers)
+        self.alternate: Optional[BaseModelBackend] = alternate  # type: ignore[assignment]
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.stats = _HedgeStats(window)
+
+    def _alternate(
+        self, kwargs: Dict[str, Any]
+    ) -> Tuple[BaseModelBackend, Dict[str, Any]]:
+        r"""Get the backend receiving hedges and its keyword arguments.
+
+        An alternate backend gets the configuration of the wrapped backend,
+        tools included, with each request.
+        """
+        if self.alternate is None:
+            return self.backend, kwargs
+        return self.alternate, {**self.config, "stream": self.stream, **kwargs}
+
+    @staticmethod
+    def _call(
+        backend: BaseModelBackend,
+        messages: Union[List[BaseMessage], BaseMessage],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> _Outcome:
+        started = time.monotonic()
+        response = backend.run(messages, *args, **kwargs)
+        first = None
+        if not isinstance(response, (BaseMessage, list)):
+            try:
+                first = next(response, None)
+            except BaseException as e:
+                response.close()
+                raise e
+        return response, first, time.monotonic() - started
+
+    @staticmethod
+    async def _async_call(
+        backend: BaseModelBackend,
+        messages: Union[List[BaseMessage], BaseMessage],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> _Outcome:
+        started = time.monotonic()
+        response = await backend.async_run(messages, *args, **kwargs)
+        first = None
+        if not isinstance(response, (BaseMessage, list)):
+            try:
+                first = await response.__anext__()
+            except StopAsyncIteration:
+                pass
+            except BaseException as e:
+                # Cancelled losers close their stream, releasing what the
+                # wrapped backend holds for it.
+                await response.aclose()
+                raise e
+        return response, first, time.monotonic() - started
+
+    @staticmethod
+    def _discard(future: "Future[_Outcome]") -> None:
+        r"""Drop a losing request, closing its stream once it arrives."""
+
+        def close(future: "Future[_Outcome]") -> None:
+            if future.cancelled() or future.exception() is not None:
+                return
+            response = future.result()[0]
+            if not isinstance(response, (BaseMessage, list)):
+                response.close()
+
+        if not future.cancel():
+            future.add_done_callback(close)
+
+    @staticmethod
+    async def _async_discard(task: "asyncio.Future[_Outcome]") -> None:
+        r"""Cancel a losing request and wait until the wrapped backend has
+        cleaned it up, closing its stream if it arrived."""
+        task.cancel()
+        await asyncio.wait([task])
+        if task.cancelled() or task.exception() is not None:
+            return
+        response = task.result()[0]
+        if not isinstance(response, (BaseMessage, list)):
+            await response.aclose()
+
+    @staticmethod
+    def _primary_latency(
+        outcome: _Outcome, primary_won: bool, started: float
+    ) -> float:
+        r"""Get the latency to record for the primary request.
+
+        When the hedge wins, the primary is still running or has failed, and
+        the time it has taken so far is a lower bound of its latency.
+        Recording only the hedge's latency would bias the percentile down.
+        """
+        if primary_won:
+            return outcome[2]
+        return time.monotonic() - started
+
+    def _result(
+        self, outcome: _Outcome
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        response, first, _ = outcome
+        if isinstance(response, (BaseMessage, list)):
+            return response
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            if first is None:
+                return
+            yield first
+            yield from response
+
+        return stream()
+
+    def _async_result(
+        self, outcome: _Outcome
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        response, first, _ = outcome
+        if isinstance(response, (BaseMessage, list)):
+            return response
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            if first is None:
+                return
+            yield first
+            async for message in response:
+                yield message
+
+        return stream()
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Run the wrapped model, hedging slow requests.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+        """
+        backend = self.backend
+        threshold = self.stats.threshold(self.percentile, self.min_samples)
+        if threshold is None:
+            outcome = self._call(backend, messages, args, kwargs)
+            self.stats.record(outcome[2])
+            return self._result(outcome)
+        executor = self.get_executor()
+        started = time.monotonic()
+        futures = [
+            executor.submit(
+                copy_context().run, self._call, backend, messages, args, kwargs
+            )
+        ]
+        hedged = False
+        if not wait(futures, timeout=threshold).done:
+            if hedged := self.stats.allow_hedge(self.max_rate):
+                alternate, params = self._alternate(kwargs)
+                futures.append(
+                    executor.submit(
+                        copy_context().run,
+                        self._call,
+                        alternate,
+                        messages,
+                        args,
+                        params,
+                    )
+                )
+        pending = set(futures)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [f for f in done if f.exception() is None]
+            winner = succeeded[0] if succeeded else done.pop()
+            if succeeded or not pending:
+                break
+        for future in futures:
+            if future is not winner:
+                self._discard(future)
+        outcome = winner.result()
+        self.stats.record(
+            self._primary_latency(outcome, winner is futures[0], started),
+            hedged,
+        )
+        return self._result(outcome)
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Run the wrapped model asynchronously, hedging slow requests.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+        """
+        backend = self.backend
+        threshold = self.stats.threshold(self.percentile, self.min_samples)
+        if threshold is None:
+            outcome = await self._async_call(backend, messages, args, kwargs)
+            self.stats.record(outcome[2])
+            return self._async_result(outcome)
+        started = time.monotonic()
+        tasks = [
+            asyncio.ensure_future(
+                self._async_call(backend, messages, args, kwargs)
+            )
+        ]
+        hedged = False
+        winner: Optional[asyncio.Future[_Outcome]] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done:
+                if hedged := self.stats.allow_hedge(self.max_rate):
+                    alternate, params = self._alternate(kwargs)
+                    tasks.append(
+                        asyncio.ensure_future(
+                            self._async_call(alternate, messages, args, params)
+                        )
+                    )
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [t for t in done if t.exception() is None]
+                winner = succeeded[0] if succeeded else done.pop()
+                if succeeded or not pending:
+                    break
+        finally:
+            await asyncio.gather(
+                *(
+                    self._async_discard(task)
+                    for task in tasks
+                    if task is not winner
+                )
+            )
+        outcome = winner.result()  # type: ignore[union-attr]
+        self.stats.record(
+            self._primary_latency(outcome, winner is tasks[0], started),
+            hedged,
+        )
+        return self._async_result(outcome)
@@ -0,0 +1,662 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import httpx
+from openai import InternalServerError, RateLimitError
+from pydantic import BaseModel
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.messages.base import BaseMessage
+from synthora.messages.stream import create_accumulator
+from synthora.models.base import BaseModelBackend
+from synthora.types import (
+    ChatCompletionChunk,
+    ChatCompletionMessageToolCall,
+    CompletionUsage,
+)
+from synthora.types.enums import (
+    CallBackEvent,
+    MessageRole,
+    ModelBackendType,
+    NodeType,
+)
+from synthora.types.node import Node
+from synthora.utils.macros import CALL_ASYNC_CALLBACK
+
+
+# A latency: a number of seconds, or a distribution such as
+# {"distribution": "lognormal", "median": 0.4, "sigma": 0.5}.
+LatencySpec = Union[float, Dict[str, Any]]
+
+# The content, tool calls and parsed object of a response choice.
+_Choice = Tuple[Optional[str], List[ChatCompletionMessageToolCall], Any]
+
+_TOKEN_PATTERN = re.compile(r"\s*\S{1,4}|\s+")
+
+_MOCK_REQUEST = httpx.Request("POST", "http://mock/v1/chat/completions")
+
+# Guards the script position and random generator of mock backends.
+_MOCK_LOCK = threading.Lock()
+
+
+def sample_latency(spec: Optional[LatencySpec], rng: random.Random) -> float:
+    r"""Sample a latency in seconds.
+
+    Supported distributions are `constant` (`value`), `uniform` (`low`,
+    `high`), `normal` (`mean`, `std`), `lognormal` (`median`, `sigma`) and
+    `exponential` (`mean`).
+
+    Args:
+        spec: The latency, or its distribution.
+        rng: The random generator.
+
+    Returns:
+        float: The latency, never negative.
+    """
+    if spec is None:
+        return 0.0
+    if not isinstance(spec, dict):
+        return max(0.0, float(spec))
+    match spec.get("distribution", "constant"):
+        case "constant":
+            value = spec.get("value", 0.0)
+        case "uniform":
+            value = rng.uniform(spec.get("low", 0.0), spec["high"])
+        case "normal":
+            value = rng.gauss(spec["mean"], spec.get("std", 0.0))
+        case "lognormal":
+            value = spec["median"] * rng.lognormvariate(
+                0.0, spec.get("sigma", 0.0)
+            )
+        case "exponential":
+            value = rng.expovariate(1 / spec["mean"])
+        case distribution:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+    return max(0.0, float(value))
+
+
+def _tokenize(text: str) -> List[str]:
+    r"""Split text into pieces of about one token each."""
+    return _TOKEN_PATTERN.findall(text)
+
+
+class MockBackend(BaseModelBackend):
+    """Offline model backend with scripted responses and simulated latency.
+
+    Responses are taken in turn from `responses`, cycling when exhausted,
+    or else built from `template`. A response is either a string, or a
+    dict with `content`, `tool_calls` (a list of `{"name", "arguments"}`)
+    and `parsed` (the `response_format` object, as a dict). The template is
+    formatted with `last` (the content of the last message), `turn` (the
+    number of the request) and `model`. When a `response_format` is
+    requested without a scripted `parsed` value, JSON content is parsed
+    into it. A request for several completions (`n`)
+    takes one response per choice.
+
+    Latency follows a time to first token (`ttft`) and a generation rate
+    (`tokens_per_second`), each scaled by a random factor within `jitter`;
+    streamed responses emit one chunk per token at that rate. A fraction
+    `rate_limit_rate` of requests fail at once with a 429 error carrying
+    `retry_after`, and a fraction `error_rate` fail after the time to first
+    token with a 500 error. Both are the errors the OpenAI SDK raises.
+
+    Attributes:
+        model_type:
+            The model name reported in responses. Defaults to "mock".
+        source:
+            Source node for the messages.
+        config:
+            Additional configuration parameters. Defaults to None.
+        name:
+            Backend name identifier. Defaults to None.
+        responses:
+            Scripted responses. Defaults to None.
+        template:
+            Template of the responses when none are scripted.
+        ttft:
+            Time to first token, in seconds or as a distribution.
+        tokens_per_second:
+            Generation rate, or None to generate instantly.
+        jitter:
+            Maximum relative variation of each delay. Defaults to 0.
+        error_rate:
+            Fraction of requests failing with a server error.
+        rate_limit_rate:
+            Fraction of requests failing with a rate limit error.
+        retry_after:
+            Retry-after delay of rate limit errors, in seconds.
+        seed:
+            Seed of the random generator, for reproducible runs.
+        handlers:
+            Callback handlers. Defaults to [].
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        responses: Optional[List[Union[str, Dict[str, Any]]]] = None,
+        model_type: str = "mock",
+        source: Optional[Node] = None,
+        config: Optional[Dict[str, Any]] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+        **kwargs: Any,
+    ) -> "MockBackend":
+        r"""Return an instant mock backend."""
+        return MockBackend(
+            model_type,
+            source,
+            config=config,
+            responses=responses,
+            handlers=handlers,
+            **kwargs,
+        )
+
+    def __init__(
+        self,
+        model_type: str = "mock",
+        source: Optional[Node] = None,
+        config: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        responses: Optional[List[Union[str, Dict[str, Any]]]] = None,
+        template: str = "Mock response to: {last}",
+        ttft: Optional[LatencySpec] = None,
+        tokens_per_second: Optional[float] = None,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        source = source or Node(name=model_type, type=NodeType.AGENT)
+        super().__init__(
+            model_type=model_type,
+            source=source,
+            backend_type=ModelBackendType.MOCK,
+            config=config,
+            name=name or source.name,
+            handlers=handlers or [],
+        )
+        self.responses = list(responses or [])
+        self.template = template
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.turn = 0
+
+    def _delay(self, spec: Optional[LatencySpec]) -> float:
+        delay = sample_latency(spec, self.rng)
+        if self.jitter:
+            delay *= self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, delay)
+
+    def _token_delay(self) -> float:
+        if not self.tokens_per_second:
+            return 0.0
+        return self._delay(1 / self.tokens_per_second)
+
+    def _next(
+        self, messages: List[BaseMessage], params: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[Exception], float]:
+        r"""Draw the next response, its error and its time to first token."""
+        with _MOCK_LOCK:
+            self.turn += 1
+            turn = self.turn
+            draw = self.rng.random()
+            ttft = self._delay(self.ttft)
+            if self.responses:
+                item = self.responses[(turn - 1) % len(self.responses)]
+            else:
+                item = self.template.format(
+                    last=messages[-1].content if messages else "",
+                    turn=turn,
+                    model=self.model_type,
+                )
+        error: Optional[Exception] = None
+        if draw < self.rate_limit_rate:
+            error = RateLimitError(
+                "Mock rate limit exceeded",
+                response=httpx.Response(
+                    429,
+                    headers={"retry-after": str(self.retry_after)},
+                    request=_MOCK_REQUEST,
+                ),
+                body=None,
+            )
+        elif draw < self.rate_limit_rate + self.error_rate:
+            error = InternalServerError(
+                "Mock server error",
+                response=httpx.Response(500, request=_MOCK_REQUEST),
+                body=None,
+            )
+        spec = {"content": item} if isinstance(item, str) else dict(item)
+        return spec, error, ttft
+
+    def _build(
+        self,
+        spec: Dict[str, Any],
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+    ) -> Tuple[Optional[str], List[ChatCompletionMessageToolCall], Any]:
+        r"""Build the content, tool calls and parsed object of a response."""
+        content = spec.get("content")
+        parsed = None
+        response_format = params.get("response_format")
+        if isinstance(response_format, type) and issubclass(
+            response_format, BaseModel
+        ):
+            if spec.get("parsed") is not None:
+                parsed = response_format.model_validate(spec["parsed"])
+                if content is None:
+                    content = parsed.model_dump_json()
+            elif content is not None:
+                try:
+                    parsed = response_format.model_validate_json(content)
+                except ValueError:
+                    parsed = None
+        tool_calls = []
+        for i, call in enumerate(spec.get("tool_calls") or []):
+            arguments = call.get("arguments", {})
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments)
+            tool_calls.append(
+                ChatCompletionMessageToolCall(
+                    id=call.get("id") or f"call_mock_{self.turn}_{i}",
+                    type="function",
+                    function={"name": call["name"], "arguments": arguments},
+                )
+            )
+        return content, tool_calls, parsed
+
+    @staticmethod
+    def _usage(
+        messages: List[BaseMessage], pieces: List[str]
+    ) -> CompletionUsage:
+        prompt = sum(len(m.content or "") for m in messages) // 4 + 1
+        return CompletionUsage(
+            prompt_tokens=prompt,
+            completion_tokens=len(pieces),
+            total_tokens=prompt + len(pieces),
+        )
+
+    def _chunks(
+        self,
+        content: Optional[str],
+        tool_calls: List[ChatCompletionMessageToolCall],
+        usage: Optional[CompletionUsage],
+        index: int = 0,
+    ) -> List[ChatCompletionChunk]:
+        base = {
+            "id": f"chatcmpl-mock-{self.turn}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": self.model_type,
+        }
+
+        def chunk(delta: Any, finish_reason: Optional[str] = None) -> Any:
+            choices = []
+            if delta is not None:
+                choices = [
+                    {
+                        "index": index,
+                        "delta": delta,
+                        "finish_reason": finish_reason,
+                    }
+                ]
+            return ChatCompletionChunk.model_validate(
+                {**base, "choices": choices}
+            )
+
+        chunks = [
+            chunk({"role": "assistant", "content": piece})
+            for piece in _tokenize(content or "")
+        ]
+        for i, call in enumerate(tool_calls):
+            chunks.append(
+                chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": i,
+                                "id": call.id,
+                                "type": "function",
+                                "function": {
+                                    "name": call.function.name,
+                                    "arguments": "",
+                                },
+                            }
+                        ]
+                    }
+                )
+            )
+            for piece in _tokenize(call.function.arguments):
+                chunks.append(
+                    chunk(
+                        {
+                            "tool_calls": [
+                                {"index": i, "function": {"arguments": piece}}
+                            ]
+                        }
+                    )
+                )
+        chunks.append(chunk({}, "tool_calls" if tool_calls else "stop"))
+        if usage is not None:
+            chunks.append(
+                ChatCompletionChunk.model_validate(
+                    {**base, "choices": [], "usage": usage.model_dump()}
+                )
+            )
+        return chunks
+
+    def _prepare(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+        if not isinstance(messages, list):
+            messages = [messages]
+        kwargs = {**self.config, **kwargs}
+        if "tools" in kwargs and not kwargs["tools"]:
+            del kwargs["tools"]
+        kwargs["model"] = self.model_type
+        kwargs["messages"] = [m.to_openai_message() for m in messages]
+        return messages, kwargs
+
+    def _response(
+        self,
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+        content: Optional[str],
+        tool_calls: List[ChatCompletionMessageToolCall],
+        parsed: Any,
+    ) -> Tuple[BaseMessage, float]:
+        r"""Build a whole response and its generation time."""
+        pieces = _tokenize(content or "") + [
+            piece
+            for call in tool_calls
+            for piece in _tokenize(call.function.arguments)
+        ]
+        usage = self._usage(messages, pieces)
+        message = BaseMessage.trusted(
+            id=f"chatcmpl-mock-{self.turn}",
+            source=self.source,
+            role=MessageRole.ASSISTANT,
+            content=content if content is not None or tool_calls else "",
+            tool_calls=tool_calls or None,
+            parsed=parsed,
+            metadata={
+                "created": int(time.time()),
+                "model": self.model_type,
+                "service_tier": None,
+                "system_fingerprint": None,
+                "usage": usage,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            },
+        )
+        return message, sum(self._token_delay() for _ in pieces)
+
+    def _choices(
+        self,
+        spec: Dict[str, Any],
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+    ) -> List[_Choice]:
+        r"""Build the choices of a request, each of the `n` choices taking
+        the next response."""
+        choices = [self._build(spec, messages, params)]
+        for _ in range((params.get("n") or 1) - 1):
+            spec = self._next(messages, params)[0]
+            choices.append(self._build(spec, messages, params))
+        return choices
+
+    def _responses(
+        self,
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+        choices: List[_Choice],
+    ) -> Tuple[Union[BaseMessage, List[BaseMessage]], float]:
+        r"""Build a whole response, a list of messages for several choices,
+        and its generation time."""
+        results = [
+            self._response(messages, params, *choice) for choice in choices
+        ]
+        duration = max(duration for _, duration in results)
+        if len(results) == 1:
+            return results[0][0], duration
+        completion = 0
+        for i, (result, _) in enumerate(results):
+            result.metadata["index"] = i
+            completion += result.metadata["usage"].completion_tokens
+            if i < len(results) - 1:
+                result.metadata["usage"] = None
+        usage = results[-1][0].metadata["usage"]
+        usage.completion_tokens = completion
+        usage.total_tokens = usage.prompt_tokens + completion
+        return [result for result, _ in results], duration
+
+    def _stream_chunks(
+        self,
+        messages: List[BaseMessage],
+        params: Dict[str, Any],
+        choices: List[_Choice],
+    ) -> List[ChatCompletionChunk]:
+        r"""Build the chunks of a streamed response, choice after choice."""
+        usage = None
+        if (params.get("stream_options") or {}).get("include_usage"):
+            pieces = [
+                piece
+                for content, tool_calls, _ in choices
+                for piece in _tokenize(content or "")
+                + [
+                    piece
+                    for call in tool_calls
+                    for piece in _tokenize(call.function.arguments)
+                ]
+            ]
+            usage = self._usage(messages, pieces)
+        chunks = []
+        for i, (content, tool_calls, _) in enumerate(choices):
+            last = i == len(choices) - 1
+            chunks.extend(
+                self._chunks(content, tool_calls, usage if last else None, i)
+            )
+        return chunks
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Synchronously generate a mock chat completion.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
+        """
+        messages, kwargs = self._prepare(messages, kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
+        if stream:
+            self._request_stream_usage(kwargs)
+        self.callback_manager.call(
+            CallBackEvent.LLM_START, self.source, *args, **kwargs
+        )
+        spec, error, ttft = self._next(messages, kwargs)
+        if error is not None:
+            if not isinstance(error, RateLimitError):
+                time.sleep(ttft)
+            self.callback_manager.call(
+                CallBackEvent.LLM_ERROR, self.source, error, *args, **kwargs
+            )
+            raise error
+        choices = self._choices(spec, messages, kwargs)
+        if not stream:
+            result, duration = self._responses(messages, kwargs, choices)
+            time.sleep(ttft + duration)
+            for message in result if isinstance(result, list) else [result]:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    message,
+                    *args,
+                    **kwargs,
+                )
+            return result
+
+        chunks = self._stream_chunks(messages, kwargs, choices)
+
+        def stream_messages() -> Generator[BaseMessage, None, None]:
+            time.sleep(ttft)
+            accumulator = create_accumulator(self.source, len(choices))
+            previous_message = None
+            for previous_message in accumulator.stream(chunks):
+                if previous_message.chunk is None:
+                    index = previous_message.metadata.get("index", 0)
+                    previous_message.parsed = choices[index][2]
+                self.callback_manager.call(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    previous_message,
+                    *args,
+                    **kwargs,
+                )
+                yield previous_message
+                if previous_message.chunk is not None:
+                    time.sleep(self._token_delay())
+            self.callback_manager.call(
+                CallBackEvent.LLM_END,
+                self.source,
+                previous_message,
+                *args,
+                **kwargs,
+            )
+
+        return stream_messages()
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Asynchronously generate a mock chat completion.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+            A list of messages when several completions are requested with n.
+        """
+        messages, kwargs = self._prepare(messages, kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
+        if stream:
+            self._request_stream_usage(kwargs)
+        await CALL_ASYNC_CALLBACK(
+            CallBackEvent.LLM_START, self.source, *args, **kwargs
+        )
+        spec, error, ttft = self._next(messages, kwargs)
+        if error is not None:
+            if not isinstance(error, RateLimitError):
+                await asyncio.sleep(ttft)
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_ERROR, self.source, error, *args, **kwargs
+            )
+            raise error
+        choices = self._choices(spec, messages, kwargs)
+        if not stream:
+            result, duration = self._responses(messages, kwargs, choices)
+            await asyncio.sleep(ttft + duration)
+            for message in result if isinstance(result, list) else [result]:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    message,
+                    *args,
+                    **kwargs,
+                )
+            return result
+
+        chunks = self._stream_chunks(messages, kwargs, choices)
+
+        async def stream_messages() -> AsyncGenerator[BaseMessage, None]:
+            await asyncio.sleep(ttft)
+            accumulator = create_accumulator(self.source, len(choices))
+            previous_message = None
+            for previous_message in accumulator.stream(chunks):
+                if previous_message.chunk is None:
+                    index = previous_message.metadata.get("index", 0)
+                    previous_message.parsed = choices[index][2]
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    previous_message,
+                    *args,
+                    **kwargs,
+                )
+                yield previous_message
+                if previous_message.chunk is not None:
+                    await asyncio.sleep(self._token_delay())
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_END,
+                self.source,
+                previous_message,
+                *args,
+                **kwargs,
+            )
+
+        return stream_messages()
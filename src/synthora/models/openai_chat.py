@@ -33,6 +33,7 @@ from synthora.callbacks.base_handler import (
     BaseCallBackHandler,
 )
 from synthora.messages.base import BaseMessage
+from synthora.messages.stream import create_accumulator
 from synthora.models.base import BaseModelBackend
 from synthora.types.enums import CallBackEvent, ModelBackendType, NodeType
 from synthora.types.node import Node
@@ -59,7 +60,9 @@ class OpenAIChatBackend(BaseModelBackend):
         handlers:
             Callback handlers. Defaults to [].
         kwargs:
-            Additional keyword arguments for OpenAI client.
+            Additional keyword arguments for OpenAI client. The connection
+            pool options max_connections, max_keepalive_connections and
+            keepalive_expiry are also accepted.
     """
 
     @staticmethod
@@ -121,21 +124,17 @@ class OpenAIChatBackend(BaseModelBackend):
         self.kwargs["api_key"] = self.api_key
         if self.base_url is not None:
             self.kwargs["base_url"] = self.base_url
-        if isinstance(self.callback_manager, AsyncCallBackHandler):
-            self.client = AsyncOpenAI(**self.kwargs)
-        else:
-            self.client = OpenAI(**self.kwargs)
-
-        # Lazy initialization of the OpenAI client
-        # This is done to avoid copy errors when pickling the model backend
-        self.client = None
+        # Clients are created on first use and shared through the client
+        # registry, see `BaseModelBackend._get_client`.
 
     def run(
         self,
         messages: Union[List[BaseMessage], BaseMessage],
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, Generator[BaseMessage, None, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
         """Synchronously generate chat completions.
 
         Args:
@@ -146,18 +145,20 @@ class OpenAIChatBackend(BaseModelBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, OpenAI):
-            self.client = OpenAI(**self.kwargs)
+        client = self._get_client(OpenAI, self.kwargs)
         if not isinstance(messages, list):
             messages = [messages]
-        stream = self.config.get("stream", False)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         messages = [message.to_openai_message() for message in messages]
         kwargs = {**self.config, **kwargs}
         if "tools" in kwargs and not kwargs["tools"]:
             del kwargs["tools"]
         kwargs["model"] = self.model_type
         kwargs["messages"] = messages
+        if stream:
+            self._request_stream_usage(kwargs)
         self.callback_manager.call(
             CallBackEvent.LLM_START,
             self.source,
@@ -166,9 +167,9 @@ class OpenAIChatBackend(BaseModelBackend):
         )
         try:
             if kwargs.get("response_format", None) is not None:
-                resp = self.client.beta.chat.completions.parse(*args, **kwargs)
+                resp = client.beta.chat.completions.parse(*args, **kwargs)
             else:
-                resp = self.client.chat.completions.create(*args, **kwargs)
+                resp = client.chat.completions.create(*args, **kwargs)
         except Exception as e:
             self.callback_manager.call(
                 CallBackEvent.LLM_ERROR, self.source, e, *args, **kwargs
@@ -179,12 +180,9 @@ class OpenAIChatBackend(BaseModelBackend):
             def stream_messages() -> Generator[BaseMessage, None, None]:
                 try:
                     previous_message = None
-                    for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).stream(resp):
                         self.callback_manager.call(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -212,6 +210,13 @@ class OpenAIChatBackend(BaseModelBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END, self.source, result, *args, **kwargs
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             self.callback_manager.call(
@@ -224,7 +229,9 @@ class OpenAIChatBackend(BaseModelBackend):
         messages: Union[List[BaseMessage], BaseMessage],
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, AsyncGenerator[BaseMessage, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
         """Asynchronously generate chat completions.
 
         Args:
@@ -235,16 +242,18 @@ class OpenAIChatBackend(BaseModelBackend):
         Returns:
             Generated response(s).
             If stream=True, returns an async generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AsyncOpenAI):
-            self.client = AsyncOpenAI(**self.kwargs)
+        client = self._get_client(AsyncOpenAI, self.kwargs)
         if not isinstance(messages, list):
             messages = [messages]
-        stream = self.config.get("stream", False)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         messages = [message.to_openai_message() for message in messages]
         kwargs = {**self.config, **kwargs}
         kwargs["model"] = self.model_type
         kwargs["messages"] = messages
+        if stream:
+            self._request_stream_usage(kwargs)
         if "tools" in kwargs and not kwargs["tools"]:
             del kwargs["tools"]
         await CALL_ASYNC_CALLBACK(
@@ -255,13 +264,11 @@ class OpenAIChatBackend(BaseModelBackend):
         )
         try:
             if kwargs.get("response_format", None) is not None:
-                resp = await self.client.beta.chat.completions.parse(
+                resp = await client.beta.chat.completions.parse(
                     *args, **kwargs
                 )
             else:
-                resp = await self.client.chat.completions.create(
-                    *args, **kwargs
-                )
+                resp = await client.chat.completions.create(*args, **kwargs)
         except Exception as e:
             await CALL_ASYNC_CALLBACK(
                 CallBackEvent.LLM_ERROR, self.source, e, *args, **kwargs
@@ -272,12 +279,9 @@ class OpenAIChatBackend(BaseModelBackend):
             async def stream_messages() -> AsyncGenerator[BaseMessage, None]:
                 try:
                     previous_message = None
-                    async for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    async for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).async_stream(resp):  # type: ignore[arg-type]
                         await CALL_ASYNC_CALLBACK(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -306,6 +310,13 @@ class OpenAIChatBackend(BaseModelBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END, self.source, result, *args, **kwargs
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             await CALL_ASYNC_CALLBACK(
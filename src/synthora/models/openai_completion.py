@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 
+import asyncio
 from typing import (
     Any,
     AsyncGenerator,
@@ -22,6 +23,8 @@ from typing import (
     Generator,
     List,
     Optional,
+    Sequence,
+    Tuple,
     Union,
 )
 
@@ -32,6 +35,7 @@ from synthora.callbacks.base_handler import (
     BaseCallBackHandler,
 )
 from synthora.messages.base import BaseMessage
+from synthora.messages.stream import create_accumulator
 from synthora.models.openai_chat import OpenAIChatBackend
 from synthora.types.enums import CallBackEvent, MessageRole
 from synthora.types.node import Node
@@ -58,7 +62,9 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         handlers:
             Callback handlers. Defaults to [].
         kwargs:
-            Additional keyword arguments for OpenAI client.
+            Additional keyword arguments for OpenAI client. The connection
+            pool options max_connections, max_keepalive_connections and
+            keepalive_expiry are also accepted.
     """
 
     @staticmethod
@@ -91,7 +97,9 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         prompt: Union[str, BaseMessage],  # type: ignore[override]
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, Generator[BaseMessage, None, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
         """Synchronously generate completions.
 
         Args:
@@ -105,10 +113,10 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, OpenAI):
-            self.client = OpenAI(**self.kwargs)
-        stream = self.config.get("stream", False)
+        client = self._get_client(OpenAI, self.kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         if isinstance(prompt, str):
             prompt = BaseMessage(
                 content=prompt, role=MessageRole.USER, source=self.source
@@ -116,6 +124,8 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         kwargs["prompt"] = prompt.content
         kwargs["model"] = self.model_type
         kwargs.update(self.config)
+        if stream:
+            self._request_stream_usage(kwargs)
 
         self.callback_manager.call(
             CallBackEvent.LLM_START,
@@ -127,7 +137,7 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         )
 
         try:
-            resp = self.client.completions.create(*args, **kwargs)
+            resp = client.completions.create(*args, **kwargs)
         except Exception as e:
             self.callback_manager.call(
                 CallBackEvent.LLM_ERROR,
@@ -143,12 +153,9 @@ class OpenAICompletionBackend(OpenAIChatBackend):
             def stream_messages() -> Generator[BaseMessage, None, None]:
                 try:
                     previous_message = None
-                    for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).stream(resp):
                         self.callback_manager.call(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -177,6 +184,18 @@ class OpenAICompletionBackend(OpenAIChatBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    result,
+                    stream,
+                    *args,
+                    **kwargs,
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             self.callback_manager.call(
@@ -194,7 +213,9 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         prompt: Union[str, BaseMessage],  # type: ignore[override]
         *args: Any,
         **kwargs: Any,
-    ) -> Union[BaseMessage, AsyncGenerator[BaseMessage, None]]:
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
         """Synchronously generate completions.
 
         Args:
@@ -205,10 +226,10 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         Returns:
             Generated response(s).
             If stream=True, returns a generator of message chunks.
+            A list of messages when several completions are requested with n.
         """
-        if not self.client or not isinstance(self.client, AsyncOpenAI):
-            self.client = AsyncOpenAI(**self.kwargs)
-        stream = self.config.get("stream", False)
+        client = self._get_client(AsyncOpenAI, self.kwargs)
+        stream = kwargs.get("stream", self.config.get("stream", False))
         if isinstance(prompt, str):
             prompt = BaseMessage(
                 content=prompt, role=MessageRole.USER, source=self.source
@@ -216,6 +237,8 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         kwargs["prompt"] = prompt.content
         kwargs["model"] = self.model_type
         kwargs.update(self.config)
+        if stream:
+            self._request_stream_usage(kwargs)
 
         CALL_ASYNC_CALLBACK(
             CallBackEvent.LLM_START,
@@ -227,7 +250,7 @@ class OpenAICompletionBackend(OpenAIChatBackend):
         )
 
         try:
-            resp = await self.client.completions.create(*args, **kwargs)
+            resp = await client.completions.create(*args, **kwargs)
         except Exception as e:
             CALL_ASYNC_CALLBACK(
                 CallBackEvent.LLM_ERROR,
@@ -243,12 +266,9 @@ class OpenAICompletionBackend(OpenAIChatBackend):
             async def stream_messages() -> AsyncGenerator[BaseMessage, None]:
                 try:
                     previous_message = None
-                    async for message in resp:
-                        previous_message = (
-                            BaseMessage.from_openai_chat_stream_response(
-                                message, self.source, previous_message
-                            )
-                        )
+                    async for previous_message in create_accumulator(
+                        self.source, kwargs.get("n")
+                    ).async_stream(resp):  # type: ignore[arg-type]
                         await CALL_ASYNC_CALLBACK(
                             CallBackEvent.LLM_CHUNK,
                             self.source,
@@ -278,6 +298,18 @@ class OpenAICompletionBackend(OpenAIChatBackend):
                 )
 
             return stream_messages()
+        elif (kwargs.get("n") or 1) > 1:
+            results = BaseMessage.from_openai_chat_choices(resp, self.source)
+            for result in results:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END,
+                    self.source,
+                    result,
+                    stream,
+                    *args,
+                    **kwargs,
+                )
+            return results
         else:
             result = BaseMessage.from_openai_chat_response(resp, self.source)
             await CALL_ASYNC_CALLBACK(
@@ -289,3 +321,201 @@ class OpenAICompletionBackend(OpenAIChatBackend):
                 **kwargs,
             )
             return result
+
+    def _batch_params(
+        self,
+        prompts: Sequence[Union[str, BaseMessage]],
+        kwargs: Dict[str, Any],
+        max_prompts: int,
+        max_batch_tokens: Optional[int],
+    ) -> Tuple[List[List[str]], Dict[str, Any]]:
+        r"""Split prompts into the batches of a request each, and build the
+        request parameters."""
+        if max_prompts < 1:
+            raise ValueError(f"Invalid batch size: {max_prompts}")
+        batches: List[List[str]] = []
+        tokens = 0
+        for prompt in prompts:
+            content = (
+                prompt.content if isinstance(prompt, BaseMessage) else prompt
+            )
+            size = len(content or "") // 4 + 1
+            if (
+                not batches
+                or len(batches[-1]) >= max_prompts
+                or (
+                    max_batch_tokens is not None
+                    and tokens + size > max_batch_tokens
+                )
+            ):
+                batches.append([])
+                tokens = 0
+            batches[-1].append(content or "")
+            tokens += size
+        params = {**self.config, **kwargs}
+        params["model"] = self.model_type
+        params["stream"] = False
+        params.pop("stream_options", None)
+        return batches, params
+
+    def _batch_results(
+        self, resp: Any, size: int, n: int
+    ) -> List[Union[BaseMessage, List[BaseMessage]]]:
+        r"""Map the choices of a batched response back to their prompts."""
+        order = sorted(
+            range(len(resp.choices)), key=lambda i: resp.choices[i].index
+        )
+        messages = [
+            BaseMessage.from_openai_chat_response(resp, self.source, i)
+            for i in order
+        ]
+        for message in messages[:-1]:
+            message.metadata["usage"] = None
+            message.metadata["cached_tokens"] = 0
+        if n == 1:
+            return messages  # type: ignore[return-value]
+        return [messages[i * n : (i + 1) * n] for i in range(size)]
+
+    def run_batch(
+        self,
+        prompts: Sequence[Union[str, BaseMessage]],
+        *args: Any,
+        max_prompts: int = 20,
+        max_batch_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Union[BaseMessage, List[BaseMessage]]]:
+        """Generate completions of many prompts, packing them into requests.
+
+        The completions API accepts a list of prompts, so each request
+        carries up to `max_prompts` prompts, and up to `max_batch_tokens`
+        estimated prompt tokens if given. Responses are not streamed. The
+        usage of a request is reported by its last message.
+
+        Args:
+            prompts:
+                The prompts to generate completions from.
+            *args:
+                Additional positional arguments.
+            max_prompts:
+                The maximum number of prompts per request. Defaults to 20.
+            max_batch_tokens:
+                The maximum number of estimated prompt tokens per request.
+            **kwargs:
+                Additional keyword arguments.
+
+        Returns:
+            The completion of each prompt, in order, or the list of its
+            completions when several are requested with n.
+        """
+        client = self._get_client(OpenAI, self.kwargs)
+        batches, params = self._batch_params(
+            prompts, kwargs, max_prompts, max_batch_tokens
+        )
+        n = params.get("n") or 1
+        results: List[Union[BaseMessage, List[BaseMessage]]] = []
+        for batch in batches:
+            params["prompt"] = batch
+            self.callback_manager.call(
+                CallBackEvent.LLM_START,
+                self.source,
+                batch,
+                *args,
+                **params,
+            )
+            try:
+                resp = client.completions.create(*args, **params)
+            except Exception as e:
+                self.callback_manager.call(
+                    CallBackEvent.LLM_ERROR,
+                    self.source,
+                    e,
+                    *args,
+                    **params,
+                )
+                raise e
+            messages = self._batch_results(resp, len(batch), n)
+            for message in messages:
+                for result in (
+                    message if isinstance(message, list) else [message]
+                ):
+                    self.callback_manager.call(
+                        CallBackEvent.LLM_END,
+                        self.source,
+                        result,
+                        *args,
+                        **params,
+                    )
+            results.extend(messages)
+        return results
+
+    async def async_run_batch(
+        self,
+        prompts: Sequence[Union[str, BaseMessage]],
+        *args: Any,
+        max_prompts: int = 20,
+        max_batch_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Union[BaseMessage, List[BaseMessage]]]:
+        """Generate completions of many prompts asynchronously, packing them
+        into requests sent concurrently.
+
+        Args:
+            prompts:
+                The prompts to generate completions from.
+            *args:
+                Additional positional arguments.
+            max_prompts:
+                The maximum number of prompts per request. Defaults to 20.
+            max_batch_tokens:
+                The maximum number of estimated prompt tokens per request.
+            **kwargs:
+                Additional keyword arguments.
+
+        Returns:
+            The completion of each prompt, in order, or the list of its
+            completions when several are requested with n.
+        """
+        client = self._get_client(AsyncOpenAI, self.kwargs)
+        batches, params = self._batch_params(
+            prompts, kwargs, max_prompts, max_batch_tokens
+        )
+        n = params.get("n") or 1
+
+        async def request(
+            batch: List[str],
+        ) -> List[Union[BaseMessage, List[BaseMessage]]]:
+            batch_params = {**params, "prompt": batch}
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_START,
+                self.source,
+                batch,
+                *args,
+                **batch_params,
+            )
+            try:
+                resp = await client.completions.create(*args, **batch_params)
+            except Exception as e:
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_ERROR,
+                    self.source,
+                    e,
+                    *args,
+                    **batch_params,
+                )
+                raise e
+            messages = self._batch_results(resp, len(batch), n)
+            for message in messages:
+                for result in (
+                    message if isinstance(message, list) else [message]
+                ):
+                    await CALL_ASYNC_CALLBACK(
+                        CallBackEvent.LLM_END,
+                        self.source,
+                        result,
+                        *args,
+                        **batch_params,
+                    )
+            return messages
+
+        responses = await asyncio.gather(*[request(b) for b in batches])
+        return [message for messages in responses for message in messages]
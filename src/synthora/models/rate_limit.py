@@ -0,0 +1,533 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BackendWrapper, BaseModelBackend
+
+
+# Pause applied after a 429 response without a retry-after header.
+_DEFAULT_RETRY_AFTER = 1.0
+
+
+class _TokenBucket:
+    r"""Token bucket refilled continuously up to a per-minute capacity."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(
+            self.capacity, self.level + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    r"""Client-side request and token budgets with adaptive concurrency.
+
+    Requests and tokens are limited per minute with token buckets. The
+    number of requests in flight is limited by a concurrency window that
+    grows by one request per window of successful requests and is halved
+    on every rate-limited (429) response, AIMD-style; other failures leave
+    it unchanged. A rate-limited response also pauses all requests for its
+    retry-after delay. A limiter can be used from any number of threads and
+    event loops at once, and callers waiting for a slot are woken up when
+    one is released.
+
+    Args:
+        rpm: The maximum number of requests per minute, unlimited if None.
+        tpm: The maximum number of tokens per minute, unlimited if None.
+        max_concurrency: The maximum number of requests in flight,
+            unlimited if None until the first rate-limited response.
+        min_concurrency: The minimum concurrency window. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+    ) -> None:
+        self.requests = _TokenBucket(rpm) if rpm else None
+        self.tokens = _TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency: Optional[float] = (
+            float(max_concurrency) if max_concurrency else None
+        )
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._condition = threading.Condition()
+        self._waiters: List[
+            Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]
+        ] = []
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "RateLimiter":
+        return self
+
+    def _try_acquire(self, tokens: float) -> Optional[float]:
+        r"""Take a request slot if possible. Must hold the lock.
+
+        Returns:
+            Optional[float]: 0 if the slot was taken, otherwise the time to
+                wait, or None to wait for a slot to be released.
+        """
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.concurrency is not None and self.in_flight >= int(
+            self.concurrency
+        ):
+            return None
+        wait = 0.0
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_time(amount))
+        if wait > 0:
+            return wait
+        if self.requests is not None:
+            self.requests.level -= 1
+        if self.tokens is not None:
+            self.tokens.level -= tokens
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self, tokens: float = 0) -> None:
+        r"""Wait for a request slot.
+
+        Args:
+            tokens: The estimated number of tokens of the request.
+        """
+        with self._condition:
+            while (wait := self._try_acquire(tokens)) != 0:
+                self._condition.wait(wait)
+
+    async def async_acquire(self, tokens: float = 0) -> None:
+        r"""Wait for a request slot without blocking the event loop.
+
+        Args:
+            tokens: The estimated number of tokens of the request.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                wait = self._try_acquire(tokens)
+                if wait == 0:
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await asyncio.wait([waiter], timeout=wait)
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def _notify(self) -> None:
+        r"""Wake up the callers waiting for a slot. Must hold the lock."""
+        self._condition.notify_all()
+        for loop, waiter in self._waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The loop of the waiter is closed.
+                pass
+        self._waiters.clear()
+
+    def release(
+        self,
+        tokens: float = 0,
+        used_tokens: Optional[float] = None,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+        failed: bool = False,
+    ) -> None:
+        r"""Release a request slot and adapt the limits.
+
+        Only successful requests grow the concurrency window.
+
+        Args:
+            tokens: The estimated number of tokens the request was charged.
+            used_tokens: The number of tokens the request actually used, if
+                known. The difference is given back to, or taken from, the
+                token budget.
+            rate_limited: Whether the request got a rate-limited response.
+            retry_after: The delay the server asked for, in seconds.
+            failed: Whether the request failed for another reason, such as
+                a timeout, a server or a connection error.
+        """
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            if self.tokens is not None and used_tokens is not None:
+                self.tokens.level += tokens - used_tokens
+            if rate_limited:
+                window = self.concurrency or float(self.in_flight + 1)
+                self.concurrency = max(float(self.min_concurrency), window / 2)
+                self.blocked_until = max(
+                    self.blocked_until,
+                    time.monotonic()
+                    + (
+                        retry_after
+                        if retry_after is not None
+                        else _DEFAULT_RETRY_AFTER
+                    ),
+                )
+            elif not failed and self.concurrency is not None:
+                self.concurrency += 1 / self.concurrency
+                if self.max_concurrency is not None:
+                    self.concurrency = min(
+                        self.concurrency, float(self.max_concurrency)
+                    )
+            self._notify()
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_RATE_LIMITERS: Dict[Hashable, RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(key: Hashable, **kwargs: Any) -> RateLimiter:
+    r"""Get the rate limiter shared by all backends of a deployment.
+
+    The limiter is created with the given options on first use; later
+    calls with the same key return it unchanged.
+
+    Args:
+        key: The deployment key, see `get_deployment_key`.
+        **kwargs: The options of a new `RateLimiter`.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    with _RATE_LIMITERS_LOCK:
+        if (limiter := _RATE_LIMITERS.get(key)) is None:
+            limiter = _RATE_LIMITERS[key] = RateLimiter(**kwargs)
+        return limiter
+
+
+def get_deployment_key(backend: BaseModelBackend) -> Hashable:
+    r"""Get the key identifying the deployment a backend sends requests to.
+
+    Backends share a deployment when they use the same model, endpoint and
+    API key. Wrapped backends are unwrapped first.
+
+    Args:
+        backend: The model backend.
+
+    Returns:
+        Hashable: The deployment key.
+    """
+    while isinstance(backend, BackendWrapper):
+        backend = backend.backend
+    kwargs = getattr(backend, "kwargs", {})
+    endpoint = kwargs.get("base_url") or kwargs.get("azure_endpoint") or ""
+    api_key = hashlib.sha256(
+        str(kwargs.get("api_key", "")).encode("utf-8")
+    ).hexdigest()
+    return (str(endpoint), api_key, backend.model_type)
+
+
+def estimate_tokens(
+    messages: Union[List[BaseMessage], BaseMessage], params: Dict[str, Any]
+) -> int:
+    r"""Estimate the number of tokens of a request.
+
+    Uses about four characters per token for the messages and tools, plus
+    the requested completion budget of each of the `n` completions.
+
+    Args:
+        messages: The request messages.
+        params: The request parameters.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    if not isinstance(messages, list):
+        messages = [messages]
+    chars = 0
+    for message in messages:
+        chars += len(message.content or "") + 16
+        if message.tool_calls:
+            chars += len(str(message.tool_calls))
+    if params.get("tools"):
+        chars += len(json.dumps(params["tools"], default=str))
+    completion = (
+        params.get("max_completion_tokens") or params.get("max_tokens") or 0
+    )
+    return chars // 4 + int(completion) * int(params.get("n") or 1)
+
+
+def _get_retry_after(error: Exception) -> Optional[float]:
+    r"""Get the retry-after delay of a rate-limited response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if (value := headers.get("retry-after-ms")) is not None:
+            return float(value) / 1000
+        if (value := headers.get("retry-after")) is not None:
+            return float(value)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def _get_used_tokens(
+    message: Optional[Union[BaseMessage, List[BaseMessage]]],
+) -> Optional[float]:
+    if isinstance(message, list):
+        # Several completions report the usage on the last message.
+        message = message[-1] if message else None
+    if message is None:
+        return None
+    usage = message.metadata.get("usage")
+    total = getattr(usage, "total_tokens", None)
+    if total is None and isinstance(usage, dict):
+        total = usage.get("total_tokens")
+    return total
+
+
+class RateLimitedBackend(BackendWrapper):
+    r"""Model backend enforcing the rate limits of its deployment.
+
+    Every backend wrapped with the same model, endpoint and API key shares
+    one `RateLimiter`, across agent copies, threads and event loops. A
+    streamed request holds its slot until the stream ends. Rate-limited
+    responses are retried after the delay the server asked for, up to
+    `max_retries` times.
+
+    Args:
+        backend: The backend to wrap.
+        rpm: The maximum number of requests per minute.
+        tpm: The maximum number of tokens per minute.
+        max_concurrency: The maximum number of requests in flight.
+        max_retries: The number of retries of rate-limited requests.
+            Defaults to 2.
+        handlers: Callback handlers.
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        backend: BaseModelBackend,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> "RateLimitedBackend":
+        r"""Return a rate-limited backend."""
+        return RateLimitedBackend(backend, rpm, tpm, max_concurrency)
+
+    def __init__(
+        self,
+        backend: BaseModelBackend,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 2,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        super().__init__(backend, handlers=handlers)
+        self.max_retries = max_retries
+        self.limiter = get_rate_limiter(
+            get_deployment_key(backend),
+            rpm=rpm,
+            tpm=tpm,
+            max_concurrency=max_concurrency,
+        )
+
+    def _release(
+        self,
+        tokens: float,
+        response: Optional[Union[BaseMessage, List[BaseMessage]]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        r"""Release the slot of a request, telling the limiter how it ended.
+
+        Anything but a completed request, including a stream closed early by
+        its consumer, does not count as a success.
+        """
+        if error is None:
+            self.limiter.release(tokens, _get_used_tokens(response))
+        elif isinstance(error, Exception) and _is_rate_limited(error):
+            self.limiter.release(
+                tokens, rate_limited=True, retry_after=_get_retry_after(error)
+            )
+        else:
+            self.limiter.release(
+                tokens, _get_used_tokens(response), failed=True
+            )
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Run the wrapped model within the rate limits.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+        """
+        tokens = estimate_tokens(messages, {**self.config, **kwargs})
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(tokens)
+            try:
+                response = self.backend.run(messages, *args, **kwargs)
+            except BaseException as e:
+                # Cancellations are released too, the slot would leak.
+                self._release(tokens, error=e)
+                if (
+                    isinstance(e, Exception)
+                    and _is_rate_limited(e)
+                    and attempt < self.max_retries
+                ):
+                    continue
+                raise e
+            break
+        if isinstance(response, (BaseMessage, list)):
+            self._release(tokens, response)
+            return response
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            message = None
+            error: Optional[BaseException] = None
+            try:
+                yield None  # type: ignore[misc]
+                for message in response:
+                    yield message
+            except BaseException as e:
+                error = e
+                raise e
+            finally:
+                self._release(tokens, message, error)
+                response.close()
+
+        # Start the stream, so that closing or discarding it before it is
+        # iterated still releases the slot.
+        chunks = stream()
+        next(chunks)
+        return chunks
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Run the wrapped model asynchronously within the rate limits.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+        """
+        tokens = estimate_tokens(messages, {**self.config, **kwargs})
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.async_acquire(tokens)
+            try:
+                response = await self.backend.async_run(
+                    messages, *args, **kwargs
+                )
+            except BaseException as e:
+                # Cancellations are released too, the slot would leak.
+                self._release(tokens, error=e)
+                if (
+                    isinstance(e, Exception)
+                    and _is_rate_limited(e)
+                    and attempt < self.max_retries
+                ):
+                    continue
+                raise e
+            break
+        if isinstance(response, (BaseMessage, list)):
+            self._release(tokens, response)
+            return response
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            message = None
+            error: Optional[BaseException] = None
+            try:
+                yield None  # type: ignore[misc]
+                async for message in response:
+                    yield message
+            except BaseException as e:
+                error = e
+                raise e
+            finally:
+                self._release(tokens, message, error)
+                await response.aclose()
+
+        # Start the stream, so that closing or discarding it before it is
+        # iterated still releases the slot.
+        chunks = stream()
+        await chunks.__anext__()
+        return chunks
@@ -0,0 +1,629 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BackendWrapper, BaseModelBackend
+from synthora.models.cache import (
+    ResponseCache,
+    _dump_message,
+    _encode,
+    _load_message,
+)
+from synthora.types.enums import CallBackEvent, ModelBackendType, NodeType
+from synthora.types.node import Node
+from synthora.utils.macros import CALL_ASYNC_CALLBACK
+
+
+# Serializes appends to recording files shared by several backends.
+_RECORDING_LOCK = threading.Lock()
+
+
+class RecordingBackend(BackendWrapper):
+    r"""Model backend writing every request and response of another backend
+    to a JSON Lines file.
+
+    Each line holds the request key (see `ResponseCache.make_key`), the
+    request, and either the response with its latency (the responses, when
+    several completions were requested) or, when streaming, the chunks with
+    their offsets from the start of the request. Chunks are
+    stored as the fields that changed since the previous chunk, and text
+    that only grew is stored as the appended suffix, so long streams stay
+    compact.
+
+    Args:
+        model_type:
+            The model type, used when `backend` is a backend type.
+        source:
+            Source node of the model.
+        config:
+            Configuration of the model.
+        name:
+            Name of the model.
+        path:
+            The recording file. Records are appended.
+        backend:
+            The backend to record, or the type of backend to create.
+        backend_config:
+            Backend-specific configuration when creating the backend.
+        include_request:
+            Whether the request messages and parameters are recorded.
+            Defaults to True.
+        handlers:
+            Callback handlers.
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        backend: BaseModelBackend,
+        path: Union[str, Path],
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> "RecordingBackend":
+        r"""Return a backend recording the given backend."""
+        return RecordingBackend(
+            backend.model_type,
+            backend.source,
+            path=path,
+            backend=backend,
+            handlers=handlers,
+        )
+
+    def __init__(
+        self,
+        model_type: str,
+        source: Node,
+        config: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        path: Union[str, Path] = "recording.jsonl",
+        backend: Union[
+            BaseModelBackend, ModelBackendType, str
+        ] = ModelBackendType.OPENAI_CHAT,
+        backend_config: Optional[Dict[str, Any]] = None,
+        include_request: bool = True,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        if not isinstance(backend, BaseModelBackend):
+            from synthora.models import BACKEND_MAP
+
+            backend = BACKEND_MAP[ModelBackendType(backend)](
+                name=name,
+                source=source,
+                model_type=model_type,
+                config=config,
+                **(backend_config or {}),
+            )
+        super().__init__(
+            backend,  # type: ignore[arg-type]
+            backend_type=ModelBackendType.RECORDING,
+            handlers=handlers,
+        )
+        self.path = Path(path)
+        self.include_request = include_request
+
+    def _new_record(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        if not isinstance(messages, list):
+            messages = [messages]
+        params = {**self.config, **kwargs}
+        if "tools" in params and not params["tools"]:
+            del params["tools"]
+        record: Dict[str, Any] = {
+            "key": ResponseCache.make_key(
+                self.model_type, messages, params, *args
+            ),
+            "model": self.model_type,
+            "time": time.time(),
+        }
+        if self.include_request:
+            record["request"] = json.loads(
+                json.dumps(
+                    {
+                        "messages": [m.to_openai_message() for m in messages],
+                        "params": params,
+                    },
+                    default=_encode,
+                )
+            )
+        return record
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with _RECORDING_LOCK:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Run the wrapped model and record the exchange.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+        """
+        record = self._new_record(messages, args, kwargs)
+        start = time.perf_counter()
+        try:
+            response = self.backend.run(messages, *args, **kwargs)
+        except Exception as e:
+            record["error"] = str(e)
+            self._write(record)
+            raise e
+        if isinstance(response, (BaseMessage, list)):
+            record["latency"] = time.perf_counter() - start
+            if isinstance(response, list):
+                record["responses"] = [_dump_message(m) for m in response]
+            else:
+                record["response"] = _dump_message(response)
+            self._write(record)
+            return response
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            encoder = _ChunkEncoder(start)
+            try:
+                for message in response:
+                    encoder.add(message)
+                    yield message
+            finally:
+                record["chunks"] = encoder.chunks
+                self._write(record)
+
+        return stream()
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Run the wrapped model asynchronously and record the exchange.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+        """
+        record = self._new_record(messages, args, kwargs)
+        start = time.perf_counter()
+        try:
+            response = await self.backend.async_run(messages, *args, **kwargs)
+        except Exception as e:
+            record["error"] = str(e)
+            self._write(record)
+            raise e
+        if isinstance(response, (BaseMessage, list)):
+            record["latency"] = time.perf_counter() - start
+            if isinstance(response, list):
+                record["responses"] = [_dump_message(m) for m in response]
+            else:
+                record["response"] = _dump_message(response)
+            self._write(record)
+            return response
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            encoder = _ChunkEncoder(start)
+            try:
+                async for message in response:
+                    encoder.add(message)
+                    yield message
+            finally:
+                record["chunks"] = encoder.chunks
+                self._write(record)
+
+        return stream()
+
+
+class ReplayBackend(BaseModelBackend):
+    r"""Model backend serving the responses of a `RecordingBackend` file.
+
+    Requests are matched to records by key, in recorded order when the same
+    request was recorded several times. With `match="order"` records are
+    served in file order regardless of the request, which helps when prompts
+    hold volatile values such as timestamps. Recorded errors are raised
+    again as exceptions.
+
+    Args:
+        model_type:
+            The model type.
+        source:
+            Source node of the model.
+        config:
+            Configuration of the model.
+        name:
+            Name of the model.
+        path:
+            The recording file.
+        match:
+            Either "key" or "order". Defaults to "key".
+        pace:
+            Whether to reproduce the recorded latency and chunk timings.
+            Defaults to False.
+        speed:
+            Speed-up factor applied to the recorded timings when pacing.
+            Defaults to 1.0.
+        handlers:
+            Callback handlers.
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        path: Union[str, Path],
+        model_type: str = "replay",
+        source: Optional[Node] = None,
+        pace: bool = False,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> "ReplayBackend":
+        r"""Return a backend replaying the given recording."""
+        return ReplayBackend(
+            model_type,
+            source or Node(name=model_type, type=NodeType.AGENT),
+            path=path,
+            pace=pace,
+            handlers=handlers,
+        )
+
+    def __init__(
+        self,
+        model_type: str,
+        source: Node,
+        config: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        path: Union[str, Path] = "recording.jsonl",
+        match: str = "key",
+        pace: bool = False,
+        speed: float = 1.0,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        if match not in ("key", "order"):
+            raise ValueError(f"Unknown replay match mode: {match}")
+        super().__init__(
+            model_type=model_type,
+            source=source,
+            backend_type=ModelBackendType.REPLAY,
+            config=config,
+            name=name or model_type,
+            handlers=handlers,
+        )
+        self.path = Path(path)
+        self.match = match
+        self.pace = pace
+        self.speed = speed
+        self.recording = _Recording(self.path)
+
+    def _next_record(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if not isinstance(messages, list):
+            messages = [messages]
+        params = {**self.config, **kwargs}
+        if "tools" in params and not params["tools"]:
+            del params["tools"]
+        key = ResponseCache.make_key(self.model_type, messages, params, *args)
+        params["model"] = self.model_type
+        params["messages"] = [m.to_openai_message() for m in messages]
+        return self.recording.next(key, self.match), params
+
+    def _delays(self, record: Dict[str, Any]) -> List[float]:
+        r"""Get the delay before each chunk, or before the response."""
+        if "chunks" in record:
+            offsets = [chunk["t"] for chunk in record["chunks"]]
+        else:
+            offsets = [record.get("latency", 0.0)]
+        if not self.pace:
+            return [0.0] * len(offsets)
+        delays, previous = [], 0.0
+        for offset in offsets:
+            delays.append(max(0.0, offset - previous) / self.speed)
+            previous = offset
+        return delays
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Replay the recorded response of a request.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            The recorded response(s).
+            If the request was streamed, returns a generator of message
+            chunks.
+
+        Raises:
+            LookupError: If no record matches the request.
+        """
+        record, params = self._next_record(messages, args, kwargs)
+        self.callback_manager.call(
+            CallBackEvent.LLM_START, self.source, *args, **params
+        )
+        delays = self._delays(record)
+        if "error" in record:
+            e = Exception(record["error"])
+            self.callback_manager.call(
+                CallBackEvent.LLM_ERROR, self.source, e, *args, **params
+            )
+            raise e
+        if "responses" in record:
+            if delays[0]:
+                time.sleep(delays[0])
+            results = [_load_message(data) for data in record["responses"]]
+            for result in results:
+                result.source = self.source
+                self.callback_manager.call(
+                    CallBackEvent.LLM_END, self.source, result, *args, **params
+                )
+            return results
+        if "chunks" not in record:
+            if delays[0]:
+                time.sleep(delays[0])
+            result = _load_message(record["response"])
+            result.source = self.source
+            self.callback_manager.call(
+                CallBackEvent.LLM_END, self.source, result, *args, **params
+            )
+            return result
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            message = None
+            for delay, message in zip(
+                delays, _decode_chunks(record["chunks"], self.source)
+            ):
+                if delay:
+                    time.sleep(delay)
+                self.callback_manager.call(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    message,
+                    *args,
+                    **params,
+                )
+                yield message
+            self.callback_manager.call(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+
+        return stream()
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Replay the recorded response of a request asynchronously.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            The recorded response(s).
+            If the request was streamed, returns an async generator of
+            message chunks.
+
+        Raises:
+            LookupError: If no record matches the request.
+        """
+        record, params = self._next_record(messages, args, kwargs)
+        await CALL_ASYNC_CALLBACK(
+            CallBackEvent.LLM_START, self.source, *args, **params
+        )
+        delays = self._delays(record)
+        if "error" in record:
+            e = Exception(record["error"])
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_ERROR, self.source, e, *args, **params
+            )
+            raise e
+        if "responses" in record:
+            if delays[0]:
+                await asyncio.sleep(delays[0])
+            results = [_load_message(data) for data in record["responses"]]
+            for result in results:
+                result.source = self.source
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_END, self.source, result, *args, **params
+                )
+            return results
+        if "chunks" not in record:
+            if delays[0]:
+                await asyncio.sleep(delays[0])
+            result = _load_message(record["response"])
+            result.source = self.source
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_END, self.source, result, *args, **params
+            )
+            return result
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            message = None
+            for delay, message in zip(
+                delays, _decode_chunks(record["chunks"], self.source)
+            ):
+                if delay:
+                    await asyncio.sleep(delay)
+                await CALL_ASYNC_CALLBACK(
+                    CallBackEvent.LLM_CHUNK,
+                    self.source,
+                    message,
+                    *args,
+                    **params,
+                )
+                yield message
+            await CALL_ASYNC_CALLBACK(
+                CallBackEvent.LLM_END, self.source, message, *args, **params
+            )
+
+        return stream()
+
+
+class _Recording:
+    r"""Records of a recording file, shared by the copies of a replay
+    backend.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.records: Deque[Dict[str, Any]] = deque()
+        self.by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.records.append(record)
+                    self.by_key[record["key"]].append(record)
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_Recording":
+        return self
+
+    def next(self, key: str, match: str) -> Dict[str, Any]:
+        r"""Take the next record answering a request.
+
+        Args:
+            key: The request key.
+            match: Either "key" or "order".
+
+        Returns:
+            Dict[str, Any]: The record.
+
+        Raises:
+            LookupError: If no record is left for the request.
+        """
+        with self.lock:
+            if match == "order":
+                if not self.records:
+                    raise LookupError("The recording has no records left")
+                return self.records.popleft()
+            records = self.by_key.get(key)
+            if not records:
+                raise LookupError(f"No recorded response for key {key}")
+            # The last record is kept so that further identical requests are
+            # still answered.
+            return records.popleft() if len(records) > 1 else records[0]
+
+
+class _ChunkEncoder:
+    r"""Encode stream chunks as differences from the previous chunk.
+
+    Each encoded chunk holds its offset `t` in seconds and the changed
+    fields. A string field that only grew is stored under `<field>+` as the
+    appended text.
+    """
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.previous: Dict[str, Any] = {}
+        self.chunks: List[Dict[str, Any]] = []
+
+    def add(self, message: BaseMessage) -> None:
+        data = _dump_message(message)
+        chunk: Dict[str, Any] = {"t": time.perf_counter() - self.start}
+        for field, value in data.items():
+            previous = self.previous.get(field)
+            if field in self.previous and previous == value:
+                continue
+            if (
+                isinstance(value, str)
+                and isinstance(previous, str)
+                and value.startswith(previous)
+            ):
+                chunk[f"{field}+"] = value[len(previous) :]
+            else:
+                chunk[field] = value
+        self.previous = data
+        self.chunks.append(chunk)
+
+
+def _decode_chunks(
+    chunks: List[Dict[str, Any]], source: Node
+) -> Generator[BaseMessage, None, None]:
+    r"""Rebuild the messages of a stream encoded by `_ChunkEncoder`."""
+    data: Dict[str, Any] = {}
+    for chunk in chunks:
+        for field, value in chunk.items():
+            if field == "t":
+                continue
+            if field.endswith("+"):
+                data[field[:-1]] += value
+            else:
+                data[field] = value
+        message = _load_message(data)
+        message.source = source
+        yield message
@@ -0,0 +1,486 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from synthora.callbacks.base_handler import (
+    AsyncCallBackHandler,
+    BaseCallBackHandler,
+)
+from synthora.configs.model_config import ModelConfig
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BaseModelBackend
+from synthora.types.enums import ModelBackendType, NodeType
+from synthora.types.node import Node
+
+
+ROUTING_STRATEGIES = ("round_robin", "least_outstanding", "ewma")
+
+# Client errors that another deployment would reject as well.
+_NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404, 413, 422})
+
+
+class _Deployment:
+    r"""Load and health statistics of one backend of a router."""
+
+    def __init__(self) -> None:
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial = False
+
+    def available(self, now: float) -> bool:
+        r"""Whether the circuit lets a request through."""
+        return now >= self.open_until and not self.trial
+
+    def half_open(self, threshold: int) -> bool:
+        r"""Whether the next request is the trial of an opened circuit."""
+        return self.failures >= threshold
+
+
+class _RouterState:
+    r"""Statistics of all backends of a router, shared by its copies."""
+
+    def __init__(self, size: int) -> None:
+        self.deployments = [_Deployment() for _ in range(size)]
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_RouterState":
+        return self
+
+
+def _is_retryable(error: Exception) -> bool:
+    return getattr(error, "status_code", None) not in _NON_RETRYABLE_STATUS
+
+
+class RouterBackend(BaseModelBackend):
+    r"""Model backend spreading requests across several deployments.
+
+    Each request goes to the backend picked by the routing strategy:
+
+    - `round_robin`: the backends in turn.
+    - `least_outstanding`: the backend with the fewest requests in flight.
+    - `ewma`: the backend with the lowest exponentially weighted moving
+      average latency, weighted by its requests in flight. Backends without
+      a measured latency are tried first.
+
+    A failed request fails over to the next backend. After
+    `failure_threshold` consecutive failures a backend's circuit opens and
+    it receives no requests for `cooldown` seconds; then a single trial
+    request decides whether it closes again. If every circuit is open, the
+    backends are tried anyway, soonest to recover first. Client errors that
+    every deployment would reject (400, 401, ...) are raised without
+    failover. A streamed request fails over only before its first chunk.
+
+    The router's configuration (tools, response format, streaming, ...) is
+    sent with every request and takes precedence over the configuration of
+    the backends, which are left unchanged. Statistics are shared by the
+    copies of a router.
+
+    Routers can be configured from YAML:
+
+    .. code-block:: yaml
+
+        model:
+          backend: router
+          model_type: gpt-4o
+          backend_config:
+            strategy: ewma
+            backends:
+              - model_type: gpt-4o
+                backend: azure_chat
+                backend_config: {azure_endpoint: ..., api_version: ...}
+              - model_type: gpt-4o
+                backend: openai_chat
+
+    Args:
+        model_type: The model label of the router.
+        source: The source node.
+        config: The request configuration.
+        name: The name of the router.
+        backends: The backends, as instances or model configurations.
+        strategy: The routing strategy. Defaults to "round_robin".
+        failure_threshold: Consecutive failures opening a circuit.
+            Defaults to 3.
+        cooldown: Seconds a circuit stays open. Defaults to 30.
+        ewma_alpha: Weight of the latest latency in the average.
+            Defaults to 0.3.
+        handlers: Callback handlers, added to every backend.
+    """
+
+    @staticmethod
+    def default(  # type: ignore[override]
+        backends: List[BaseModelBackend],
+        strategy: str = "round_robin",
+        model_type: str = "router",
+        source: Optional[Node] = None,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> "RouterBackend":
+        r"""Return a router over the given backends."""
+        return RouterBackend(
+            model_type,
+            source or Node(name=model_type, type=NodeType.AGENT),
+            backends=backends,
+            strategy=strategy,
+            handlers=handlers,
+        )
+
+    def __init__(
+        self,
+        model_type: str,
+        source: Node,
+        config: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        backends: Optional[
+            Sequence[Union[BaseModelBackend, ModelConfig, Dict[str, Any]]]
+        ] = None,
+        strategy: str = "round_robin",
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        ewma_alpha: float = 0.3,
+        handlers: Optional[
+            List[Union[BaseCallBackHandler, AsyncCallBackHandler]]
+        ] = None,
+    ) -> None:
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        if not backends:
+            raise ValueError("A router needs at least one backend")
+        super().__init__(
+            model_type=model_type,
+            source=source,
+            backend_type=ModelBackendType.ROUTER,
+            config=config,
+            name=name or model_type,
+        )
+        self.backends: List[BaseModelBackend] = []
+        for backend in backends:
+            if not isinstance(backend, BaseModelBackend):
+                from synthora.models import create_model_from_config
+
+                if not isinstance(backend, ModelConfig):
+                    backend = ModelConfig.from_dict(backend)
+                backend = create_model_from_config(  # type: ignore[assignment]
+                    backend, source
+                )
+            self.backends.append(backend)  # type: ignore[arg-type]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        self.state = _RouterState(len(self.backends))
+        for handler in handlers or []:
+            self.add_handler(handler)
+
+    def add_handler(
+        self,
+        handler: Union[BaseCallBackHandler, AsyncCallBackHandler],
+        recursive: bool = True,
+    ) -> None:
+        """Add a callback handler to the router and its backends.
+
+        Args:
+            handler (Union[BaseCallBackHandler, AsyncCallBackHandler]):
+                Callback handler to add
+            recursive (bool): Whether to add handler recursively
+        """
+        super().add_handler(handler, recursive)
+        for backend in self.backends:
+            backend.add_handler(handler, recursive)
+
+    def set_ancestor(self, ancestor: Optional[Node]) -> None:
+        """Move the router and its backends under another node of the
+        execution tree.
+
+        Args:
+            ancestor (Optional[Node]): The new ancestor of the models
+        """
+        super().set_ancestor(ancestor)
+        for backend in self.backends:
+            backend.set_ancestor(self.source)
+
+    def _candidates(self) -> Tuple[List[int], Set[int]]:
+        r"""Get the backends to try, in order, and reserve their trials.
+
+        The trial of a half-open circuit is reserved as soon as the backend
+        is returned, so concurrent requests do not pick it as well. Trials
+        the request does not use must be given back with `_release_trials`.
+
+        Returns:
+            Tuple[List[int], Set[int]]: The indices of the backends, and
+                those whose trial was reserved.
+        """
+        state = self.state
+        with state.lock:
+            now = time.monotonic()
+            size = len(self.backends)
+            start = state.counter % size
+            state.counter += 1
+            order = [(start + i) % size for i in range(size)]
+            deployments = state.deployments
+            available = [i for i in order if deployments[i].available(now)]
+            if not available:
+                order.sort(key=lambda i: deployments[i].open_until)
+                return order, set()
+            if self.strategy == "least_outstanding":
+                available.sort(key=lambda i: deployments[i].outstanding)
+            elif self.strategy == "ewma":
+                available.sort(
+                    key=lambda i: (
+                        deployments[i].latency is not None,
+                        (deployments[i].latency or 0.0)
+                        * (deployments[i].outstanding + 1),
+                    )
+                )
+            trials = set()
+            for i in available:
+                if deployments[i].half_open(self.failure_threshold):
+                    # Let a single trial request through.
+                    deployments[i].trial = True
+                    trials.add(i)
+            return available, trials
+
+    def _release_trials(self, trials: Set[int]) -> None:
+        r"""Give back the trials reserved by `_candidates` and not used."""
+        if not trials:
+            return
+        with self.state.lock:
+            for index in trials:
+                self.state.deployments[index].trial = False
+
+    def _start(self, index: int) -> float:
+        with self.state.lock:
+            self.state.deployments[index].outstanding += 1
+        return time.monotonic()
+
+    def _finish(
+        self,
+        index: int,
+        started: Optional[float] = None,
+        error: Optional[Exception] = None,
+        release: bool = True,
+        trial: bool = False,
+    ) -> None:
+        r"""Record the outcome of a request.
+
+        Args:
+            index: The index of the backend.
+            started: The start time of a successful request, to measure its
+                latency.
+            error: The error of a failed request.
+            release: Whether the request is no longer in flight.
+            trial: Whether the request is the trial of a half-open circuit.
+        """
+        with self.state.lock:
+            deployment = self.state.deployments[index]
+            if release:
+                deployment.outstanding -= 1
+            if trial:
+                deployment.trial = False
+            if error is not None:
+                if not _is_retryable(error):
+                    return
+                deployment.failures += 1
+                if deployment.failures >= self.failure_threshold:
+                    deployment.open_until = time.monotonic() + self.cooldown
+            elif started is not None:
+                latency = time.monotonic() - started
+                deployment.failures = 0
+                deployment.open_until = 0.0
+                if deployment.latency is None:
+                    deployment.latency = latency
+                else:
+                    deployment.latency += self.ewma_alpha * (
+                        latency - deployment.latency
+                    )
+
+    def _prepare(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        r"""Get the parameters of a request, streaming as the router."""
+        return {**self.config, "stream": self.stream, **kwargs}
+
+    def run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], Generator[BaseMessage, None, None]
+    ]:
+        """Run the model on the backend picked by the routing strategy.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns a generator of message chunks.
+        """
+        error: Optional[Exception] = None
+        params = self._prepare(kwargs)
+        order, trials = self._candidates()
+        try:
+            for index in order:
+                trial = index in trials
+                trials.discard(index)
+                backend = self.backends[index]
+                started = self._start(index)
+                try:
+                    response = backend.run(messages, *args, **params)
+                    if not isinstance(response, (BaseMessage, list)):
+                        first = next(response)
+                except StopIteration:
+                    self._finish(index, started, trial=trial)
+                    return self._stream(index, None, None)
+                except Exception as e:
+                    self._finish(index, error=e, trial=trial)
+                    if not _is_retryable(e):
+                        raise e
+                    error = e
+                    continue
+                except BaseException as e:
+                    # A cancelled request is not a failure of the backend.
+                    self._finish(index, trial=trial)
+                    raise e
+                if isinstance(response, (BaseMessage, list)):
+                    self._finish(index, started, trial=trial)
+                    return response
+                self._finish(index, started, release=False, trial=trial)
+                # Start the stream, so that closing or discarding it before
+                # it is iterated still finishes the request.
+                stream = self._stream(index, first, response)
+                next(stream)
+                return stream
+        finally:
+            self._release_trials(trials)
+        raise error  # type: ignore[misc]
+
+    def _stream(
+        self,
+        index: int,
+        first: Optional[BaseMessage],
+        response: Optional[Generator[BaseMessage, None, None]],
+    ) -> Generator[BaseMessage, None, None]:
+        if first is None or response is None:
+            return
+        error: Optional[Exception] = None
+        try:
+            yield None  # type: ignore[misc]
+            yield first
+            yield from response
+        except Exception as e:
+            error = e
+            raise e
+        finally:
+            self._finish(index, error=error)
+
+    async def async_run(
+        self,
+        messages: Union[List[BaseMessage], BaseMessage],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Union[
+        BaseMessage, List[BaseMessage], AsyncGenerator[BaseMessage, None]
+    ]:
+        """Run the model asynchronously on the backend picked by the routing
+        strategy.
+
+        Args:
+            messages: Single message or list of messages to process
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Generated response(s).
+            If stream=True, returns an async generator of message chunks.
+        """
+        error: Optional[Exception] = None
+        params = self._prepare(kwargs)
+        order, trials = self._candidates()
+        try:
+            for index in order:
+                trial = index in trials
+                trials.discard(index)
+                backend = self.backends[index]
+                started = self._start(index)
+                try:
+                    response = await backend.async_run(
+                        messages, *args, **params
+                    )
+                    if not isinstance(response, (BaseMessage, list)):
+                        first = await response.__anext__()
+                except StopAsyncIteration:
+                    self._finish(index, started, trial=trial)
+                    return self._async_stream(index, None, None)
+                except Exception as e:
+                    self._finish(index, error=e, trial=trial)
+                    if not _is_retryable(e):
+                        raise e
+                    error = e
+                    continue
+                except BaseException as e:
+                    # A cancelled request is not a failure of the backend.
+                    self._finish(index, trial=trial)
+                    raise e
+                if isinstance(response, (BaseMessage, list)):
+                    self._finish(index, started, trial=trial)
+                    return response
+                self._finish(index, started, release=False, trial=trial)
+                stream = self._async_stream(index, first, response)
+                await stream.__anext__()
+                return stream
+        finally:
+            self._release_trials(trials)
+        raise error  # type: ignore[misc]
+
+    async def _async_stream(
+        self,
+        index: int,
+        first: Optional[BaseMessage],
+        response: Optional[AsyncGenerator[BaseMessage, None]],
+    ) -> AsyncGenerator[BaseMessage, None]:
+        if first is None or response is None:
+            return
+        error: Optional[Exception] = None
+        try:
+            yield None  # type: ignore[misc]
+            yield first
+            async for message in response:
+                yield message
+        except Exception as e:
+            error = e
+            raise e
+        finally:
+            self._finish(index, error=error)
@@ -17,6 +17,7 @@
 
 from asyncio import Task
 from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+from uuid import uuid4
 
 
 try:
@@ -25,6 +26,7 @@ except ImportError:
     from typing_extensions import Self
 
 from synthora.agents.base import BaseAgent
+from synthora.callbacks.usage_handler import usage_scope
 from synthora.models.base import BaseModelBackend
 from synthora.services.base import BaseService
 from synthora.toolkits.base import BaseFunction
@@ -49,20 +51,22 @@ def _add_agent_to_app(
     if use_async:
 
         async def endpoint(request: HttpAgentRequest) -> Any:
-            return await agent.async_run(
-                request.message,
-                *(request.args or []),
-                **(request.kwargs or {}),
-            )
+            with usage_scope(request=uuid4().hex):
+                return await agent.async_run(
+                    request.message,
+                    *(request.args or []),
+                    **(request.kwargs or {}),
+                )
 
     else:
 
         def endpoint(request: HttpAgentRequest) -> Any:
-            return agent.run(
-                request.message,
-                *(request.args or []),
-                **(request.kwargs or {}),
-            )
+            with usage_scope(request=uuid4().hex):
+                return agent.run(
+                    request.message,
+                    *(request.args or []),
+                    **(request.kwargs or {}),
+                )
 
     decorator(f"/{name}", response_model=None)(endpoint)
 
@@ -46,6 +46,9 @@ class BaseFunction(ABC):
         schema: OpenAI tool schema generated from the function.
         source: Node representing this tool in the execution graph.
         callback_manager: Manager for handling function execution callbacks.
+        speculative: Whether the function is safe to run speculatively, i.e.
+            it is idempotent and read-only, so an agent may start it before
+            the model has finished streaming its response.
     """
 
     def __init__(
@@ -67,6 +70,7 @@ class BaseFunction(ABC):
         self.schema = get_openai_tool_schema(func)
         self.source: Node = Node(name=self.name, type=NodeType.TOOL)
         self.callback_manager = callback_manager
+        self.speculative = False
 
     @staticmethod
     def wrap(
@@ -179,6 +183,14 @@ class BaseFunction(ABC):
         """
         self.callback_manager.add(handler)
 
+    def set_ancestor(self, ancestor: Optional[Node]) -> None:
+        """Move the function under another node of the execution tree.
+
+        Args:
+            ancestor: The new ancestor of the function.
+        """
+        self.source = self.source.with_ancestor(ancestor)
+
 
 class SyncFunction(BaseFunction):
     """Wrapper for synchronous functions that can be used as tools.
@@ -16,12 +16,26 @@
 #
 
 import inspect
-from typing import Any, Callable
+from typing import Any, Callable, Optional, Union, overload
 
 from synthora.toolkits.base import BaseFunction
 
 
-def tool(func: Callable[..., Any]) -> BaseFunction:
+@overload
+def tool(
+    func: Callable[..., Any], *, speculative: bool = False
+) -> BaseFunction: ...
+
+
+@overload
+def tool(
+    *, speculative: bool = False
+) -> Callable[[Callable[..., Any]], BaseFunction]: ...
+
+
+def tool(
+    func: Optional[Callable[..., Any]] = None, *, speculative: bool = False
+) -> Union[BaseFunction, Callable[[Callable[..., Any]], BaseFunction]]:
     """Decorator that marks a function or method as a tool for use in the
     toolkit system.
 
@@ -37,6 +51,10 @@ def tool(func: Callable[..., Any]) -> BaseFunction:
         func:
             The function or method to be wrapped as a tool. Can be either
             sync or async function.
+        speculative:
+            Mark the tool as idempotent and read-only, so agents with
+            speculative tool execution enabled may start it while the model
+            is still streaming.
 
     Returns:
         A wrapped function that can be either SyncFunction or AsyncFunction,
@@ -51,10 +69,17 @@ def tool(func: Callable[..., Any]) -> BaseFunction:
             @tool
             def my_method(self, x: int) -> str:
                 return str(x)
+
+        @tool(speculative=True)
+        def search(query: str) -> str:
+            return query
     """
+    if func is None:
+        return lambda f: tool(f, speculative=speculative)
     signature = inspect.signature(func)
     parameters = list(signature.parameters.values())
     target = BaseFunction.wrap(func)
     if parameters and parameters[0].name == "self":
         setattr(target, "_flag", True)
+    target.speculative = speculative
     return target
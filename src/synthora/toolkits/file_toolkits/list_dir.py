@@ -20,7 +20,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def list_directory(path: str) -> Result[str, Exception]:
     r"""List the contents of a directory.
 
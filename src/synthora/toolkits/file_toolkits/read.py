@@ -20,7 +20,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def read_file(path: str) -> Result[str, Exception]:
     r"""Read a file.
 
@@ -20,7 +20,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def search_file(dir_path: str, pattern: str) -> Result[str, Exception]:
     r"""Search for files in a directory.
 
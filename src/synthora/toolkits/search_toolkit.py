@@ -29,7 +29,7 @@ from .search_toolkits import (
 )
 
 
-@tool
+@tool(speculative=True)
 def search_all(query: str) -> Result[str, Exception]:
     r"""Search for a query in Wikipedia, Google, Arxiv, and Youtube.
 
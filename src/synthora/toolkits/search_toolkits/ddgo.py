@@ -20,7 +20,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def search_duckduckgo(
     query: str, content_type: str = "text", max_results: int = 5
 ) -> Result[str, Exception]:
@@ -22,7 +22,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def search_google(query: str) -> Result[str, Exception]:
     r"""Search Google and return a list of URLs.
 
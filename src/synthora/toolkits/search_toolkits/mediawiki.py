@@ -35,7 +35,7 @@ class MediawikiToolkit(BaseToolkit):
                 "`pip install pymediawiki`"
             )
 
-    @tool
+    @tool(speculative=True)
     def search_mediawiki(
         self, query: str, sentences: int = 5, auto_suggest: bool = False
     ) -> Result[str, Exception]:
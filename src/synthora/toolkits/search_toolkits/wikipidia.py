@@ -19,7 +19,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def search_wikipedia(
     query: str, sentences: int = 15, auto_suggest: bool = False
 ) -> Result[str, Exception]:
@@ -21,7 +21,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def search_youtube(
     query: str, max_results: Optional[int] = None
 ) -> Result[str, Exception]:
@@ -24,7 +24,7 @@ from synthora.toolkits.decorators import tool
 from synthora.types.enums import Err, Ok, Result
 
 
-@tool
+@tool(speculative=True)
 def get_webpage(url: str) -> Result[str, Exception]:
     r"""Retrieve the text content of a web page.
 
@@ -60,7 +60,7 @@ class TrafilaturaWebpageReader(BaseToolkit):
         self.full_text = full_text
         super().__init__()
 
-    @tool
+    @tool(speculative=True)
     def trafilatura_webpage_reader(self, url: str) -> str:
         """Extracts the main content from a webpage using the trafilatura
         library.
@@ -92,6 +92,10 @@ class ModelBackendType(str, Enum):
     OPENAI_COMPLETION = "openai_completion"
     AZURE_CHAT = "azure_chat"
     AZURE_COMPLETION = "azure_completion"
+    RECORDING = "recording"
+    REPLAY = "replay"
+    ROUTER = "router"
+    MOCK = "mock"
 
 
 class MessageRole(str, Enum):
@@ -114,6 +118,7 @@ class CallBackEvent(str, Enum):
     LLM_END = "on_llm_end"
     LLM_ERROR = "on_llm_error"
     LLM_CHUNK = "on_llm_chunk"
+    LLM_CACHE_HIT = "on_llm_cache_hit"
     TOOL_START = "on_tool_start"
     TOOL_END = "on_tool_end"
     TOOL_ERROR = "on_tool_error"
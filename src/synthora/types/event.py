@@ -24,6 +24,7 @@ from pydantic import BaseModel
 
 from synthora.types.enums import CallBackEvent
 from synthora.types.node import Node
+from synthora.utils.codec import from_bytes, register_type, to_bytes
 
 
 class TraceEvent(BaseModel):
@@ -73,6 +74,41 @@ class TraceEvent(BaseModel):
         data["id"] = str(data["id"])
         return data
 
+    def to_bytes(self, codec: Optional[str] = None) -> bytes:
+        """
+        Serialize the TraceEvent.
+
+        Messages, results, nodes and errors in the event data are kept, other
+        values the codec cannot represent are stored as their `repr`.
+
+        Args:
+            codec:
+                Name of the codec, defaults to the fastest available.
+
+        Returns:
+            The serialized TraceEvent.
+        """
+        return to_bytes(self, codec)
+
+    @staticmethod
+    def from_bytes(data: bytes, codec: Optional[str] = None) -> "TraceEvent":
+        """
+        Deserialize a TraceEvent serialized by `to_bytes`.
+
+        Args:
+            data:
+                The serialized TraceEvent.
+            codec:
+                Name of the codec, detected from the data by default.
+
+        Returns:
+            The TraceEvent.
+        """
+        event = from_bytes(data, codec)
+        if not isinstance(event, TraceEvent):
+            raise TypeError(f"Expected a TraceEvent, got {type(event)}")
+        return event
+
     @staticmethod
     def create(
         type: CallBackEvent,
@@ -107,3 +143,13 @@ class TraceEvent(BaseModel):
             current=current,
             metadata=metadata,
         )
+
+
+register_type(
+    "event",
+    TraceEvent,
+    lambda event: {
+        name: getattr(event, name) for name in TraceEvent.model_fields
+    },
+    lambda data: TraceEvent.model_validate(data),
+)
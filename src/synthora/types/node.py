@@ -15,19 +15,67 @@
 # limitations under the License.
 #
 
-from typing import Optional
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 
 from synthora.types.enums import NodeType
 
 
-class Node(BaseModel):
+# The interned nodes, by name, type and ancestor. Nodes are dropped once no
+# longer used.
+_NODES: "weakref.WeakValueDictionary[Tuple[Any, ...], Node]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+class _InternedModel(type(BaseModel)):  # type: ignore[misc]
+    r"""Metaclass returning the existing node equal to a new one."""
+
+    def __call__(
+        cls,
+        name: Any = None,
+        type: Any = None,
+        ancestor: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        if ancestor is not None and not isinstance(ancestor, Node):
+            return cls.model_validate(
+                {"name": name, "type": type, "ancestor": ancestor, **kwargs}
+            )
+        node = _NODES.get((name, type, ancestor))
+        if node is not None and not kwargs:
+            return node
+        return super().__call__(
+            name=name, type=type, ancestor=ancestor, **kwargs
+        )
+
+
+def _restore(name: str, type: NodeType, ancestor: Optional["Node"]) -> "Node":
+    return Node(name=name, type=type, ancestor=ancestor)
+
+
+class Node(BaseModel, metaclass=_InternedModel):
     """A model representing a node in the agent execution tree.
 
     This class captures detailed information about nodes in the agent execution
     tree, including their name, type, and ancestor.
 
+    Nodes are immutable and interned: creating a node equal to an existing
+    one returns the existing node, so equal nodes are shared and usually
+    the same object. Equality checks identity first, and the hash and path
+    are computed once, so nodes are cheap dict keys. Copies of a node are
+    the node itself; use `with_ancestor` to move a node in the tree.
+
     Attributes:
         name:
             The name of the node.
@@ -37,6 +85,86 @@ class Node(BaseModel):
             The ancestor of the node, defaults to None.
     """
 
+    __slots__ = ("__weakref__", "_hash", "_path")
+
+    model_config = ConfigDict(frozen=True)
+
     name: str
     type: NodeType
     ancestor: Optional["Node"] = None
+
+    if TYPE_CHECKING:
+        _hash: int
+        _path: str
+
+    def model_post_init(self, context: Any) -> None:
+        ancestor = self.ancestor
+        key = (self.name, self.type, ancestor)
+        object.__setattr__(self, "_hash", hash(key))
+        object.__setattr__(
+            self,
+            "_path",
+            self.name if ancestor is None else f"{ancestor._path}/{self.name}",
+        )
+        _NODES.setdefault(key, self)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _intern(cls, data: Any, handler: Callable[[Any], "Node"]) -> "Node":
+        node = handler(data)
+        return _NODES.get((node.name, node.type, node.ancestor), node)
+
+    @property
+    def path(self) -> str:
+        """The names of the nodes from the root down to this node, joined by
+        "/"."""
+        return self._path
+
+    def with_ancestor(self, ancestor: Optional["Node"]) -> "Node":
+        """Get the node with the same name and type under another ancestor.
+
+        Args:
+            ancestor:
+                The new ancestor.
+
+        Returns:
+            The node.
+        """
+        if ancestor is self.ancestor:
+            return self
+        return Node(name=self.name, type=self.type, ancestor=ancestor)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Node) or self._hash != other._hash:
+            return False
+        return (
+            self.name == other.name
+            and self.type == other.type
+            and self.ancestor == other.ancestor
+        )
+
+    def __copy__(self) -> "Node":
+        return self
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "Node":
+        return self
+
+    def __reduce__(self) -> Any:
+        return _restore, (self.name, self.type, self.ancestor)
+
+    def model_copy(
+        self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False
+    ) -> "Node":
+        if not update:
+            return self
+        fields: Dict[str, Any] = {
+            "name": self.name,
+            "type": self.type,
+            "ancestor": self.ancestor,
+        }
+        return Node(**{**fields, **update})
@@ -15,8 +15,17 @@
 # limitations under the License.
 #
 
+from .codec import Codec, get_codec, register_codec, register_type
 from .function_schema import get_openai_tool_schema
-from .image import image2base64, is_url, parse_image
+from .image import (
+    IMAGE_CACHE,
+    ImageCache,
+    image2base64,
+    image_reference,
+    is_url,
+    iter_base64,
+    parse_image,
+)
 from .pydantic_model import get_pydantic_model
 from .yaml_loader import YAMLLoader
 
@@ -27,5 +36,13 @@ __all__ = [
     "is_url",
     "image2base64",
     "parse_image",
+    "image_reference",
+    "iter_base64",
+    "ImageCache",
+    "IMAGE_CACHE",
     "get_pydantic_model",
+    "Codec",
+    "get_codec",
+    "register_codec",
+    "register_type",
 ]
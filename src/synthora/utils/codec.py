@@ -0,0 +1,396 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import base64
+import builtins
+import importlib
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from synthora.types.enums import Err, Ok
+from synthora.types.node import Node
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# The key tagging the encoded values of non-JSON types.
+TAG = "__synthora__"
+
+# Modules whose pydantic models are rebuilt when decoding. Models of other
+# modules are decoded as plain dicts, so that decoding never imports modules
+# named by the data.
+MODEL_MODULES: Tuple[str, ...] = ("synthora.", "openai.types.")
+
+
+class Codec(ABC):
+    r"""Converts plain data (dicts, lists, strings, numbers, booleans and
+    None) to bytes and back."""
+
+    name: str
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        r"""Serialize plain data.
+
+        Args:
+            data: The data.
+
+        Returns:
+            bytes: The serialized data.
+        """
+        ...
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        r"""Deserialize data.
+
+        Args:
+            data: The serialized data.
+
+        Returns:
+            Any: The plain data.
+        """
+        ...
+
+
+class JsonCodec(Codec):
+    r"""JSON codec of the standard library."""
+
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(
+            data, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    r"""JSON codec backed by orjson."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError(
+                "The orjson codec requires orjson, install it with "
+                "`pip install orjson`."
+            )
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)  # type: ignore[no-any-return]
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    r"""MessagePack codec backed by msgpack."""
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError(
+                "The msgpack codec requires msgpack, install it with "
+                "`pip install msgpack`."
+            )
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data)  # type: ignore[no-any-return]
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, strict_map_key=False)
+
+
+CODECS: Dict[str, Type[Codec]] = {
+    "msgpack": MsgpackCodec,
+    "orjson": OrjsonCodec,
+    "json": JsonCodec,
+}
+
+_INSTANCES: Dict[str, Codec] = {}
+
+
+def get_codec(codec: Optional[str] = None) -> Codec:
+    r"""Get a codec by name.
+
+    Args:
+        codec: The name of the codec, among `CODECS`. Defaults to the
+            fastest available: msgpack, then orjson, then json.
+
+    Returns:
+        Codec: The codec.
+
+    Raises:
+        KeyError: If the codec is unknown.
+        ImportError: If the library of the codec is not installed.
+    """
+    if codec is None:
+        codec = (
+            "msgpack"
+            if msgpack is not None
+            else "orjson"
+            if orjson is not None
+            else "json"
+        )
+    instance = _INSTANCES.get(codec)
+    if instance is None:
+        instance = _INSTANCES[codec] = CODECS[codec]()
+    return instance
+
+
+def register_codec(codec: Type[Codec]) -> None:
+    r"""Register a codec under its name.
+
+    Args:
+        codec: The codec class.
+    """
+    CODECS[codec.name] = codec
+    _INSTANCES.pop(codec.name, None)
+
+
+def detect_codec(data: bytes) -> Codec:
+    r"""Get the codec able to read serialized data.
+
+    JSON documents start with "{" or "[", and are read with orjson if
+    available; anything else is read as MessagePack.
+
+    Args:
+        data: The serialized data.
+
+    Returns:
+        Codec: The codec.
+    """
+    if data[:1] in (b"{", b"["):
+        return get_codec("orjson" if orjson is not None else "json")
+    return get_codec("msgpack")
+
+
+_TYPES: Dict[str, Tuple[type, Callable[[Any], Any], Callable[[Any], Any]]] = {}
+_TAGS: Dict[type, str] = {}
+
+
+def register_type(
+    tag: str,
+    cls: type,
+    encode: Callable[[Any], Any],
+    decode: Callable[[Any], Any],
+) -> None:
+    r"""Register how to encode the instances of a type.
+
+    Instances, including those of subclasses, are encoded as
+    `{TAG: tag, "data": encode(value)}`, where `encode` returns plain data
+    or values `encode` handles, and decoded with `decode(data)`, which gets
+    the data already decoded.
+
+    Args:
+        tag: The tag of the type.
+        cls: The type.
+        encode: The function converting an instance to data.
+        decode: The function converting data to an instance.
+    """
+    _TYPES[tag] = (cls, encode, decode)
+    _TAGS[cls] = tag
+
+
+def _find_tag(value: Any) -> Optional[str]:
+    tag = _TAGS.get(type(value))
+    if tag is None:
+        for tag, (cls, _, _) in reversed(_TYPES.items()):
+            if isinstance(value, cls):
+                _TAGS[type(value)] = tag
+                return tag
+        return None
+    return tag
+
+
+def encode(value: Any) -> Any:
+    r"""Convert a value to plain data any codec serializes.
+
+    Registered types, `Result`s, exceptions, bytes and pydantic models are
+    tagged so that `decode` rebuilds them. Other values are encoded by
+    their `repr`.
+
+    Args:
+        value: The value.
+
+    Returns:
+        Any: The plain data.
+    """
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if isinstance(value, dict):
+        return {str(k): encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [encode(v) for v in value]
+    if isinstance(value, Enum):
+        return encode(value.value)
+    if isinstance(value, (str, int, float)):
+        return value
+    tag = _find_tag(value)
+    if tag is not None:
+        return {TAG: tag, "data": encode(_TYPES[tag][1](value))}
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {
+            TAG: "model",
+            "type": f"{cls.__module__}:{cls.__qualname__}",
+            "data": encode(value.model_dump(mode="json")),
+        }
+    return repr(value)
+
+
+def decode(data: Any) -> Any:
+    r"""Rebuild the values encoded by `encode`.
+
+    Args:
+        data: The plain data.
+
+    Returns:
+        Any: The value.
+    """
+    if isinstance(data, list):
+        return [decode(v) for v in data]
+    if not isinstance(data, dict):
+        return data
+    tag = data.get(TAG)
+    if tag is None:
+        return {k: decode(v) for k, v in data.items()}
+    if tag == "model":
+        return _load_model(data["type"], decode(data["data"]))
+    return _TYPES[tag][2](decode(data["data"]))
+
+
+def _load_model(name: str, data: Any) -> Any:
+    r"""Rebuild a pydantic model of a trusted module, otherwise keep its
+    data."""
+    module, _, qualname = name.partition(":")
+    if not module.startswith(MODEL_MODULES):
+        return data
+    try:
+        cls: Any = importlib.import_module(module)
+        for attr in qualname.split("."):
+            cls = getattr(cls, attr)
+    except (ImportError, AttributeError):
+        return data
+    if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+        return data
+    return cls.model_validate(data)
+
+
+def _encode_error(error: BaseException) -> Dict[str, Any]:
+    cls = type(error)
+    return {
+        "type": cls.__name__,
+        "module": cls.__module__,
+        "message": str(error),
+    }
+
+
+def _decode_error(data: Dict[str, Any]) -> BaseException:
+    r"""Rebuild a builtin exception, or an `Exception` for the others."""
+    cls = getattr(builtins, data["type"], None)
+    if (
+        data.get("module") == "builtins"
+        and isinstance(cls, type)
+        and issubclass(cls, Exception)
+    ):
+        return cls(data["message"])  # type: ignore[no-any-return]
+    return Exception(f"{data['type']}: {data['message']}")
+
+
+def to_bytes(value: Any, codec: Optional[str] = None) -> bytes:
+    r"""Serialize a value with a codec.
+
+    Args:
+        value: The value.
+        codec: The name of the codec, defaults to the fastest available.
+
+    Returns:
+        bytes: The serialized value.
+    """
+    return get_codec(codec).dumps(encode(value))
+
+
+def from_bytes(data: bytes, codec: Optional[str] = None) -> Any:
+    r"""Deserialize a value serialized by `to_bytes`.
+
+    Args:
+        data: The serialized value.
+        codec: The name of the codec, detected from the data by default.
+
+    Returns:
+        Any: The value.
+    """
+    reader = get_codec(codec) if codec is not None else detect_codec(data)
+    return decode(reader.loads(data))
+
+
+register_type("ok", Ok, lambda r: {"value": r.value}, lambda d: Ok(d["value"]))
+register_type(
+    "err",
+    Err,
+    lambda r: {"error": r.error, "value": r.value},
+    lambda d: Err(d["error"], d["value"]),
+)
+register_type("error", BaseException, _encode_error, _decode_error)
+register_type(
+    "bytes",
+    bytes,
+    lambda b: base64.b64encode(b).decode("ascii"),
+    base64.b64decode,
+)
+register_type(
+    "node", Node, lambda n: n.model_dump(mode="json"), Node.model_validate
+)
+register_type("uuid", UUID, str, UUID)
+register_type("datetime", datetime, datetime.isoformat, datetime.fromisoformat)
+
+
+__all__: List[str] = [
+    "Codec",
+    "JsonCodec",
+    "OrjsonCodec",
+    "MsgpackCodec",
+    "CODECS",
+    "get_codec",
+    "register_codec",
+    "detect_codec",
+    "register_type",
+    "encode",
+    "decode",
+    "to_bytes",
+    "from_bytes",
+]
@@ -16,11 +16,21 @@
 #
 
 import base64
+import io
 import mimetypes
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 
+# Bytes read at a time by the streaming encoder, a multiple of 3 so that the
+# encoded chunks join without padding.
+CHUNK_SIZE = 3 * 64 * 1024
+
+
 def parse_image(path: str) -> str:
     """Parse an image path and convert it to an appropriate format.
 
@@ -29,6 +39,9 @@ def parse_image(path: str) -> str:
     - Data URIs (data:...)
     - Local file paths (converts to base64)
 
+    Local files are encoded through `IMAGE_CACHE`, so an unchanged file is
+    read and encoded once.
+
     Args:
         path (str): The image path, URL, or data URI
 
@@ -48,7 +61,30 @@ def parse_image(path: str) -> str:
         return path
     if path.startswith("data:"):
         return path
-    return image2base64(path)
+    return IMAGE_CACHE.encode(path)
+
+
+def image_reference(path: str) -> str:
+    """Check an image path and return a reference to encode it later.
+
+    Messages keep references to their images, and encode them only when
+    they are sent, see `parse_image`.
+
+    Args:
+        path (str): The image path, URL, or data URI
+
+    Returns:
+        str: The URL or data URI as is, or the absolute path of a local
+            file.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist
+    """
+    if is_url(path) or path.startswith("data:"):
+        return path
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"The file at path {path} does not exist.")
+    return os.path.abspath(path)
 
 
 def is_url(path: str) -> bool:
@@ -69,11 +105,73 @@ def is_url(path: str) -> bool:
     return urlparse(path).scheme in ["http", "https"]
 
 
-def image2base64(path: str) -> str:
+def iter_base64(
+    file: Union[str, BinaryIO], chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """Encode a file to base64 chunk by chunk.
+
+    Only a chunk of the file is held in memory at a time, so large files
+    can be encoded to a stream, or joined without keeping their raw bytes.
+
+    Args:
+        file (Union[str, BinaryIO]): Path to the file, or a binary file
+        chunk_size (int): Bytes read at a time, rounded down to a multiple
+            of 3
+
+    Returns:
+        Iterator[str]: The base64 encoded chunks
+    """
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from iter_base64(f, chunk_size)
+        return
+    while chunk := file.read(chunk_size):
+        yield base64.b64encode(chunk).decode("ascii")
+
+
+def _recompress(
+    path: str, max_side: Optional[int], quality: Optional[int]
+) -> Tuple[bytes, Optional[str]]:
+    r"""Downscale and recompress an image with Pillow."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "Downscaling or recompressing images requires Pillow, "
+            "install it with `pip install pillow`."
+        )
+    with Image.open(path) as image:
+        fmt = image.format or "PNG"
+        if max_side is not None:
+            image.thumbnail((max_side, max_side))
+        options = {}
+        if quality is not None:
+            if fmt not in ("JPEG", "WEBP"):
+                image = image.convert("RGB")
+                fmt = "JPEG"
+            options["quality"] = quality
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, **options)
+    return buffer.getvalue(), Image.MIME.get(fmt)
+
+
+def image2base64(
+    path: str,
+    max_side: Optional[int] = None,
+    quality: Optional[int] = None,
+) -> str:
     """Convert a local image file to a base64 encoded data URI.
 
+    The file is encoded chunk by chunk, unless it is downscaled or
+    recompressed first, which requires Pillow.
+
     Args:
         path (str): Path to the local image file
+        max_side (Optional[int]): Downscale the image to fit in a square of
+            this side, in pixels
+        quality (Optional[int]): Recompress the image with this quality,
+            as JPEG unless it is a JPEG or WebP image
 
     Returns:
         str: Base64 encoded data URI string in format:
@@ -81,6 +179,7 @@ def image2base64(path: str) -> str:
 
     Raises:
         FileNotFoundError: If the specified file does not exist
+        ImportError: If the image is transformed and Pillow is not installed
 
     Example:
         >>> image2base64("image.jpg")
@@ -89,17 +188,112 @@ def image2base64(path: str) -> str:
     # Verify file exists
     if not Path(path).is_file():
         raise FileNotFoundError(f"The file at path {path} does not exist.")
-    mime_type, _ = mimetypes.guess_type(path)
 
     # Read and encode the image file
-    with open(path, "rb") as image_file:
-        base64_encoded = base64.b64encode(image_file.read()).decode("utf-8")
-
-    # Format the base64 string
-    base64_encoded = f"base64,{base64_encoded}"
+    if max_side is None and quality is None:
+        mime_type, _ = mimetypes.guess_type(path)
+        parts = ["base64,", *iter_base64(path)]
+    else:
+        data, mime_type = _recompress(path, max_side, quality)
+        parts = ["base64,", base64.b64encode(data).decode("ascii")]
 
     # Add MIME type if available
     if mime_type:
-        base64_encoded = f"data:{mime_type};{base64_encoded}"
+        parts.insert(0, f"data:{mime_type};")
+
+    return "".join(parts)
+
+
+class ImageCache:
+    r"""LRU cache of the data URIs of local images.
+
+    Entries are keyed by the path, modification time and size of the file,
+    so an edited file is encoded again. The same image attached to many
+    messages is then read and encoded once, and its messages share a single
+    string. Images can be downscaled and recompressed before encoding,
+    which requires Pillow.
+
+    Args:
+        max_size: The maximum number of images kept, unlimited if None.
+        max_bytes: The maximum total size of the data URIs kept, unlimited
+            if None. Defaults to 256 MiB.
+        max_side: Downscale images to fit in a square of this side, in
+            pixels, if given.
+        quality: Recompress images with this quality, if given.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = 128,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        max_side: Optional[int] = None,
+        quality: Optional[int] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.quality = quality
+        self._entries: OrderedDict[Tuple[object, ...], str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def encode(self, path: str) -> str:
+        r"""Get the data URI of a local image, encoding it if needed.
+
+        Args:
+            path: Path to the local image file.
+
+        Returns:
+            str: The data URI of the image.
+
+        Raises:
+            FileNotFoundError: If the specified file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise FileNotFoundError(f"The file at path {path} does not exist.")
+        key = (
+            os.path.realpath(path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            self.max_side,
+            self.quality,
+        )
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        data = image2base64(path, self.max_side, self.quality)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return data
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._bytes += len(data)
+            while (
+                self.max_size is not None
+                and len(self._entries) > self.max_size
+            ) or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+            return self._entries.get(key, data)
+
+    def clear(self) -> None:
+        r"""Remove all images."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        r"""The total size of the data URIs kept."""
+        return self._bytes
+
 
-    return base64_encoded
+# The process-wide cache `parse_image` encodes local images with.
+IMAGE_CACHE = ImageCache()
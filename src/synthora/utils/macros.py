@@ -16,7 +16,7 @@
 #
 
 import inspect
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from synthora.callbacks.base_manager import (
     AsyncCallBackManager,
@@ -72,6 +72,14 @@ def FORMAT_PROMPT(
     """
     if prompt is None:
         prompt = kwargs.get("__macro_locals__").get("self").prompt  # type: ignore[union-attr]
+    params = _prompt_params(kwargs)
+    if isinstance(prompt, dict):
+        return {k: v.format(**params) for k, v in prompt.items()}
+    return prompt.format(**params)
+
+
+def _prompt_params(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    r"""Get the values available to a prompt template in a macro."""
     params = {
         **kwargs,
         **globals(),
@@ -79,9 +87,54 @@ def FORMAT_PROMPT(
     }
     if "self" in params:
         del params["self"]
-    if isinstance(prompt, dict):
-        return {k: v.format(**params) for k, v in prompt.items()}
-    return prompt.format(**params)
+    return params
+
+
+@macro
+def SPLIT_PROMPT(
+    prompt: Optional[BasePrompt] = None,
+    **kwargs: Any,
+) -> Tuple[BasePrompt, Optional[BaseMessage]]:
+    r"""Split the prompt into a system prompt and a message of variables.
+
+    Unless the agent caches its prompt, the system prompt is the formatted
+    prompt and there is no message of variables, as with `FORMAT_PROMPT`.
+    Otherwise the system prompt is the template itself, which stays the
+    same across turns so the provider can cache the request prefix, and the
+    values of its variables are given by a system message to send after the
+    history.
+
+    Args:
+        prompt:
+            The prompt to split.
+        kwargs:
+            Dict[str, Any]: The local variables of the caller function.
+
+    Returns:
+        The system prompt and the message of variables, if any.
+    """
+    agent = kwargs.get("__macro_locals__").get("self")  # type: ignore[union-attr]
+    if prompt is None:
+        prompt = agent.prompt
+    params = _prompt_params(kwargs)
+    if not getattr(agent, "cache_prompt", False):
+        return prompt.format(**params), None  # type: ignore[union-attr]
+    variables = [
+        f"- {name}: {params[name]}"
+        for name in sorted(prompt.args)  # type: ignore[union-attr]
+        if name in params
+    ]
+    if not variables:
+        return prompt, None  # type: ignore[return-value]
+    return prompt, BaseMessage.create_message(  # type: ignore[return-value]
+        MessageRole.SYSTEM,
+        content="Values of the variables of the system prompt:\n"
+        + "\n".join(variables),
+        source=Node(
+            name=agent.name, type=NodeType.SYSTEM, ancestor=agent.source
+        ),
+        validate=False,
+    )
 
 
 @macro
@@ -119,11 +172,13 @@ def UPDATE_SYSTEM(
                 MessageRole.SYSTEM,
                 content=prompt,
                 source=Node(name=name, type=NodeType.SYSTEM, ancestor=source),
+                validate=False,
             )
         )
     else:
         if history[0].role == MessageRole.SYSTEM:
-            history[0].content = prompt
+            if history[0].content != prompt:
+                history[0].content = prompt
         else:
             for i, message in enumerate(history):
                 if message.role == MessageRole.SYSTEM:
@@ -137,6 +192,7 @@ def UPDATE_SYSTEM(
                     source=Node(
                         name=name, type=NodeType.SYSTEM, ancestor=source
                     ),
+                    validate=False,
                 ),
             )
 
@@ -33,6 +33,7 @@ except ImportError:
     from typing_extensions import Self
 from uuid import uuid4
 
+from synthora.callbacks.usage_handler import usage_scope
 from synthora.types.enums import TaskState
 
 
@@ -218,18 +219,21 @@ class BaseTask(ABC):
         Returns:
             The computed result of the task.
         """
-        if self.immutable:
-            from synthora.workflows.context.base import BaseContext
-
-            if args and isinstance(args[0], BaseContext):
-                self._result = self.func(args[0], *self._args, **self._kwargs)
-            else:
-                self._result = self.func(*self._args, **self._kwargs)
+        with usage_scope(task=self.name):
+            if self.immutable:
+                from synthora.workflows.context.base import BaseContext
+
+                if args and isinstance(args[0], BaseContext):
+                    self._result = self.func(
+                        args[0], *self._args, **self._kwargs
+                    )
+                else:
+                    self._result = self.func(*self._args, **self._kwargs)
+                return self._result
+            args += tuple(self._args)
+            kwargs.update(self._kwargs)
+            self._result = self.func(*args, **kwargs)
             return self._result
-        args += tuple(self._args)
-        kwargs.update(self._kwargs)
-        self._result = self.func(*args, **kwargs)
-        return self._result
 
     def __or__(
         self, other: Union["BaseScheduler", "BaseTask"]
@@ -326,20 +330,21 @@ class AsyncTask(BaseTask):
         Returns:
             The computed result of the task.
         """
-        if self.immutable:
-            from synthora.workflows.context.base import BaseContext
-
-            if args and isinstance(args[0], BaseContext):
-                self._result = await self.func(
-                    args[0], *self._args, **self._kwargs
-                )
-            else:
-                self._result = await self.func(*self._args, **self._kwargs)
+        with usage_scope(task=self.name):
+            if self.immutable:
+                from synthora.workflows.context.base import BaseContext
+
+                if args and isinstance(args[0], BaseContext):
+                    self._result = await self.func(
+                        args[0], *self._args, **self._kwargs
+                    )
+                else:
+                    self._result = await self.func(*self._args, **self._kwargs)
+                return self._result
+            args += tuple(self._args)
+            kwargs.update(self._kwargs)
+            self._result = await self.func(*args, **kwargs)
             return self._result
-        args += tuple(self._args)
-        kwargs.update(self._kwargs)
-        self._result = await self.func(*args, **kwargs)
-        return self._result
 
     async def async_run(self, *args: Any, **kwargs: Any) -> Any:
         r"""Call the task asynchronously.
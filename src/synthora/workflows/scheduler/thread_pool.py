@@ -16,6 +16,7 @@
 #
 
 from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
 from typing import Any, List, Optional, Union
 
 from synthora.types.enums import TaskState
@@ -76,10 +77,16 @@ class ThreadPoolScheduler(BaseScheduler):
         args = tuple(prev_args) + args
         if isinstance(current, BaseTask):
             if self.need_context(current):
-                return executor.submit(current, self.context, *args, **kwargs)
-            return executor.submit(current, *args, **kwargs)
+                return executor.submit(
+                    copy_context().run, current, self.context, *args, **kwargs
+                )
+            return executor.submit(
+                copy_context().run, current, *args, **kwargs
+            )
         elif isinstance(current, BaseScheduler):
-            return executor.submit(current.run, *args, **kwargs)
+            return executor.submit(
+                copy_context().run, current.run, *args, **kwargs
+            )
 
     async def _async_run(
         self,
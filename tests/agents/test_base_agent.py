@@ -14,3 +14,80 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+
+import pytest
+
+from synthora.agents import VanillaAgent
+from synthora.toolkits.decorators import tool
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Add two numbers together"""
+    return a + b
+
+
+@tool
+def multiply(a: int, b: int) -> int:
+    """Multiply two numbers together"""
+    return a * b
+
+
+@pytest.fixture
+def agent(monkeypatch: pytest.MonkeyPatch) -> VanillaAgent:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return VanillaAgent.default("You are a helpful assistant.", tools=[add])
+
+
+class TestBaseAgentIndex:
+    def test_get_tool(self, agent: VanillaAgent):
+        assert agent.get_tool("add") is add
+        with pytest.raises(ValueError):
+            agent.get_tool("multiply")
+
+    def test_add_and_remove_tool(self, agent: VanillaAgent):
+        agent.add_tool(multiply)
+        assert agent.get_tool("multiply") is multiply
+        assert agent.get_compents(multiply.source) is multiply
+
+        agent.remove_tool(multiply)
+        with pytest.raises(ValueError):
+            agent.get_tool("multiply")
+        assert agent.get_compents(multiply.source) is None
+
+    def test_get_compents(self, agent: VanillaAgent):
+        assert agent.get_compents(agent.source) is agent
+        assert agent.get_compents(agent.model.source) is agent.model
+        assert agent.get_compents(add.source) is add
+        # An equal node that is not the registered instance still resolves.
+        assert agent.get_compents(agent.model.source.model_copy()) is (
+            agent.model
+        )
+
+    def test_sub_agent_registers_into_parent(self, agent: VanillaAgent):
+        sub_agent = VanillaAgent.default("You are a sub agent.", name="sub")
+        agent.add_tool(sub_agent)
+        assert agent.get_tool("sub") is sub_agent
+        assert agent.get_compents(sub_agent.model.source) is sub_agent.model
+
+        sub_agent.add_tool(multiply)
+        assert agent.get_compents(multiply.source) is multiply
+
+        sub_agent.set_name("renamed")
+        assert agent.get_tool("renamed") is sub_agent
+
+        agent.remove_tool(sub_agent)
+        assert agent.get_compents(sub_agent.model.source) is None
+
+    def test_set_ancestor(self, agent: VanillaAgent):
+        root = Node(name="root", type=NodeType.AGENT)
+        agent.set_ancestor(root)
+
+        assert agent.source.ancestor is root
+        assert agent.model.source.ancestor is agent.source
+        assert add.source.ancestor is agent.source
+        assert agent.get_compents(add.source) is add
+        assert agent.get_compents(agent.model.source) is agent.model
+        add.set_ancestor(None)
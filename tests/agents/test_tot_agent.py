@@ -14,3 +14,386 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from conftest import FAKE_LOCK, FakeBackend
+
+from synthora.agents import ToTAgent
+from synthora.agents.tot_agent import EvalFormat, EvaluationCache
+from synthora.configs.agent_config import AgentConfig
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import assistant
+from synthora.messages.base import BaseMessage
+from synthora.prompts.base import BasePrompt
+from synthora.types.enums import AgentType, NodeType
+from synthora.types.node import Node
+
+
+class SampleBackend(FakeBackend):
+    def run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        n = kwargs.pop("n", 1)
+        self.n = n
+        return [
+            super(SampleBackend, self).run(messages, *args, **kwargs)
+            for _ in range(n)
+        ]
+
+
+class GatedBackend(FakeBackend):
+    def __init__(self, fast: int, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.fast = fast
+        self.gate = threading.Event()
+        self.returned = 0
+
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        if call > self.fast:
+            self.gate.wait(5)
+        response = super().response(messages, call)
+        with FAKE_LOCK:
+            self.returned += 1
+        return response
+
+
+def evaluation(score: float, finished: bool) -> BaseMessage:
+    message = assistant("evaluation")
+    message.parsed = EvalFormat(
+        score=score, reason="reason", finished=finished
+    )
+    return message
+
+
+def create_agent(
+    propose: FakeBackend, value: FakeBackend, source: Node, **kwargs: Any
+) -> ToTAgent:
+    config = AgentConfig(
+        name="tot",
+        type=AgentType.TOT,
+        model=ModelConfig(model_type="fake"),
+        prompt={"propose": BasePrompt("propose"), "value": BasePrompt("v")},
+    )
+    return ToTAgent(
+        config,
+        source,
+        [propose, value],
+        config.prompt,  # type: ignore[arg-type]
+        level_size=3,
+        **kwargs,
+    )
+
+
+class TestToTAgent:
+    def test_run_shares_models(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(
+            source=source,
+            responses=[assistant("a"), assistant("b"), assistant("c")],
+        )
+        value = FakeBackend(
+            source=source,
+            responses=[evaluation(0.5, False), evaluation(0.95, True)],
+        )
+        agent = create_agent(propose, value, source)
+
+        result = agent.run("question")
+
+        assert result.is_ok
+        assert result.unwrap().content in ["a", "b", "c"]
+        assert propose.calls == 3
+        assert value.calls == 3
+        assert agent.get_executor() is ToTAgent.get_executor()
+
+    def test_run_gives_up(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.0, False)])
+        agent = create_agent(propose, value, source)
+
+        result = agent.run("question")
+
+        assert result.is_err
+
+    def test_duplicate_states_are_evaluated_once(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.95, True)])
+        agent = create_agent(propose, value, source)
+
+        assert agent.run("question").is_ok
+        assert propose.calls == 3
+        assert value.calls == 1
+
+        agent.reset()
+        assert agent.run("question").is_ok
+        assert value.calls == 1
+
+    async def test_async_run(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.95, True)])
+        agent = create_agent(propose, value, source)
+
+        result = await agent.async_run("question")
+
+        assert result.is_ok
+        assert result.unwrap().content == "answer"
+        assert propose.calls == 3
+        assert value.calls == 1
+
+    def test_sample_proposals(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = SampleBackend(
+            source=source,
+            responses=[assistant("a"), assistant("b"), assistant("c")],
+        )
+        value = FakeBackend(source=source, responses=[evaluation(0.95, True)])
+        agent = create_agent(propose, value, source, sample_proposals=True)
+
+        result = agent.run("question")
+
+        assert result.unwrap().content == "a"
+        assert propose.n == 3  # type: ignore[attr-defined]
+        assert asyncio.run(agent.async_run("question")).is_ok
+
+    def test_fewer_samples_than_level_size(self):
+        class TwoSamplesBackend(SampleBackend):
+            def run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+                return super().run(messages, *args, **kwargs)[:2]
+
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = TwoSamplesBackend(
+            source=source, responses=[assistant(str(i)) for i in range(12)]
+        )
+        value = FakeBackend(source=source, responses=[evaluation(0.5, False)])
+        agent = create_agent(
+            propose,
+            value,
+            source,
+            sample_proposals=True,
+            search_method="best_first",
+            max_turns=3,
+        )
+
+        agent.run("question")
+
+        assert [len(level) for level in agent.states] == [2, 4]
+        assert [len(level) for level in agent.scores] == [2, 4]
+        assert value.calls == 6
+
+    @pytest.mark.parametrize("sample_proposals", [False, True])
+    async def test_cache_prompt(self, sample_proposals: bool):
+        class RecordingBackend(
+            SampleBackend if sample_proposals else FakeBackend
+        ):
+            def response(
+                self, messages: List[BaseMessage], call: int
+            ) -> BaseMessage:
+                with FAKE_LOCK:
+                    self.messages = getattr(self, "messages", [])
+                    self.messages.append(list(messages))
+                return super().response(messages, call)
+
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = RecordingBackend(source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.95, True)])
+        config = AgentConfig(
+            name="tot",
+            type=AgentType.TOT,
+            model=ModelConfig(model_type="fake"),
+            prompt={
+                "propose": BasePrompt("Propose for {user}."),
+                "value": BasePrompt("v"),
+            },
+            cache_prompt=True,
+        )
+        agent = ToTAgent(
+            config,
+            source,
+            [propose, value],
+            config.prompt,  # type: ignore[arg-type]
+            level_size=3,
+            sample_proposals=sample_proposals,
+        )
+
+        assert agent.run("question", user="Ada").is_ok
+        agent.reset()
+        assert (await agent.async_run("question", user="Bob")).is_ok
+
+        first, last = propose.messages[0], propose.messages[-1]  # type: ignore[attr-defined]
+        assert first[0].content == last[0].content == "Propose for {user}."
+        assert first[-1].content.endswith("- user: Ada")
+        assert last[-1].content.endswith("- user: Bob")
+        assert agent.history[0].content == "Propose for {user}."
+
+
+class TestToTSearch:
+    def create_search(self, search_method: str) -> ToTAgent:
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(source=source, responses=["answer"])
+        agent = create_agent(
+            propose,
+            FakeBackend(source=source, responses=[evaluation(0.0, False)]),
+            source,
+            search_method=search_method,
+            beam_width=2,
+        )
+        agent.states.append([])
+        agent.scores.append([])
+        agent.visited.append([])
+        return agent
+
+    def add_level(self, agent: ToTAgent, scores: List[float]) -> None:
+        while len(agent.states) <= agent.cursor:
+            agent.states.append([])
+            agent.scores.append([])
+            agent.visited.append([])
+        agent._added = len(scores)
+        for score in scores:
+            agent.states[agent.cursor].append([assistant(str(score))])
+            agent.scores[agent.cursor].append(score)
+            agent.visited[agent.cursor].append(False)
+
+    def test_best_first(self):
+        agent = self.create_search("best_first")
+        self.add_level(agent, [0.3, 0.8, 0.5])
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.8"
+        assert agent.cursor == 1
+
+        self.add_level(agent, [0.1, 0.4, 0.7])
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.7"
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.5"
+        assert agent.cursor == 1
+
+    def test_beam(self):
+        agent = self.create_search("beam")
+        self.add_level(agent, [0.3, 0.8, 0.5])
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.8"
+
+        self.add_level(agent, [0.9, 0.1, 0.4])
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.5"
+        assert agent.cursor == 1
+
+        self.add_level(agent, [0.6, 0.15, 0.05])
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.9"
+        agent._set_next_state()
+        assert agent.history[-1].content == "0.6"
+        with pytest.raises(Exception):
+            agent._set_next_state()
+
+    def test_unknown_search_method(self):
+        with pytest.raises(ValueError):
+            self.create_search("unknown")
+
+    def test_anytime_token_budget(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        proposal = assistant("answer")
+        proposal.metadata = {"usage": SimpleNamespace(total_tokens=100)}
+        propose = FakeBackend(source=source, responses=[proposal])
+        value = FakeBackend(source=source, responses=[evaluation(0.5, False)])
+        agent = create_agent(propose, value, source, token_budget=150)
+
+        result = agent.run("question")
+
+        assert result.is_ok
+        assert result.unwrap().content == "answer"
+        assert propose.calls == 3
+
+    def test_anytime_deadline(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.5, False)])
+        agent = create_agent(propose, value, source, deadline=0)
+
+        result = agent.run("question")
+
+        assert result.is_err
+        assert propose.calls == 0
+
+    def test_deadline_stops_waiting(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = GatedBackend(3, source=source, responses=["answer"])
+        value = FakeBackend(source=source, responses=[evaluation(0.5, False)])
+        agent = create_agent(propose, value, source, deadline=0.2)
+
+        result = agent.run("question")
+        returned = propose.returned
+        propose.gate.set()
+
+        assert result.unwrap().content == "answer"
+        assert propose.calls == 6
+        assert returned == 3
+
+    async def test_async_deadline_cancels(self):
+        source = Node(name="tot", type=NodeType.AGENT)
+        propose = FakeBackend(
+            source=source, responses=["answer"], delays=[0, 0, 0, 5, 5, 5]
+        )
+        value = FakeBackend(source=source, responses=[evaluation(0.5, False)])
+        agent = create_agent(propose, value, source, deadline=0.2)
+
+        result = await agent.async_run("question")
+
+        assert result.unwrap().content == "answer"
+        assert propose.calls == 6
+        assert propose.cancelled == 3
+
+
+class TestEvaluationCache:
+    def test_key_ignores_ids(self):
+        first = assistant("answer")
+        second = assistant("answer")
+        second.id = "other"
+        assert EvaluationCache.make_key("q", [first]) == (
+            EvaluationCache.make_key("q", [second])
+        )
+        assert EvaluationCache.make_key("q", [first]) != (
+            EvaluationCache.make_key("other", [first])
+        )
+
+    def test_persistence(self, tmp_path):
+        path = tmp_path / "cache.json"
+        cache = EvaluationCache(path)
+        key = EvaluationCache.make_key("q", [assistant("answer")])
+        cache.put(key, EvalFormat(score=0.5, reason="ok", finished=False))
+        assert not path.exists()
+
+        cache.flush()
+        loaded = EvaluationCache(path)
+        assert loaded.get(key) == cache.get(key)
+
+    def test_flushed_by_runs(self, tmp_path):
+        source = Node(name="tot", type=NodeType.AGENT)
+        path = tmp_path / "cache.json"
+        agent = create_agent(
+            FakeBackend(source=source, responses=["answer"]),
+            FakeBackend(source=source, responses=[evaluation(0.95, True)]),
+            source,
+            eval_cache=EvaluationCache(path),
+        )
+
+        assert agent.run("question").is_ok
+        assert len(EvaluationCache(path)) == 1
+
+        agent.eval_cache.clear()
+        path.unlink()
+        assert asyncio.run(agent.async_run("question")).is_ok
+        assert len(EvaluationCache(path)) == 1
+
+    def test_max_size(self):
+        cache = EvaluationCache(max_size=1)
+        evaluation = EvalFormat(score=0.5, reason="ok", finished=False)
+        cache.put("a", evaluation)
+        cache.put("b", evaluation)
+        assert "a" not in cache
+        assert cache.get("b") == evaluation
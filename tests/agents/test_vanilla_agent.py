@@ -14,3 +14,220 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+
+import asyncio
+import threading
+from typing import Any, AsyncGenerator, Generator, List, Optional
+
+from conftest import FakeBackend
+
+from synthora.agents import VanillaAgent
+from synthora.configs.agent_config import AgentConfig
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import assistant
+from synthora.messages.base import BaseMessage
+from synthora.models.mock import MockBackend
+from synthora.prompts.base import BasePrompt
+from synthora.toolkits.decorators import tool
+from synthora.types import ChatCompletionMessageToolCall
+from synthora.types.enums import (
+    AgentType,
+    MessageRole,
+    NodeType,
+)
+from synthora.types.node import Node
+
+
+def tool_call_chunk(
+    arguments: str, finish_reason: Optional[str] = None
+) -> BaseMessage:
+    return BaseMessage(
+        source=Node(name="fake", type=NodeType.AGENT),
+        role=MessageRole.ASSISTANT,
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="call_1",
+                type="function",
+                function={"name": "lookup", "arguments": arguments},
+            )
+        ],
+        metadata={"finish_reason": finish_reason},
+    )
+
+
+class StreamBackend(FakeBackend):
+    def __init__(
+        self, started: threading.Event, finish: bool = True, timeout: float = 1
+    ) -> None:
+        super().__init__()
+        self.started = started
+        self.finish = finish
+        self.timeout = timeout
+        self.started_during_stream = False
+
+    def chunks(self) -> List[BaseMessage]:
+        chunks = [
+            tool_call_chunk('{"query": "a'),
+            tool_call_chunk('{"query": "a"}'),
+        ]
+        if self.finish:
+            chunks.append(tool_call_chunk('{"query": "a"}', "tool_calls"))
+        return chunks
+
+    def run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        if self.calls > 1:
+            return assistant("done")
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            chunks = self.chunks()
+            yield from chunks[:2]
+            self.started_during_stream = self.started.wait(self.timeout)
+            yield from chunks[2:]
+
+        return stream()
+
+    async def async_run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        if self.calls > 1:
+            return assistant("done")
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            chunks = self.chunks()
+            for chunk in chunks[:2]:
+                yield chunk
+            for _ in range(int(self.timeout * 100)):
+                if self.started.is_set():
+                    break
+                await asyncio.sleep(0.01)
+            self.started_during_stream = self.started.is_set()
+            for chunk in chunks[2:]:
+                yield chunk
+
+        return stream()
+
+
+class TestSpeculativeTools:
+    def create_agent(
+        self, backend: StreamBackend, speculative: bool = True
+    ) -> VanillaAgent:
+        calls = []
+
+        @tool(speculative=speculative)
+        def lookup(query: str) -> str:
+            """Look up a query."""
+            calls.append(query)
+            backend.started.set()
+            return query.upper()
+
+        config = AgentConfig(
+            name="vanilla",
+            type=AgentType.VANILLA,
+            model=ModelConfig(model_type="fake"),
+            prompt=BasePrompt("prompt"),
+            speculative_tools=True,
+        )
+        agent = VanillaAgent(
+            config, backend.source, backend, config.prompt, [lookup]
+        )
+        agent.calls = calls  # type: ignore[attr-defined]
+        return agent
+
+    def test_tool_starts_while_streaming(self):
+        backend = StreamBackend(threading.Event())
+        agent = self.create_agent(backend)
+
+        result = agent.run("question")
+
+        assert result.unwrap().content == "done"
+        assert backend.started_during_stream
+        assert agent.calls == ["a"]  # type: ignore[attr-defined]
+        assert agent.history[-2].content == "A"
+
+    def test_unsafe_tool_waits_for_stream(self):
+        backend = StreamBackend(threading.Event(), timeout=0.1)
+        agent = self.create_agent(backend, speculative=False)
+
+        result = agent.run("question")
+
+        assert result.unwrap().content == "done"
+        assert not backend.started_during_stream
+        assert agent.calls == ["a"]  # type: ignore[attr-defined]
+
+    def test_aborted_stream_discards_result(self):
+        backend = StreamBackend(threading.Event(), finish=False)
+        agent = self.create_agent(backend)
+
+        result = agent.run("question")
+
+        assert result.unwrap().content == "done"
+        assert backend.started_during_stream
+        assert agent.calls == ["a", "a"]  # type: ignore[attr-defined]
+        assert len(agent._speculation) == 0
+
+    def test_async_tool_starts_while_streaming(self):
+        backend = StreamBackend(threading.Event())
+        agent = self.create_agent(backend)
+
+        result = asyncio.run(agent.async_run("question"))
+
+        assert result.unwrap().content == "done"
+        assert backend.started_during_stream
+        assert agent.calls == ["a"]  # type: ignore[attr-defined]
+
+
+class RecordingMock(MockBackend):
+    def run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        self.requests = getattr(self, "requests", [])
+        self.requests.append([m.to_openai_message() for m in messages])
+        return super().run(messages, *args, **kwargs)
+
+
+class TestCachePrompt:
+    def create_agent(self, cache_prompt: bool) -> VanillaAgent:
+        @tool
+        def zeta() -> str:
+            """Zeta."""
+            return "z"
+
+        @tool
+        def alpha() -> str:
+            """Alpha."""
+            return "a"
+
+        config = AgentConfig(
+            name="vanilla",
+            type=AgentType.VANILLA,
+            model=ModelConfig(model_type="mock", backend="mock"),
+            prompt=BasePrompt("You help {user} on {date}."),
+            cache_prompt=cache_prompt,
+        )
+        model = RecordingMock(template="ok")
+        return VanillaAgent(
+            config, model.source, model, config.prompt, [zeta, alpha]
+        )
+
+    def test_stable_prefix(self):
+        agent = self.create_agent(cache_prompt=True)
+        names = [s["function"]["name"] for s in agent.model.config["tools"]]
+        assert names == ["alpha", "zeta"]
+
+        agent.run("hi", user="Ada", date="Monday")
+        agent.run("again", user="Ada", date="Tuesday")
+
+        first, second = agent.model.requests  # type: ignore[attr-defined]
+        assert first[0] == second[0]
+        assert first[0]["content"] == "You help {user} on {date}."
+        assert second[:3] == first[:2] + [second[2]]
+        assert second[-1]["role"] == "system"
+        assert second[-1]["content"].endswith("- date: Tuesday\n- user: Ada")
+        assert all(m.role != MessageRole.SYSTEM for m in agent.history[1:])
+
+    def test_formatted_prompt_by_default(self):
+        agent = self.create_agent(cache_prompt=False)
+
+        agent.run("hi", user="Ada", date="Monday")
+
+        (request,) = agent.model.requests  # type: ignore[attr-defined]
+        assert request[0]["content"] == "You help Ada on Monday."
+        assert request[-1]["role"] == "user"
@@ -0,0 +1,182 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import json
+
+from synthora.callbacks import UsageLedger, usage_scope
+from synthora.memories import SummaryMemory
+from synthora.messages import user
+from synthora.models.cache import CachedBackend, InMemoryResponseCache
+from synthora.models.hedging import HedgedBackend
+from synthora.models.mock import MockBackend
+from synthora.types import CompletionUsage
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+from synthora.workflows.base_task import BaseTask
+
+
+def agent_node(*names: str) -> Node:
+    node = None
+    for name in names:
+        node = Node(name=name, type=NodeType.AGENT, ancestor=node)
+    return Node(name="model", type=NodeType.MODEL, ancestor=node)
+
+
+USAGE = CompletionUsage.model_validate(
+    {
+        "prompt_tokens": 1000,
+        "completion_tokens": 100,
+        "total_tokens": 1100,
+        "prompt_tokens_details": {"cached_tokens": 400},
+    }
+)
+
+
+class TestUsageLedger:
+    def test_record_and_cost(self):
+        ledger = UsageLedger()
+        ledger.record(
+            agent_node("planner", "coder"), USAGE, "gpt-4o-2024-08-06"
+        )
+
+        total = ledger.snapshot()["total"]
+        assert total["requests"] == 1
+        assert total["total_tokens"] == 1100
+        assert total["cached_tokens"] == 400
+        expected = (600 * 2.50 + 400 * 1.25 + 100 * 10.00) / 1e6
+        assert abs(total["cost"] - expected) < 1e-12
+
+        snapshot = ledger.snapshot()
+        assert list(snapshot["agent"]) == ["coder"]
+        assert list(snapshot["path"]) == ["planner/coder"]
+        assert list(snapshot["model"]) == ["gpt-4o-2024-08-06"]
+
+    def test_prices(self):
+        ledger = UsageLedger({"my-model": (1.0, 0.5, 2.0)})
+
+        assert ledger.price("my-model-v2") == (1.0, 0.5, 2.0)
+        assert ledger.price("gpt-4o") == (0.0, 0.0, 0.0)
+        assert UsageLedger().price("gpt-4o-mini-2024")[0] == 0.15
+
+    def test_scopes(self):
+        ledger = UsageLedger()
+        source = agent_node("agent")
+
+        with usage_scope(request="r1"):
+            BaseTask(
+                lambda: ledger.record(source, {"prompt_tokens": 1}, "m"),
+                name="t1",
+            )()
+            ledger.record(source, {"prompt_tokens": 2}, "m")
+        ledger.record(source, {"prompt_tokens": 4}, "m")
+
+        snapshot = ledger.snapshot()
+        assert snapshot["request"]["r1"]["prompt_tokens"] == 3
+        assert snapshot["task"]["t1"]["prompt_tokens"] == 1
+        assert snapshot["total"]["prompt_tokens"] == 7
+
+    def test_scopes_in_library_threads(self):
+        ledger = UsageLedger()
+        model = HedgedBackend(
+            MockBackend(responses=["hello"], handlers=[ledger]), min_samples=1
+        )
+        memory = SummaryMemory(
+            n=2,
+            cache_size=2,
+            summary_model=MockBackend(
+                responses=["summary"], handlers=[ledger]
+            ),
+        )
+
+        with usage_scope(request="r1"):
+            model.run([user("hi")])
+            model.run([user("hi")])
+            for i in range(3):
+                memory.append(user(f"{i}"))
+        memory.wait()
+
+        snapshot = ledger.snapshot()
+        assert snapshot["total"]["requests"] == 3
+        assert snapshot["request"]["r1"]["requests"] == 3
+
+    def test_stream_usage_from_backend(self):
+        ledger = UsageLedger()
+        model = MockBackend(
+            responses=["hello there"],
+            config={"stream": True},
+            handlers=[ledger],
+        )
+        model._request_stream_usage(model.config)
+
+        messages = list(model.run([user("hi")]))
+        assert messages[-1].metadata["usage"] is not None
+        assert ledger.snapshot()["model"]["mock"]["requests"] == 1
+
+        async def main() -> None:
+            model.set_stream(False)
+            await model.async_run([user("hi")])
+
+        asyncio.run(main())
+        assert ledger.total.requests == 2
+
+    def test_cache_hits_not_counted(self):
+        ledger = UsageLedger()
+        model = CachedBackend(
+            MockBackend(responses=["hello"]),
+            InMemoryResponseCache(),
+            handlers=[ledger],
+        )
+
+        first = model.run([user("hi")])
+        second = model.run([user("hi")])
+        assert second.content == first.content
+        assert second.metadata["usage"] is not None
+        assert ledger.total.requests == 1
+
+        async def main() -> None:
+            await model.async_run([user("hi")])
+            model.set_stream(True)
+            list(model.run([user("hi")]))
+
+        asyncio.run(main())
+        assert ledger.total.requests == 1
+        assert not ledger._cache_hits
+
+    def test_copy_export_reset(self, tmp_path):
+        ledger = UsageLedger()
+        assert copy.deepcopy(ledger) is ledger
+
+        ledger.record(agent_node("agent"), USAGE, "gpt-4o")
+        path = tmp_path / "usage.json"
+        ledger.export(str(path))
+        assert json.loads(path.read_text())["total"]["requests"] == 1
+
+        ledger.reset()
+        assert ledger.snapshot()["total"]["requests"] == 0
+
+
+class TestStreamUsageRequest:
+    def test_request_stream_usage(self):
+        kwargs = {}
+        MockBackend._request_stream_usage(kwargs)
+        assert kwargs == {"stream_options": {"include_usage": True}}
+
+        kwargs = {"stream_options": None}
+        MockBackend._request_stream_usage(kwargs)
+        assert kwargs == {}
@@ -15,10 +15,34 @@
 # limitations under the License.
 #
 
+import asyncio
 import os
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import pytest
 
+from synthora.messages import assistant
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BaseModelBackend
+from synthora.types.enums import ModelBackendType, NodeType
+from synthora.types.node import Node
+
+
+# Guards the counters of fake backends, which deepcopy must not copy.
+FAKE_LOCK = threading.Lock()
+
 
 def pytest_runtest_setup(item):
     """Check if tests have the @pytest.mark.requires_env decorator."""
@@ -29,3 +53,116 @@ def pytest_runtest_setup(item):
         pytest.skip(
             f"Skipping test since environment variable '{env_var}' is not set."
         )
+
+
+class FakeBackend(BaseModelBackend):
+    r"""Configurable in-process backend shared by the model and agent tests.
+
+    Responses are taken in turn from `responses`, cycling when exhausted,
+    or else are the name of the backend; subclasses override `response`
+    and `chunks` for anything else. Each call waits for the next of
+    `delays`, or `delay`, then raises `error` if set. A stream, when the
+    call or the config asks for one, yields `chunks`, waiting `chunk_delay`
+    before each.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        responses: Optional[Sequence[Union[str, BaseMessage]]] = None,
+        delay: float = 0,
+        delays: Optional[List[float]] = None,
+        error: Optional[Exception] = None,
+        chunk_delay: float = 0,
+        config: Optional[Dict[str, Any]] = None,
+        source: Optional[Node] = None,
+    ) -> None:
+        super().__init__(
+            "fake",
+            source or Node(name="fake", type=NodeType.AGENT),
+            ModelBackendType.OPENAI_CHAT,
+            config,
+            name=name,
+        )
+        self.responses = list(responses or [])
+        self.delay = delay
+        self.delays = list(delays or [])
+        self.error = error
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.requests: List[Dict[str, Any]] = []
+        self.active = 0
+        self.peak = 0
+        self.closed = 0
+        self.cancelled = 0
+
+    @staticmethod
+    def default(*args: Any, **kwargs: Any) -> "FakeBackend":
+        raise NotImplementedError
+
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        if self.error is not None:
+            raise self.error
+        if not self.responses:
+            return assistant(self.name)
+        response = self.responses[(call - 1) % len(self.responses)]
+        return assistant(response) if isinstance(response, str) else response
+
+    def chunks(self, message: BaseMessage) -> List[BaseMessage]:
+        return [message]
+
+    def _start(self, kwargs: Dict[str, Any]) -> Tuple[float, int]:
+        with FAKE_LOCK:
+            self.calls += 1
+            self.requests.append(kwargs)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            delay = self.delays.pop(0) if self.delays else self.delay
+            return delay, self.calls
+
+    def _finish(self) -> None:
+        with FAKE_LOCK:
+            self.active -= 1
+
+    def run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        delay, call = self._start(kwargs)
+        try:
+            time.sleep(delay)
+        finally:
+            self._finish()
+        message = self.response(messages, call)
+        if not kwargs.get("stream", self.stream):
+            return message
+
+        def stream() -> Generator[BaseMessage, None, None]:
+            try:
+                for chunk in self.chunks(message):
+                    time.sleep(self.chunk_delay)
+                    yield chunk
+            finally:
+                self.closed += 1
+
+        return stream()
+
+    async def async_run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        delay, call = self._start(kwargs)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self._finish()
+        message = self.response(messages, call)
+        if not kwargs.get("stream", self.stream):
+            return message
+
+        async def stream() -> AsyncGenerator[BaseMessage, None]:
+            try:
+                for chunk in self.chunks(message):
+                    await asyncio.sleep(self.chunk_delay)
+                    yield chunk
+            finally:
+                self.closed += 1
+
+        return stream()
@@ -44,3 +44,16 @@ class TestBaseMemory:
 
         assert message_param is not None
         assert message_param.annotation == BaseMessage
+
+    def test_to_openai_messages(self):
+        class Memory(BaseMemory):
+            async def async_append(self, message: BaseMessage) -> None:
+                self.append(message)
+
+        memory = Memory([user("hello")])
+        first = memory.to_openai_messages()
+        memory.append(user("again"))
+        second = memory.to_openai_messages()
+
+        assert second[0] is first[0]
+        assert [m["content"] for m in second] == ["hello", "again"]
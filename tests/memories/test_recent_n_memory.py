@@ -15,9 +15,30 @@
 # limitations under the License.
 #
 
+import copy
+
 from synthora.memories.base import BaseMemory
 from synthora.memories.recent_n_memory import RecentNMemory
-from synthora.messages import user
+from synthora.messages import system, user
+from synthora.messages.base import BaseMessage
+from synthora.types import ChatCompletionMessageToolCall
+from synthora.types.enums import MessageRole
+
+
+def tool_call(*ids):
+    calls = [
+        ChatCompletionMessageToolCall(
+            id=i, type="function", function={"name": "f", "arguments": "{}"}
+        )
+        for i in ids
+    ]
+    return BaseMessage.create_message(MessageRole.ASSISTANT, tool_calls=calls)
+
+
+def tool_response(id):
+    return BaseMessage.create_message(
+        MessageRole.TOOL_RESPONSE, id=id, content="ok", tool_response="ok"
+    )
 
 
 class TestRecentNMemory:
@@ -45,3 +66,82 @@ class TestRecentNMemory:
 
         assert memory[0].content == "Hello, world! 5"
         assert memory[-1].content == "Hello, world! 14"
+
+    def test_pins_system_messages(self):
+        memory = RecentNMemory(n=3)
+        memory.append(system("system"))
+        for i in range(5):
+            memory.append(user(f"{i}"))
+
+        assert [m.content for m in memory] == ["system", "3", "4"]
+
+        memory.append(system("late"))
+        assert [m.content for m in memory] == ["system", "late", "4"]
+
+    def test_keeps_tool_calls_with_responses(self):
+        memory = RecentNMemory(n=4)
+        memory.append(user("question"))
+        memory.append(tool_call("a", "b"))
+        memory.append(tool_response("a"))
+        memory.append(tool_response("b"))
+        memory.append(user("next"))
+
+        assert [m.role for m in memory] == [
+            MessageRole.ASSISTANT,
+            MessageRole.TOOL_RESPONSE,
+            MessageRole.TOOL_RESPONSE,
+            MessageRole.USER,
+        ]
+
+        memory.append(user("last"))
+        assert [m.content for m in memory] == ["next", "last"]
+
+    def test_keeps_latest_turn(self):
+        memory = RecentNMemory(n=2)
+        memory.append(user("question"))
+        memory.append(tool_call("a", "b", "c"))
+        for i in "abc":
+            memory.append(tool_response(i))
+
+        assert len(memory) == 4
+        assert memory[0].tool_calls
+
+    def test_list_operations(self):
+        memory = RecentNMemory(n=3)
+        memory += [user("a"), user("b")]
+        memory.insert(0, system("system"))
+        memory.extend([user("c"), user("d")])
+        assert [m.content for m in memory] == ["system", "c", "d"]
+
+        del memory[1]
+        memory.append(user("e"))
+        memory.append(user("f"))
+        assert [m.content for m in memory] == ["system", "e", "f"]
+
+        copied = copy.deepcopy(memory)
+        copied.append(user("g"))
+        assert [m.content for m in copied] == ["system", "f", "g"]
+
+        memory.clear()
+        memory.append(user("h"))
+        assert [m.content for m in memory] == ["h"]
+
+    def test_serialization(self):
+        memory = RecentNMemory(n=3)
+        memory.extend([system("system"), user("a"), user("b")])
+        restored = RecentNMemory.from_bytes(memory.to_bytes(), 3)
+        restored.append(user("c"))
+
+        assert [m.content for m in restored] == ["system", "b", "c"]
+
+    def test_sort_and_reverse_regroup(self):
+        memory = RecentNMemory(n=3)
+        memory.extend([user("b"), system("system"), user("a")])
+        memory.reverse()
+        assert [m.content for m in memory] == ["system", "a", "b"]
+
+        memory.sort(key=lambda m: m.content, reverse=True)
+        assert [m.content for m in memory] == ["system", "b", "a"]
+        memory.append(user("c"))
+        memory.append(user("d"))
+        assert [m.content for m in memory] == ["system", "c", "d"]
@@ -15,12 +15,24 @@
 # limitations under the License.
 #
 
+import asyncio
+import concurrent.futures
+import copy
+import threading
+from typing import Any, List, Optional
+
 import pytest
+from conftest import FakeBackend
 
+from synthora.callbacks.base_handler import BaseCallBackHandler
 from synthora.memories.base import BaseMemory
 from synthora.memories.summary_memory import SummaryMemory
-from synthora.messages import user
+from synthora.messages import system, user
+from synthora.messages.base import BaseMessage
+from synthora.models.base import BaseModelBackend
+from synthora.models.mock import MockBackend
 from synthora.models.openai_chat import OpenAIChatBackend
+from synthora.types.node import Node
 
 
 @pytest.mark.requires_env("OPENAI_API_KEY")
@@ -57,6 +69,7 @@ class TestSummaryMemory:
         memory.append(user("Hi, My name is John"))
         memory.append(user("I'm a software engineer"))
         memory.append(user("I'm from San Francisco"))
+        memory.wait()
         assert len(memory) == 2
         assert memory[-1].content == "I'm from San Francisco"
 
@@ -65,5 +78,148 @@ class TestSummaryMemory:
         memory.append(user("Hi, My name is John"))
         memory.append(user("I'm a software engineer"))
         memory.append(user("I'm from San Francisco"))
+        await memory.async_wait()
         assert len(memory) == 2
         assert memory[-1].content == "I'm from San Francisco"
+
+
+class GatedBackend(FakeBackend):
+    def __init__(self) -> None:
+        super().__init__(responses=["They met."])
+        self.gate = threading.Event()
+
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        assert self.gate.wait(5)
+        return super().response(messages, call)
+
+    async def async_run(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        await asyncio.to_thread(self.gate.wait, 5)
+        return await super().async_run(messages, *args, **kwargs)
+
+
+class ErrorRecorder(BaseCallBackHandler):
+    def __init__(self) -> None:
+        self.errors: List[Exception] = []
+
+    def on_llm_error(self, source: Node, e: Exception, *args, **kwargs):
+        self.errors.append(e)
+
+
+def failing_model(recorder: ErrorRecorder) -> MockBackend:
+    return MockBackend(error_rate=1.0, handlers=[recorder])
+
+
+class TestBackgroundSummary:
+    def memory(self, model: Optional[BaseModelBackend] = None, **kwargs):
+        model = model or MockBackend(responses=["They met."], ttft=0.2)
+        return SummaryMemory(n=3, cache_size=2, summary_model=model, **kwargs)
+
+    def test_append_does_not_block(self):
+        model = GatedBackend()
+        memory = self.memory(model)
+        memory.append(system("system"))
+        for i in range(4):
+            memory.append(user(f"{i}"))
+
+        assert [m.content for m in memory] == ["system", "0", "1", "2", "3"]
+        model.gate.set()
+        memory.wait()
+        assert len(memory) == 4
+        assert memory[0].content == "system"
+        assert "They met." in memory[1].content
+        assert [m.content for m in memory[2:]] == ["2", "3"]
+
+    def test_swapped_in_by_next_append(self):
+        model = GatedBackend()
+        model.gate.set()
+        memory = self.memory(model)
+        for i in range(4):
+            memory.append(user(f"{i}"))
+        concurrent.futures.wait([memory._pending[0]])
+        memory.append(user("4"))
+
+        assert "They met." in memory[0].content
+        assert [m.content for m in memory[1:]] == ["2", "3", "4"]
+
+    def test_failed_summary_dropped(self):
+        recorder = ErrorRecorder()
+        memory = self.memory(failing_model(recorder))
+        for i in range(4):
+            memory.append(user(f"{i}"))
+        memory.wait()
+        memory.append(user("4"))
+        memory.wait()
+
+        assert [m.content for m in memory] == ["0", "1", "2", "3", "4"]
+        assert len(recorder.errors) == 2
+
+    def test_hard_limit_blocks(self):
+        model = GatedBackend()
+        memory = self.memory(model, hard_limit=4)
+        for i in range(4):
+            memory.append(user(f"{i}"))
+
+        threading.Timer(0.05, model.gate.set).start()
+        memory.append(user("4"))
+        assert "They met." in memory[0].content
+        assert len(memory) == 4
+
+    def test_cleared_memory_drops_summary(self):
+        memory = self.memory()
+        for i in range(4):
+            memory.append(user(f"{i}"))
+        memory.clear()
+        memory.append(user("new"))
+        memory.wait()
+
+        assert [m.content for m in memory] == ["new"]
+
+    def test_deepcopy(self):
+        memory = self.memory()
+        for i in range(4):
+            memory.append(user(f"{i}"))
+        copied = copy.deepcopy(memory)
+        memory.wait()
+
+        assert [m.content for m in copied] == ["0", "1", "2", "3"]
+        assert len(memory) == 3
+
+    def test_blocking(self):
+        memory = self.memory(background=False)
+        for i in range(4):
+            memory.append(user(f"{i}"))
+
+        assert "They met." in memory[0].content
+        assert len(memory) == 3
+
+    async def test_async_append_does_not_block(self):
+        model = GatedBackend()
+        memory = self.memory(model)
+        for i in range(4):
+            await memory.async_append(user(f"{i}"))
+
+        assert len(memory) == 4
+        model.gate.set()
+        await memory.async_wait()
+        assert "They met." in memory[0].content
+        assert [m.content for m in memory[1:]] == ["2", "3"]
+
+    async def test_async_failed_summary_dropped(self):
+        recorder = ErrorRecorder()
+        memory = self.memory(failing_model(recorder))
+        for i in range(4):
+            await memory.async_append(user(f"{i}"))
+        await memory.async_wait()
+        await memory.async_append(user("4"))
+        await memory.async_wait()
+
+        assert len(memory) == 5
+        assert len(recorder.errors) == 2
+
+    async def test_async_hard_limit_blocks(self):
+        memory = self.memory(hard_limit=4)
+        for i in range(5):
+            await memory.async_append(user(f"{i}"))
+
+        assert "They met." in memory[0].content
+        assert len(memory) == 4
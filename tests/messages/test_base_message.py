@@ -14,3 +14,148 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+
+import copy
+
+import pytest
+
+from synthora.messages import assistant, system, user
+from synthora.messages.base import BaseMessage, get_cached_tokens
+from synthora.prompts.base import BasePrompt
+from synthora.types.enums import MessageRole, NodeType
+from synthora.types.node import Node
+from synthora.utils.macros import UPDATE_SYSTEM
+
+
+class TestOpenAIMessageCache:
+    def test_payload_is_cached(self):
+        message = user("hello")
+
+        payload = message.to_openai_message()
+        assert payload == {"content": "hello", "role": "user", "name": "user"}
+        assert message.to_openai_message() is payload
+
+    def test_assignment_invalidates(self):
+        message = assistant("hello")
+        payload = message.to_openai_message()
+
+        message.metadata = {"finish_reason": "stop"}
+        assert message.to_openai_message() is payload
+
+        message.content = "bye"
+        assert message.to_openai_message()["content"] == "bye"
+
+    def test_in_place_change_needs_clear(self):
+        message = assistant("hello")
+        message.tool_calls = []
+        message.to_openai_message()
+
+        message.tool_calls.append({"id": "call_1"})
+        assert "tool_calls" not in message.to_openai_message()
+        message.clear_openai_message()
+        assert message.to_openai_message()["tool_calls"] == [{"id": "call_1"}]
+
+    def test_copy_keeps_own_cache(self):
+        message = user("hello")
+        message.to_openai_message()
+        other = copy.deepcopy(message)
+
+        other.content = "bye"
+        assert message.to_openai_message()["content"] == "hello"
+        assert other.to_openai_message()["content"] == "bye"
+
+    def test_update_system_invalidates(self):
+        history = [system("old")]
+        history[0].to_openai_message()
+
+        UPDATE_SYSTEM(history, "new", history[0].source, name="agent")
+        assert history[0].to_openai_message()["content"] == "new"
+
+
+class TestCachedTokens:
+    def test_get_cached_tokens(self):
+        assert get_cached_tokens(None) == 0
+        assert get_cached_tokens({"prompt_tokens": 10}) == 0
+        assert (
+            get_cached_tokens(
+                {"prompt_tokens_details": {"cached_tokens": 1024}}
+            )
+            == 1024
+        )
+
+
+class TestTrustedMessage:
+    def test_same_message_as_validated(self):
+        source = Node(name="tool", type=NodeType.TOOL)
+        fields = {
+            "role": MessageRole.TOOL_RESPONSE,
+            "id": "call-1",
+            "content": "42",
+            "tool_response": 42,
+            "source": source,
+            "metadata": {"turn": 1},
+        }
+
+        validated = BaseMessage.create_message(**fields)
+        trusted = BaseMessage.create_message(**fields, validate=False)
+
+        assert trusted.model_dump() == validated.model_dump()
+        assert trusted.to_openai_message() == validated.to_openai_message()
+
+    def test_no_validation(self):
+        with pytest.raises(ValueError):
+            BaseMessage(
+                role=MessageRole.USER,
+                source=Node(name="u", type=NodeType.USER),
+            )
+
+        message = BaseMessage.trusted(
+            role=MessageRole.USER, source=Node(name="u", type=NodeType.USER)
+        )
+        assert message.content is None
+        assert message.metadata == {}
+
+    def test_content_and_metadata(self):
+        metadata = {"a": 1}
+        prompt = BasePrompt("You are {name}")
+        first = BaseMessage.create_message(
+            MessageRole.SYSTEM,
+            content=prompt,
+            metadata=metadata,
+            validate=False,
+        )
+        second = BaseMessage.create_message(
+            MessageRole.USER, content=b"hi", validate=False
+        )
+
+        assert type(first.content) is str
+        assert first.content == "You are {name}"
+        assert second.content == "hi"
+        first.metadata["b"] = 2
+        assert metadata == {"a": 1}
+        assert (
+            second.metadata
+            is not BaseMessage.trusted(
+                role=MessageRole.USER, source=second.source, content="x"
+            ).metadata
+        )
+
+    def test_skips_validation(self, monkeypatch):
+        def validate(*args, **kwargs):
+            raise AssertionError("validated")
+
+        fields = {
+            "role": MessageRole.TOOL_RESPONSE,
+            "id": "call-1",
+            "content": "result",
+            "tool_response": "result",
+            "source": Node(name="tool", type=NodeType.TOOL),
+        }
+        monkeypatch.setattr(BaseMessage, "__init__", validate)
+
+        message = BaseMessage.create_message(**fields, validate=False)
+        assert message.tool_response == "result"
+        assert {"role", "id", "content"} <= message.model_fields_set
+        assert copy.deepcopy(message).model_dump() == message.model_dump()
+        with pytest.raises(AssertionError):
+            BaseMessage.create_message(**fields)
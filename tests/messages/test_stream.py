@@ -0,0 +1,176 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from typing import Any, AsyncGenerator, List
+
+from synthora.messages.stream import (
+    ChoicesAccumulator,
+    StreamAccumulator,
+    create_accumulator,
+)
+from synthora.types import ChatCompletionChunk
+
+
+def make_chunk(
+    delta: dict, finish_reason: Any = None, usage: Any = None
+) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": (
+                [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                if delta is not None
+                else []
+            ),
+            "usage": usage,
+        }
+    )
+
+
+def tool_delta(index: int, id: Any = None, name: Any = None, args: Any = None):
+    function = {}
+    if name:
+        function["name"] = name
+    if args:
+        function["arguments"] = args
+    return {
+        "tool_calls": [
+            {
+                "index": index,
+                "id": id,
+                "type": "function",
+                "function": function,
+            }
+        ]
+    }
+
+
+CONTENT_CHUNKS = [
+    make_chunk({"role": "assistant", "content": ""}),
+    make_chunk({"content": "Hello"}),
+    make_chunk({"content": ", world"}),
+    make_chunk({}, finish_reason="stop"),
+    make_chunk(
+        None,
+        usage={"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+    ),
+]
+
+
+class TestStreamAccumulator:
+    def test_content(self):
+        messages = list(StreamAccumulator().stream(CONTENT_CHUNKS))
+
+        assert [m.chunk for m in messages[:-1]] == ["Hello", ", world"]
+        assert not any(m.is_complete for m in messages[:-1])
+        final = messages[-1]
+        assert final.content == "Hello, world"
+        assert final.chunk is None
+        assert final.is_complete
+        assert final.metadata["usage"].total_tokens == 5
+        assert final.id == "chatcmpl-1"
+
+    def test_tool_calls(self):
+        chunks = [
+            make_chunk(tool_delta(0, id="call_1", name="add")),
+            make_chunk(tool_delta(0, args='{"a": ')),
+            make_chunk(tool_delta(1, id="call_2", name="sub")),
+            make_chunk(tool_delta(0, args="1}")),
+            make_chunk(tool_delta(1, args="{}")),
+            make_chunk({}, finish_reason="tool_calls"),
+        ]
+        accumulator = StreamAccumulator()
+        messages = list(accumulator.stream(chunks))
+
+        assert messages[1].tool_calls[0].function.arguments == '{"a": 1}'
+        final = messages[-1]
+        assert final.content is None
+        assert [(c.id, c.function.name) for c in final.tool_calls] == [
+            ("call_1", "add"),
+            ("call_2", "sub"),
+        ]
+        assert final.tool_calls[0].function.arguments == '{"a": 1}'
+        assert final.tool_calls[1].function.arguments == "{}"
+        assert final.to_openai_message()["tool_calls"] == final.tool_calls
+
+    def test_content_is_joined_once(self):
+        accumulator = StreamAccumulator()
+        for chunk in CONTENT_CHUNKS:
+            accumulator.add(chunk)
+
+        assert accumulator.content == "Hello, world"
+        assert accumulator.parts == ["Hello, world"]
+
+    def test_async_stream(self):
+        async def chunks() -> AsyncGenerator[ChatCompletionChunk, None]:
+            for chunk in CONTENT_CHUNKS:
+                yield chunk
+
+        async def main() -> List[Any]:
+            return [
+                m async for m in StreamAccumulator().async_stream(chunks())
+            ]
+
+        messages = asyncio.run(main())
+        assert messages[-1].content == "Hello, world"
+
+
+class TestChoicesAccumulator:
+    def test_choices(self):
+        chunks = []
+        for piece in ["Hel", "lo"]:
+            for index, text in enumerate([piece, piece.upper()]):
+                chunk = make_chunk({"content": text})
+                chunk.choices[0].index = index
+                chunks.append(chunk)
+        chunks.append(
+            make_chunk(
+                None,
+                usage={
+                    "prompt_tokens": 3,
+                    "completion_tokens": 4,
+                    "total_tokens": 7,
+                },
+            )
+        )
+
+        messages = list(ChoicesAccumulator(n=2).stream(chunks))
+
+        assert [m.chunk for m in messages[:4]] == ["Hel", "HEL", "lo", "LO"]
+        first, second = messages[4:]
+        assert (first.content, second.content) == ("Hello", "HELLO")
+        assert (first.metadata["index"], second.metadata["index"]) == (0, 1)
+        assert "usage" not in first.metadata
+        assert second.metadata["usage"].total_tokens == 7
+
+    def test_create_accumulator(self):
+        assert isinstance(create_accumulator(), StreamAccumulator)
+        assert isinstance(create_accumulator(n=1), StreamAccumulator)
+        assert isinstance(create_accumulator(n=3), ChoicesAccumulator)
+
+    def test_completion_chunks(self):
+        chunk = make_chunk({"content": "x"})
+        chunk.choices[0].delta = None
+        chunk.choices[0].text = "legacy"  # type: ignore[attr-defined]
+
+        messages = list(StreamAccumulator().stream([chunk]))
+
+        assert messages[-1].content == "legacy"
@@ -0,0 +1,276 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import tempfile
+from typing import Any, Dict, List
+
+import pytest
+from openai.types import Completion
+from pydantic import BaseModel
+
+from synthora.callbacks.usage_handler import UsageLedger
+from synthora.messages import system, user
+from synthora.messages.base import BaseMessage
+from synthora.models import BatchJob, LocalBatchSubmitter
+from synthora.models.openai_chat import OpenAIChatBackend
+from synthora.models.openai_completion import OpenAICompletionBackend
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def _completion(prompts: List[str], n: int) -> Completion:
+    return Completion.model_validate(
+        {
+            "id": "cmpl-test",
+            "object": "text_completion",
+            "created": 0,
+            "model": "gpt-3.5-turbo-instruct",
+            "choices": [
+                {
+                    "index": i * n + j,
+                    "text": f"{prompt}:{j}",
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }
+                # Choices may arrive in any order.
+                for i, prompt in reversed(list(enumerate(prompts)))
+                for j in range(n)
+            ],
+            "usage": {
+                "prompt_tokens": len(prompts),
+                "completion_tokens": len(prompts) * n,
+                "total_tokens": len(prompts) * (n + 1),
+            },
+        }
+    )
+
+
+class FakeCompletions:
+    def __init__(self) -> None:
+        self.requests: List[Dict[str, Any]] = []
+
+    def create(self, **kwargs: Any) -> Completion:
+        self.requests.append(kwargs)
+        return _completion(kwargs["prompt"], kwargs.get("n") or 1)
+
+
+class AsyncFakeCompletions(FakeCompletions):
+    async def create(self, **kwargs: Any) -> Completion:  # type: ignore[override]
+        return FakeCompletions.create(self, **kwargs)
+
+
+class FakeClient:
+    def __init__(self, completions: FakeCompletions) -> None:
+        self.completions = completions
+
+
+def _completion_model(
+    completions: FakeCompletions,
+) -> OpenAICompletionBackend:
+    model = OpenAICompletionBackend(
+        model_type="gpt-3.5-turbo-instruct",
+        api_key="test",
+        config={"stream": True},
+    )
+    model._get_client = lambda *args: FakeClient(completions)  # type: ignore[method-assign]
+    return model
+
+
+class TestRunBatch:
+    def test_splits_prompts(self):
+        completions = FakeCompletions()
+        model = _completion_model(completions)
+        prompts = [f"p{i}" for i in range(5)]
+
+        results = model.run_batch(prompts, max_prompts=2)
+
+        assert [r.content for r in results] == [f"p{i}:0" for i in range(5)]
+        assert [len(r["prompt"]) for r in completions.requests] == [2, 2, 1]
+        assert all(not r["stream"] for r in completions.requests)
+        usages = [r.metadata["usage"] for r in results]
+        assert [u is not None for u in usages] == [
+            False,
+            True,
+            False,
+            True,
+            True,
+        ]
+
+    def test_token_budget(self):
+        completions = FakeCompletions()
+        model = _completion_model(completions)
+
+        model.run_batch(
+            ["a" * 40, "b" * 40, user("c" * 40)], max_batch_tokens=25
+        )
+
+        assert [len(r["prompt"]) for r in completions.requests] == [2, 1]
+        assert completions.requests[1]["prompt"] == ["c" * 40]
+
+    def test_samples_and_usage(self):
+        completions = FakeCompletions()
+        model = _completion_model(completions)
+        ledger = UsageLedger()
+        model.add_handler(ledger)
+
+        results = model.run_batch(["x", "y"], n=2)
+
+        assert [[m.content for m in r] for r in results] == [
+            ["x:0", "x:1"],
+            ["y:0", "y:1"],
+        ]
+        assert ledger.total.requests == 1
+        assert ledger.total.prompt_tokens == 2
+
+    def test_async(self):
+        completions = AsyncFakeCompletions()
+        model = _completion_model(completions)
+
+        results = asyncio.run(
+            model.async_run_batch(["a", "b", "c"], max_prompts=1)
+        )
+
+        assert [r.content for r in results] == ["a:0", "b:0", "c:0"]
+        assert len(completions.requests) == 3
+
+    def test_invalid_batch_size(self):
+        model = _completion_model(FakeCompletions())
+        with pytest.raises(ValueError):
+            model.run_batch(["a"], max_prompts=0)
+
+
+@pytest.fixture
+def chat_model() -> OpenAIChatBackend:
+    return OpenAIChatBackend.default(
+        model_type="gpt-4o-mini",
+        api_key="test",
+        config={"stream": True, "temperature": 0},
+    )
+
+
+class TestBatchJob:
+    def test_file_and_results(self, chat_model, tmp_path):
+        path = tmp_path / "batch.jsonl"
+        job = BatchJob(chat_model, submitter=LocalBatchSubmitter(), path=path)
+        first = job.add([system("be brief"), user("one")])
+        second = job.add(user("two"), custom_id="second", max_tokens=5)
+
+        results = job.run()
+
+        assert [r.content for r in results] == ["one", "two"]
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["custom_id"] for line in lines] == [first, second]
+        assert lines[0]["url"] == "/v1/chat/completions"
+        body = lines[1]["body"]
+        assert body["model"] == "gpt-4o-mini"
+        assert body["max_tokens"] == 5
+        assert body["temperature"] == 0
+        assert "stream" not in body
+        assert body["messages"][0]["content"] == "two"
+
+    def test_polling_and_timeout(self, chat_model, tmp_path):
+        submitter = LocalBatchSubmitter(pending_polls=2)
+        job = BatchJob(
+            chat_model,
+            submitter=submitter,
+            path=tmp_path / "batch.jsonl",
+            poll_interval=0,
+        )
+        job.add(user("hi"))
+        assert job.run()[0].content == "hi"
+        assert submitter.polls[job.job_id] == 3
+
+        job = BatchJob(
+            chat_model,
+            submitter=LocalBatchSubmitter(pending_polls=100),
+            path=tmp_path / "slow.jsonl",
+            poll_interval=0,
+            timeout=0,
+        )
+        job.add(user("hi"))
+        with pytest.raises(TimeoutError):
+            job.wait()
+        with pytest.raises(ValueError):
+            job.add(user("late"))
+
+    def test_errors_and_usage(self, chat_model, tmp_path):
+        def respond(body: Dict[str, Any]) -> Dict[str, Any]:
+            if body["messages"][-1]["content"] == "fail":
+                raise ValueError("rejected")
+            return LocalBatchSubmitter().respond(body)
+
+        ledger = UsageLedger()
+        chat_model.add_handler(ledger)
+        job = BatchJob(
+            chat_model,
+            submitter=LocalBatchSubmitter(respond),
+            path=tmp_path / "batch.jsonl",
+        )
+        job.add(user("ok"))
+        job.add(user("fail"))
+
+        ok, failed = job.run()
+
+        assert isinstance(ok, BaseMessage)
+        assert isinstance(failed, Exception)
+        assert "rejected" in str(failed)
+        assert ok.metadata["batch"] is True
+        assert ledger.total.requests == 1
+        full = UsageLedger(batch_discount=0)
+        full.on_llm_end(chat_model.source, ok)
+        assert ledger.total.cost == pytest.approx(full.total.cost / 2)
+
+    def test_temporary_file_removed(self, chat_model, tmp_path, monkeypatch):
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        job = BatchJob(chat_model, submitter=LocalBatchSubmitter())
+        job.add(user("hi"))
+
+        assert job.run()[0].content == "hi"
+        assert not list(tmp_path.iterdir())
+
+    def test_structured_output(self, tmp_path):
+        model = OpenAIChatBackend.default(
+            model_type="gpt-4o-mini",
+            api_key="test",
+            config={"response_format": Answer},
+        )
+        job = BatchJob(
+            model,
+            submitter=LocalBatchSubmitter(),
+            path=tmp_path / "batch.jsonl",
+        )
+        job.add(user('{"value": 3}'))
+
+        (result,) = job.run()
+
+        body = job.requests["request-0"]
+        assert body["response_format"]["json_schema"]["name"] == "Answer"
+        assert result.parsed == Answer(value=3)
+
+    def test_duplicate_id(self, chat_model, tmp_path):
+        job = BatchJob(
+            chat_model,
+            submitter=LocalBatchSubmitter(),
+            path=tmp_path / "batch.jsonl",
+        )
+        job.add(user("a"), custom_id="x")
+        with pytest.raises(ValueError):
+            job.add(user("b"), custom_id="x")
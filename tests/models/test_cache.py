@@ -0,0 +1,189 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import time
+from typing import List
+
+from conftest import FakeBackend
+from pydantic import BaseModel
+
+from synthora.callbacks.base_handler import BaseCallBackHandler
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import assistant, user
+from synthora.messages.base import BaseMessage
+from synthora.models import create_model_from_config
+from synthora.models.cache import (
+    CachedBackend,
+    DiskResponseCache,
+    InMemoryResponseCache,
+    ResponseCache,
+)
+from synthora.types import ChatCompletionMessageToolCall
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+class Answer(BaseModel):
+    value: int
+
+
+class AnswerBackend(FakeBackend):
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        message = assistant(f"answer {call}")
+        message.metadata = {"finish_reason": "stop"}
+        message.parsed = Answer(value=call)
+        return message
+
+    def chunks(self, message: BaseMessage) -> List[BaseMessage]:
+        chunk = message.model_copy(deep=True)
+        chunk.metadata = {"finish_reason": None}
+        return [chunk, message]
+
+
+class Recorder(BaseCallBackHandler):
+    def __init__(self) -> None:
+        self.hits: List[str] = []
+
+    def on_llm_cache_hit(
+        self, source: Node, message: BaseMessage, key: str, *args, **kwargs
+    ) -> None:
+        self.hits.append(key)
+
+
+class TestResponseCache:
+    def test_key(self):
+        messages = [user("hello")]
+        key = ResponseCache.make_key("gpt", messages, {"temperature": 0})
+
+        assert key == ResponseCache.make_key(
+            "gpt", [user("hello")], {"temperature": 0, "stream": True}
+        )
+        assert key != ResponseCache.make_key("gpt", messages, {})
+        assert key != ResponseCache.make_key(
+            "gpt", [user("hi")], {"temperature": 0}
+        )
+        assert key != ResponseCache.make_key(
+            "gpt", messages, {"temperature": 0, "response_format": Answer}
+        )
+
+    def test_memory_lru_and_ttl(self):
+        cache = InMemoryResponseCache(max_size=2, ttl=60)
+        for key in "abc":
+            cache.put(key, assistant(key))
+
+        assert "a" not in cache
+        assert cache.get("b").content == "b"
+
+        cache.ttl = 0
+        time.sleep(0.01)
+        assert cache.get("b") is None
+
+    def test_disk(self, tmp_path):
+        cache = DiskResponseCache(tmp_path, max_size=2)
+        message = assistant("a")
+        message.tool_calls = [
+            ChatCompletionMessageToolCall(
+                id="call_1",
+                type="function",
+                function={"name": "add", "arguments": "{}"},
+            )
+        ]
+        cache.put("a", message)
+        time.sleep(0.01)
+        cache.put("b", assistant("b"))
+        time.sleep(0.01)
+        cache.get("a")
+        cache.put("c", assistant("c"))
+
+        assert len(cache) == 2
+        assert "b" not in cache
+        loaded = DiskResponseCache(tmp_path).get("a")
+        assert loaded.tool_calls[0].function.name == "add"
+
+
+class TestCachedBackend:
+    def test_hit(self):
+        backend = AnswerBackend()
+        recorder = Recorder()
+        model = CachedBackend(backend, InMemoryResponseCache(), [recorder])
+
+        first = model.run([user("hello")])
+        second = model.run([user("hello")], response_format=Answer)
+        third = model.run([user("hello")], response_format=Answer)
+
+        assert backend.calls == 2
+        assert first.content == "answer 1"
+        assert third.content == second.content == "answer 2"
+        assert third.parsed == Answer(value=2)
+        assert len(recorder.hits) == 1
+
+    def test_disk_restores_parsed(self, tmp_path):
+        backend = AnswerBackend()
+        model = CachedBackend(backend, DiskResponseCache(tmp_path))
+
+        model.run([user("hello")], response_format=Answer)
+        message = model.run([user("hello")], response_format=Answer)
+
+        assert backend.calls == 1
+        assert message.parsed == Answer(value=1)
+
+    def test_stream_hit(self):
+        backend = AnswerBackend(config={"stream": True})
+        model = CachedBackend(backend, InMemoryResponseCache())
+
+        first = list(model.run([user("hello")]))
+        second = list(model.run([user("hello")]))
+
+        assert backend.calls == 1
+        assert first[-1].content == second[-1].content == "answer 1"
+        assert second[0].chunk == "answer 1"
+        assert not second[0].is_complete
+        assert second[-1].is_complete
+
+        model.set_stream(False)
+        assert model.run([user("hello")]).content == "answer 1"
+
+    def test_async(self):
+        backend = AnswerBackend()
+        model = CachedBackend(backend, InMemoryResponseCache())
+
+        async def run() -> List[BaseMessage]:
+            return [await model.async_run([user("hello")]) for _ in range(2)]
+
+        results = asyncio.run(run())
+
+        assert backend.calls == 1
+        assert results[0].content == results[1].content
+
+    def test_deepcopy_shares_cache(self):
+        model = CachedBackend(AnswerBackend(), InMemoryResponseCache())
+        clone = copy.deepcopy(model)
+
+        assert clone.cache is model.cache
+        assert clone.config is clone.backend.config
+
+    def test_from_config(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "key")
+        config = ModelConfig(model_type="gpt-4o", cache={"max_size": 8})
+        source = Node(name="agent", type=NodeType.AGENT)
+
+        model = create_model_from_config(config, source)
+
+        assert isinstance(model, CachedBackend)
+        assert model.cache.max_size == 8
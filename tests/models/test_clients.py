@@ -0,0 +1,67 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+
+from openai import AsyncOpenAI, OpenAI
+
+from synthora.models.clients import ClientRegistry
+from synthora.models.openai_chat import OpenAIChatBackend
+
+
+class TestClientRegistry:
+    def test_shared_by_key(self):
+        registry = ClientRegistry()
+        client = registry.get(OpenAI, {"api_key": "a"})
+
+        assert registry.get(OpenAI, {"api_key": "a"}) is client
+        assert registry.get(OpenAI, {"api_key": "b"}) is not client
+        assert len(registry) == 2
+
+    def test_async_clients_per_loop(self):
+        registry = ClientRegistry()
+
+        async def get() -> AsyncOpenAI:
+            client = registry.get(AsyncOpenAI, {"api_key": "a"})
+            assert registry.get(AsyncOpenAI, {"api_key": "a"}) is client
+            return client
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+
+        assert first is not second
+
+    def test_pool_options(self):
+        registry = ClientRegistry()
+        default = registry.get(OpenAI, {"api_key": "a"})
+        pooled = registry.get(OpenAI, {"api_key": "a", "max_connections": 4})
+
+        registry.set_pool_options(keepalive_expiry=30)
+
+        assert pooled is not default
+        assert registry.get(OpenAI, {"api_key": "a"}) is not default
+
+    def test_backends_share_client(self):
+        model = OpenAIChatBackend.default(api_key="key")
+        other = OpenAIChatBackend.default(api_key="key")
+        clone = copy.deepcopy(model)
+
+        client = model._get_client(OpenAI, model.kwargs)
+
+        assert other._get_client(OpenAI, other.kwargs) is client
+        assert clone._get_client(OpenAI, clone.kwargs) is client
@@ -0,0 +1,159 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import time
+import uuid
+
+from conftest import FakeBackend
+
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import user
+from synthora.models import create_model_from_config
+from synthora.models.hedging import HedgedBackend
+from synthora.models.rate_limit import RateLimitedBackend
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+def warm_up(model: HedgedBackend, latency: float = 0.01) -> None:
+    for _ in range(model.min_samples):
+        model.stats.record(latency)
+
+
+class TestHedgedBackend:
+    def test_no_hedge_before_samples(self):
+        primary = FakeBackend("primary", delays=[0.05])
+        alternate = FakeBackend("alternate")
+        model = HedgedBackend(primary, alternate, min_samples=5)
+
+        assert model.run([user("hi")]).content == "primary"
+        assert alternate.calls == 0
+        assert len(model.stats.latencies) == 1
+
+    def test_hedge_slow_request(self):
+        primary = FakeBackend("primary", delays=[0.3])
+        alternate = FakeBackend("alternate")
+        model = HedgedBackend(primary, alternate, max_rate=1.0)
+        warm_up(model)
+
+        start = time.monotonic()
+        assert model.run([user("hi")]).content == "alternate"
+        assert time.monotonic() - start < 0.2
+        assert model.stats.hedged[-1] is True
+        # The primary's latency is at least the hedging threshold.
+        assert model.stats.latencies[-1] >= 0.01
+
+    def test_fast_request_not_hedged(self):
+        alternate = FakeBackend("alternate")
+        model = HedgedBackend(FakeBackend("primary"), alternate, max_rate=1.0)
+        warm_up(model, latency=0.1)
+
+        assert model.run([user("hi")]).content == "primary"
+        assert alternate.calls == 0
+
+    def test_hedge_rate_cap(self):
+        stats = HedgedBackend(FakeBackend("primary")).stats
+        for _ in range(8):
+            stats.record(0.01)
+
+        assert stats.allow_hedge(0.2)
+        assert stats.allow_hedge(0.2)
+        assert not stats.allow_hedge(0.2)
+        stats.record(0.01)
+        assert not stats.allow_hedge(0.2)
+
+    def test_stream_loser_closed(self):
+        primary = FakeBackend("primary", delays=[0.1])
+        model = HedgedBackend(primary, max_rate=1.0)
+        warm_up(model)
+        model.set_stream(True)
+
+        response = model.run([user("hi")])
+        assert [m.content for m in response] == ["primary"]
+        assert primary.calls == 2
+        time.sleep(0.15)
+        assert primary.closed == 2
+
+    def test_async_loser_cancelled(self):
+        primary = FakeBackend("primary", delays=[0.3])
+        alternate = FakeBackend("alternate")
+        model = HedgedBackend(primary, alternate, max_rate=1.0)
+        warm_up(model)
+
+        async def main() -> str:
+            message = await model.async_run([user("hi")])
+            await asyncio.sleep(0)
+            return message.content
+
+        assert asyncio.run(main()) == "alternate"
+        assert primary.cancelled == 1
+        assert model.stats.latencies[-1] >= 0.01
+
+    def test_alternate_streams_without_changes(self):
+        alternate = FakeBackend("alternate")
+        model = HedgedBackend(
+            FakeBackend("primary", delays=[0.3]), alternate, max_rate=1.0
+        )
+        warm_up(model)
+        model.set_stream(True)
+
+        assert [m.content for m in model.run([user("hi")])] == ["alternate"]
+        assert not alternate.stream
+
+    async def test_rate_limited_losers_released(self):
+        backend = FakeBackend("primary", delays=[0.3, 0, 0.3, 0])
+        backend.kwargs = {"api_key": uuid.uuid4().hex}
+        limited = RateLimitedBackend(backend, max_concurrency=2)
+        model = HedgedBackend(limited, max_rate=1.0)
+        warm_up(model)
+
+        message = await model.async_run([user("hi")])
+        assert message.content == "primary"
+        assert limited.limiter.in_flight == 0
+
+        model.set_stream(True)
+        response = await model.async_run([user("hi")])
+        assert [m.content async for m in response] == ["primary"]
+        assert limited.limiter.in_flight == 0
+        assert backend.cancelled == 2
+
+    def test_copies_share_stats(self):
+        model = HedgedBackend(FakeBackend("primary"))
+
+        assert copy.deepcopy(model).stats is model.stats
+
+    def test_from_config(self):
+        model = create_model_from_config(
+            ModelConfig(
+                model_type="gpt-4o",
+                backend_config={"api_key": "key"},
+                hedge={
+                    "percentile": 0.9,
+                    "alternate": {
+                        "model_type": "gpt-4o",
+                        "backend_config": {"api_key": "other"},
+                    },
+                },
+            ),
+            Node(name="test", type=NodeType.AGENT),
+        )
+
+        assert isinstance(model, HedgedBackend)
+        assert model.percentile == 0.9
+        assert model.alternate.kwargs["api_key"] == "other"
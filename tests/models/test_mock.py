@@ -0,0 +1,252 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import random
+import time
+from typing import Any, List
+
+import pytest
+from openai import InternalServerError, RateLimitError
+from pydantic import BaseModel
+
+from synthora.agents import VanillaAgent
+from synthora.configs.agent_config import AgentConfig
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import user
+from synthora.models import create_model_from_config
+from synthora.models.mock import MockBackend, sample_latency
+from synthora.models.rate_limit import _get_retry_after, _is_rate_limited
+from synthora.prompts.base import BasePrompt
+from synthora.toolkits.decorators import tool
+from synthora.types.enums import AgentType, NodeType
+from synthora.types.node import Node
+
+
+class Answer(BaseModel):
+    value: int
+
+
+class TestSampleLatency:
+    def test_distributions(self):
+        rng = random.Random(0)
+
+        assert sample_latency(None, rng) == 0
+        assert sample_latency(0.5, rng) == 0.5
+        assert sample_latency({"distribution": "normal", "mean": -1}, rng) == 0
+        value = sample_latency(
+            {"distribution": "uniform", "low": 1, "high": 2}, rng
+        )
+        assert 1 <= value <= 2
+        assert (
+            sample_latency(
+                {"distribution": "lognormal", "median": 1, "sigma": 0.5}, rng
+            )
+            > 0
+        )
+        with pytest.raises(ValueError):
+            sample_latency({"distribution": "pareto"}, rng)
+
+
+class TestMockBackend:
+    def test_template_and_script(self):
+        model = MockBackend()
+        assert model.run([user("hi")]).content == "Mock response to: hi"
+
+        model = MockBackend(responses=["a", "b"])
+        contents = [model.run(user("hi")).content for _ in range(3)]
+        assert contents == ["a", "b", "a"]
+
+    def test_tool_calls_and_parsed(self):
+        model = MockBackend(
+            responses=[
+                {"tool_calls": [{"name": "add", "arguments": {"a": 1}}]},
+                {"parsed": {"value": 3}},
+            ]
+        )
+
+        message = model.run([user("hi")])
+        assert message.metadata["finish_reason"] == "tool_calls"
+        assert message.tool_calls[0].function.name == "add"
+        assert message.tool_calls[0].function.arguments == '{"a": 1}'
+
+        message = model.run([user("hi")], response_format=Answer)
+        assert message.parsed == Answer(value=3)
+        assert message.content == '{"value":3}'
+        assert message.metadata["usage"].total_tokens > 0
+
+    def test_stream(self):
+        model = MockBackend(
+            responses=[
+                {
+                    "content": "Hello there, world",
+                    "tool_calls": [{"name": "add", "arguments": {"a": 1}}],
+                }
+            ],
+            config={"stream": True, "stream_options": {"include_usage": True}},
+        )
+
+        messages = list(model.run([user("hi")]))
+        assert "".join(m.chunk for m in messages[:-1]).startswith(
+            "Hello there, world"
+        )
+        final = messages[-1]
+        assert final.is_complete
+        assert final.content == "Hello there, world"
+        assert final.tool_calls[0].function.arguments == '{"a": 1}'
+        assert final.metadata["usage"].completion_tokens > 0
+
+    def test_stream_usage(self):
+        responses: List[Any] = [
+            {
+                "content": "Hi",
+                "tool_calls": [{"name": "add", "arguments": {"a": 1}}],
+            }
+        ]
+        usage = (
+            MockBackend(responses=responses)
+            .run([user("hi")])
+            .metadata["usage"]
+        )
+
+        model = MockBackend(responses=responses, config={"stream": True})
+        final = list(model.run([user("hi")]))[-1]
+        assert final.metadata["usage"] == usage
+
+    def test_several_completions(self):
+        model = MockBackend(responses=["a", "b", "c"])
+
+        results = model.run([user("hi")], n=2)
+        assert [m.content for m in results] == ["a", "b"]
+        assert [m.metadata["index"] for m in results] == [0, 1]
+        assert results[0].metadata["usage"] is None
+        assert results[1].metadata["usage"].completion_tokens == 2
+
+        model.set_stream(True)
+        messages = list(model.run([user("hi")], n=2))
+        assert [m.content for m in messages if m.chunk is None] == ["c", "a"]
+
+    def test_sample(self):
+        model = MockBackend(responses=["a", "b", "c"])
+
+        assert [m.content for m in model.sample([user("hi")], 3)] == [
+            "a",
+            "b",
+            "c",
+        ]
+        assert [m.content for m in model.sample([user("hi")], 1)] == ["a"]
+
+        model.set_stream(True)
+        samples = asyncio.run(model.async_sample([user("hi")], 2))
+        assert [m.content for m in samples] == ["b", "c"]
+
+    def test_latency_profile(self):
+        model = MockBackend(ttft=0.03, tokens_per_second=200, seed=1)
+        model.set_stream(True)
+
+        start = time.monotonic()
+        messages = list(model.run([user("hi")]))
+        first = messages[0]
+        assert first.chunk
+        elapsed = time.monotonic() - start
+        tokens = len(messages) - 1
+        assert elapsed >= 0.03 + (tokens - 1) / 200
+
+        model.set_stream(False)
+        start = time.monotonic()
+        model.run([user("hi")])
+        assert time.monotonic() - start >= 0.03
+
+    def test_errors(self):
+        model = MockBackend(rate_limit_rate=1.0, retry_after=2)
+        with pytest.raises(RateLimitError) as info:
+            model.run([user("hi")])
+        assert _is_rate_limited(info.value)
+        assert _get_retry_after(info.value) == 2
+
+        model = MockBackend(error_rate=1.0)
+        with pytest.raises(InternalServerError):
+            model.run([user("hi")])
+
+    def test_seeded_errors_are_reproducible(self):
+        def outcomes() -> List[bool]:
+            model = MockBackend(error_rate=0.5, seed=7)
+            results = []
+            for _ in range(20):
+                try:
+                    model.run([user("hi")])
+                    results.append(True)
+                except InternalServerError:
+                    results.append(False)
+            return results
+
+        assert outcomes() == outcomes()
+        assert len(set(outcomes())) == 2
+
+    def test_async(self):
+        model = MockBackend(responses=["one two three"], ttft=0.01)
+
+        async def main() -> Any:
+            message = await model.async_run([user("hi")])
+            model.set_stream(True)
+            stream = await model.async_run([user("hi")])
+            return message, [m async for m in stream]
+
+        message, chunks = asyncio.run(main())
+        assert message.content == "one two three"
+        assert chunks[-1].content == "one two three"
+
+    def test_copy(self):
+        model = MockBackend(responses=["a", "b"])
+        model.run([user("hi")])
+
+        assert copy.deepcopy(model).run([user("hi")]).content == "b"
+
+    def test_agent_loop(self):
+        @tool
+        def add(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        model = create_model_from_config(
+            ModelConfig(
+                model_type="mock",
+                backend="mock",
+                backend_config={
+                    "responses": [
+                        {
+                            "tool_calls": [
+                                {"name": "add", "arguments": {"a": 1, "b": 2}}
+                            ]
+                        },
+                        "The sum is 3.",
+                    ]
+                },
+            ),
+            Node(name="test", type=NodeType.AGENT),
+        )
+        config = AgentConfig(
+            name="vanilla",
+            type=AgentType.VANILLA,
+            model=ModelConfig(model_type="mock", backend="mock"),
+            prompt=BasePrompt("prompt"),
+        )
+        agent = VanillaAgent(config, model.source, model, config.prompt, [add])
+
+        assert agent.run("add 1 and 2").unwrap().content == "The sum is 3."
+        assert model.turn == 2
@@ -0,0 +1,259 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import threading
+import time
+import uuid
+from typing import Any, List, Optional
+
+import pytest
+from conftest import FakeBackend
+
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import assistant, user
+from synthora.messages.base import BaseMessage
+from synthora.models import create_model_from_config
+from synthora.models.rate_limit import (
+    RateLimitedBackend,
+    RateLimiter,
+    estimate_tokens,
+    get_deployment_key,
+)
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str) -> None:
+        super().__init__("rate limited")
+        self.response = type(
+            "Response", (), {"headers": {"retry-after": retry_after}}
+        )()
+
+
+class FlakyBackend(FakeBackend):
+    def __init__(
+        self, api_key: Optional[str] = None, failures: int = 0, **kwargs: Any
+    ) -> None:
+        message = assistant("answer")
+        message.metadata = {"usage": {"total_tokens": 10}}
+        super().__init__(responses=[message], **kwargs)
+        self.kwargs = {"api_key": api_key or uuid.uuid4().hex}
+        self.failures = failures
+
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("0.01")
+        return super().response(messages, call)
+
+
+class TestRateLimiter:
+    def test_request_bucket(self):
+        limiter = RateLimiter(rpm=60 * 50)
+        limiter.requests.level = 1
+
+        start = time.monotonic()
+        limiter.acquire()
+        limiter.release()
+        limiter.acquire()
+        limiter.release()
+        assert time.monotonic() - start >= 0.015
+
+    def test_token_bucket_refund(self):
+        limiter = RateLimiter(tpm=600)
+
+        limiter.acquire(500)
+        assert limiter.tokens.level == pytest.approx(100, abs=1)
+        limiter.release(500, used_tokens=50)
+        assert limiter.tokens.level == pytest.approx(550, abs=1)
+
+    def test_aimd(self):
+        limiter = RateLimiter(max_concurrency=8)
+
+        limiter.acquire()
+        limiter.release(rate_limited=True, retry_after=0)
+        assert limiter.concurrency == 4
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release()
+        assert 4.9 < limiter.concurrency < 5.1
+
+        limiter.acquire()
+        limiter.release(rate_limited=True, retry_after=0.05)
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start >= 0.03
+
+    def test_failures_do_not_grow_window(self):
+        limiter = RateLimiter(max_concurrency=8)
+        limiter.concurrency = 4
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(failed=True)
+        assert limiter.concurrency == 4
+        assert limiter.in_flight == 0
+
+    async def test_async_waiter_woken_by_release(self):
+        limiter = RateLimiter(max_concurrency=1)
+        limiter.acquire()
+        timer = threading.Timer(0.05, limiter.release)
+        timer.start()
+
+        await asyncio.wait_for(limiter.async_acquire(), timeout=1)
+        timer.join()
+        assert limiter.in_flight == 1
+        assert not limiter._waiters
+
+    def test_unbounded_concurrency_adapts(self):
+        limiter = RateLimiter()
+        for _ in range(4):
+            limiter.acquire()
+        limiter.release(rate_limited=True, retry_after=0)
+
+        assert limiter.concurrency == 2
+
+    def test_estimate_tokens(self):
+        messages = [user("a" * 400)]
+
+        assert estimate_tokens(messages, {}) == 104
+        assert estimate_tokens(messages, {"max_tokens": 50}) == 154
+        assert estimate_tokens(messages, {"max_tokens": 50, "n": 3}) == 254
+
+
+class TestRateLimitedBackend:
+    def test_shared_by_deployment(self):
+        backend = FlakyBackend()
+        first = RateLimitedBackend(backend, rpm=10)
+        second = RateLimitedBackend(FlakyBackend(backend.kwargs["api_key"]))
+
+        assert first.limiter is second.limiter
+        assert copy.deepcopy(first).limiter is first.limiter
+        assert RateLimitedBackend(FlakyBackend()).limiter is not first.limiter
+        assert get_deployment_key(first) == get_deployment_key(backend)
+
+    def test_concurrency_across_threads(self):
+        backend = FlakyBackend(delay=0.02)
+        model = RateLimitedBackend(backend, max_concurrency=2)
+        threads = [
+            threading.Thread(target=model.run, args=([user("hi")],))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert backend.calls == 6
+        assert backend.peak == 2
+
+    def test_concurrency_across_tasks(self):
+        backend = FlakyBackend(delay=0.02)
+        model = RateLimitedBackend(backend, max_concurrency=2)
+
+        async def main() -> List[Any]:
+            return await asyncio.gather(
+                *(model.async_run([user("hi")]) for _ in range(6))
+            )
+
+        assert len(asyncio.run(main())) == 6
+        assert backend.peak == 2
+
+    def test_retry_on_rate_limit(self):
+        backend = FlakyBackend(failures=2)
+        model = RateLimitedBackend(backend, max_concurrency=4)
+
+        assert model.run([user("hi")]).content == "answer"
+        assert backend.calls == 3
+        assert model.limiter.concurrency < 4
+
+        backend.failures = 3
+        with pytest.raises(RateLimitError):
+            model.run([user("hi")])
+
+    def test_errors_do_not_grow_window(self):
+        model = RateLimitedBackend(
+            FlakyBackend(error=TimeoutError()), max_concurrency=4
+        )
+        model.limiter.concurrency = 2
+
+        with pytest.raises(TimeoutError):
+            model.run([user("hi")])
+        assert model.limiter.concurrency == 2
+        assert model.limiter.in_flight == 0
+
+    def test_stream_holds_slot(self):
+        backend = FlakyBackend(config={"stream": True})
+        model = RateLimitedBackend(backend, tpm=6000)
+
+        response = model.run([user("hi")])
+        assert model.limiter.in_flight == 1
+        assert [m.content for m in response] == ["answer"]
+        assert model.limiter.in_flight == 0
+
+        async def main() -> List[str]:
+            response = await model.async_run([user("hi")])
+            return [m.content async for m in response]
+
+        assert asyncio.run(main()) == ["answer"]
+        assert model.limiter.in_flight == 0
+
+    async def test_cancelled_requests_released(self):
+        backend = FlakyBackend(delay=5)
+        model = RateLimitedBackend(backend, max_concurrency=2)
+        tasks = [
+            asyncio.ensure_future(model.async_run([user("hi")]))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert model.limiter.in_flight == 0
+        backend.delay = 0
+        response = await asyncio.wait_for(model.async_run([user("hi")]), 1)
+        assert response.content == "answer"
+
+    async def test_unread_stream_released(self):
+        backend = FlakyBackend(config={"stream": True})
+        model = RateLimitedBackend(backend, max_concurrency=2)
+
+        model.run([user("hi")]).close()
+        model.run([user("hi")])
+        assert model.limiter.in_flight == 0
+        await (await model.async_run([user("hi")])).aclose()
+        assert model.limiter.in_flight == 0
+
+    def test_from_config(self):
+        model = create_model_from_config(
+            ModelConfig(
+                model_type="gpt-4o",
+                backend_config={"api_key": uuid.uuid4().hex},
+                rate_limit={"rpm": 100, "max_concurrency": 3},
+                cache={"type": "memory"},
+            ),
+            Node(name="test", type=NodeType.AGENT),
+        )
+
+        assert isinstance(model.backend, RateLimitedBackend)
+        assert model.backend.limiter.max_concurrency == 3
@@ -0,0 +1,149 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import time
+from typing import Any, List
+
+import pytest
+from conftest import FakeBackend
+
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import assistant, user
+from synthora.messages.base import BaseMessage
+from synthora.models import create_model_from_config
+from synthora.models.base import BaseModelBackend
+from synthora.models.recording import RecordingBackend, ReplayBackend
+from synthora.types.enums import ModelBackendType, NodeType
+from synthora.types.node import Node
+
+
+class UpperBackend(FakeBackend):
+    def response(self, messages: List[BaseMessage], call: int) -> BaseMessage:
+        if messages[-1].content == "fail":
+            raise ValueError("boom")
+        return assistant(messages[-1].content.upper())
+
+    def chunks(self, message: BaseMessage) -> List[BaseMessage]:
+        text = message.content
+        chunks = []
+        for i in range(1, len(text) + 1):
+            chunk = assistant(text[:i])
+            chunk.chunk = text[i - 1]
+            chunks.append(chunk)
+        final = assistant(text)
+        final.metadata = {"finish_reason": "stop"}
+        return [*chunks, final]
+
+
+def record(path, stream: bool = False, delay: float = 0) -> None:
+    backend = UpperBackend(config={"stream": stream}, chunk_delay=delay)
+    model = RecordingBackend.default(backend, path)
+    for text in ["hello", "world"]:
+        response = model.run([user(text)])
+        if stream:
+            list(response)
+    with pytest.raises(ValueError):
+        model.run([user("fail")])
+
+
+def replay(path, **kwargs: Any) -> ReplayBackend:
+    return ReplayBackend(
+        "fake", Node(name="fake", type=NodeType.AGENT), path=path, **kwargs
+    )
+
+
+class TestRecordReplay:
+    def test_replay(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        record(path)
+        model = replay(path)
+
+        assert model.run([user("world")]).content == "WORLD"
+        assert model.run([user("hello")]).content == "HELLO"
+        assert model.run([user("hello")]).content == "HELLO"
+        with pytest.raises(Exception, match="boom"):
+            model.run([user("fail")])
+        with pytest.raises(LookupError):
+            model.run([user("unknown")])
+
+    def test_replay_stream(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        record(path, stream=True)
+        model = replay(path)
+
+        chunks = list(model.run([user("hello")]))
+
+        assert [c.chunk for c in chunks] == ["H", "E", "L", "L", "O", None]
+        assert chunks[-1].content == "HELLO"
+        assert chunks[-1].is_complete
+        line = json.loads(path.read_text().splitlines()[0])
+        assert line["chunks"][1]["content+"] == "E"
+        assert "content" not in line["chunks"][1]
+
+    def test_replay_pacing(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        record(path, stream=True, delay=0.02)
+
+        start = time.perf_counter()
+        list(replay(path).run([user("hello")]))
+        fast = time.perf_counter() - start
+        start = time.perf_counter()
+        list(replay(path, pace=True).run([user("hello")]))
+        paced = time.perf_counter() - start
+
+        assert paced >= 0.1
+        assert fast < paced
+
+    def test_replay_in_order(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        record(path)
+        model = replay(path, match="order")
+
+        assert model.run([user("anything")]).content == "HELLO"
+        assert model.run([user("anything")]).content == "WORLD"
+
+    def test_async_replay(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        backend = UpperBackend(config={"stream": True})
+        model = RecordingBackend.default(backend, path)
+
+        async def run(model: BaseModelBackend) -> List[BaseMessage]:
+            return [
+                chunk async for chunk in await model.async_run([user("a")])
+            ]
+
+        recorded = asyncio.run(run(model))
+        replayed = asyncio.run(run(replay(path, config={"stream": True})))
+
+        assert [c.content for c in replayed] == [c.content for c in recorded]
+
+    def test_from_config(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        record(path)
+        config = ModelConfig(
+            model_type="fake",
+            backend=ModelBackendType.REPLAY,
+            backend_config={"path": str(path)},
+        )
+        source = Node(name="agent", type=NodeType.AGENT)
+
+        model = create_model_from_config(config, source)
+
+        assert isinstance(model, ReplayBackend)
+        assert model.run([user("hello")]).content == "HELLO"
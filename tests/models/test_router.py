@@ -0,0 +1,225 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import copy
+import time
+from typing import Any, List
+
+import pytest
+from conftest import FakeBackend
+
+from synthora.configs.model_config import ModelConfig
+from synthora.messages import user
+from synthora.models import create_model_from_config
+from synthora.models.router import RouterBackend
+from synthora.types.enums import NodeType
+from synthora.types.node import Node
+
+
+class ServerError(Exception):
+    status_code = 500
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def make_router(*backends: FakeBackend, **kwargs: Any) -> RouterBackend:
+    return RouterBackend(
+        "router",
+        Node(name="test", type=NodeType.AGENT),
+        backends=list(backends),
+        **kwargs,
+    )
+
+
+class TestRouterBackend:
+    def test_round_robin(self):
+        router = make_router(FakeBackend("a"), FakeBackend("b"))
+
+        names = [router.run([user("hi")]).content for _ in range(4)]
+        assert names == ["a", "b", "a", "b"]
+
+    def test_least_outstanding(self):
+        a, b = FakeBackend("a"), FakeBackend("b")
+        router = make_router(a, b, strategy="least_outstanding")
+        router.state.deployments[0].outstanding = 2
+
+        assert [router.run([user("hi")]).content for _ in range(2)] == [
+            "b",
+            "b",
+        ]
+
+    def test_ewma(self):
+        slow, fast = FakeBackend("slow", delay=0.02), FakeBackend("fast")
+        router = make_router(slow, fast, strategy="ewma")
+
+        names = [router.run([user("hi")]).content for _ in range(4)]
+        assert sorted(names[:2]) == ["fast", "slow"]
+        assert names[2:] == ["fast", "fast"]
+        assert router.state.deployments[0].latency >= 0.02
+
+    def test_failover_and_circuit(self):
+        broken = FakeBackend("broken", error=ServerError())
+        router = make_router(
+            broken, FakeBackend("ok"), failure_threshold=2, cooldown=0.05
+        )
+
+        names = [router.run([user("hi")]).content for _ in range(6)]
+        assert names == ["ok"] * 6
+        assert broken.calls == 2
+
+        broken.error = None
+        time.sleep(0.06)
+        names = [router.run([user("hi")]).content for _ in range(4)]
+        assert "broken" in names
+        assert router.state.deployments[0].failures == 0
+
+    def test_single_trial_when_half_open(self):
+        router = make_router(FakeBackend("a"), FakeBackend("b"))
+        router.state.deployments[0].failures = 3
+
+        first, trials = router._candidates()
+        assert 0 in first and trials == {0}
+        second, _ = router._candidates()
+        assert second == [1]
+
+        router._release_trials(trials)
+        assert router.run([user("hi")]).content == "a"
+        assert router.state.deployments[0].failures == 0
+
+    def test_unused_trial_released(self):
+        broken = FakeBackend("broken", error=ServerError())
+        router = make_router(FakeBackend("ok"), broken)
+        router.state.deployments[1].failures = 3
+
+        assert router.run([user("hi")]).content == "ok"
+        assert not broken.calls
+        assert not router.state.deployments[1].trial
+
+    async def test_cancelled_request_finished(self):
+        slow = FakeBackend("slow", delay=5)
+        router = make_router(slow, FakeBackend("b"))
+        router.state.deployments[0].failures = 3
+
+        task = asyncio.ensure_future(router.async_run([user("hi")]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        deployment = router.state.deployments[0]
+        assert (deployment.outstanding, deployment.trial) == (0, False)
+        assert deployment.failures == 3
+
+    def test_unread_stream_finished(self):
+        router = make_router(FakeBackend("a"))
+        router.set_stream(True)
+
+        router.run([user("hi")]).close()
+        assert router.state.deployments[0].outstanding == 0
+
+    def test_backends_under_router(self):
+        a = FakeBackend("a")
+        router = make_router(a)
+        agent = Node(name="agent", type=NodeType.AGENT)
+
+        router.set_ancestor(agent)
+        assert router.source.ancestor is agent
+        assert a.source.ancestor is router.source
+
+    def test_all_failing(self):
+        router = make_router(
+            FakeBackend("a", error=ServerError()),
+            FakeBackend("b", error=ServerError()),
+        )
+
+        with pytest.raises(ServerError):
+            router.run([user("hi")])
+
+    def test_client_error_not_retried(self):
+        a = FakeBackend("a", error=BadRequestError())
+        b = FakeBackend("b")
+        router = make_router(a, b)
+
+        with pytest.raises(BadRequestError):
+            router.run([user("hi")])
+        assert not b.calls
+        assert router.state.deployments[0].failures == 0
+
+    def test_config_and_stream(self):
+        a = FakeBackend("a")
+        router = make_router(a)
+        router.config["tools"] = [{"type": "function"}]
+        router.set_stream(True)
+
+        assert [m.content for m in router.run([user("hi")])] == ["a"]
+        assert a.requests[-1]["tools"] == [{"type": "function"}]
+        assert a.requests[-1]["stream"] is True
+        assert not a.stream
+        assert router.state.deployments[0].outstanding == 0
+
+    def test_async_failover_stream(self):
+        router = make_router(
+            FakeBackend("broken", error=ServerError()), FakeBackend("ok")
+        )
+        router.set_stream(True)
+
+        async def main() -> List[str]:
+            response = await router.async_run([user("hi")])
+            return [m.content async for m in response]
+
+        assert asyncio.run(main()) == ["ok"]
+        assert router.state.deployments[1].outstanding == 0
+
+    def test_copies_share_state(self):
+        router = make_router(FakeBackend("a"), FakeBackend("b"))
+
+        assert copy.deepcopy(router).state is router.state
+
+    def test_from_config(self):
+        router = create_model_from_config(
+            ModelConfig.from_dict(
+                {
+                    "model_type": "gpt-4o",
+                    "backend": "router",
+                    "backend_config": {
+                        "strategy": "least_outstanding",
+                        "backends": [
+                            {
+                                "model_type": "gpt-4o",
+                                "backend_config": {"api_key": "a"},
+                            },
+                            {
+                                "model_type": "gpt-4o-mini",
+                                "backend_config": {"api_key": "b"},
+                            },
+                        ],
+                    },
+                }
+            ),
+            Node(name="test", type=NodeType.AGENT),
+        )
+
+        assert isinstance(router, RouterBackend)
+        assert [b.model_type for b in router.backends] == [
+            "gpt-4o",
+            "gpt-4o-mini",
+        ]
+
+        with pytest.raises(ValueError):
+            RouterBackend.default([FakeBackend("a")], strategy="random")
@@ -0,0 +1,106 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import pickle
+
+import pytest
+from pydantic import ValidationError
+
+from synthora.messages import user
+from synthora.messages.base import BaseMessage
+from synthora.types.enums import CallBackEvent, NodeType
+from synthora.types.event import TraceEvent
+from synthora.types.node import Node
+
+
+class TestNode:
+    def test_interned(self):
+        agent = Node(name="agent", type=NodeType.AGENT)
+        model = Node(name="gpt", type=NodeType.MODEL, ancestor=agent)
+
+        assert Node(name="agent", type=NodeType.AGENT) is agent
+        assert Node(name="agent", type="agent") is agent
+        assert (
+            Node(
+                name="gpt",
+                type=NodeType.MODEL,
+                ancestor=Node(name="agent", type=NodeType.AGENT),
+            )
+            is model
+        )
+        assert Node(**model.model_dump()) is model
+        assert Node.model_validate_json(model.model_dump_json()) is model
+        assert Node(name="agent", type=NodeType.TOOL) != agent
+
+    def test_hashable_and_immutable(self):
+        agent = Node(name="agent", type=NodeType.AGENT)
+        model = Node(name="gpt", type=NodeType.MODEL, ancestor=agent)
+
+        assert {agent: 1, model: 2}[
+            Node(name="gpt", type=NodeType.MODEL, ancestor=agent)
+        ] == 2
+        assert model.path == "agent/gpt"
+        with pytest.raises(ValidationError):
+            model.name = "other"
+        assert copy.copy(model) is model
+        assert copy.deepcopy(model) is model
+        assert pickle.loads(pickle.dumps(model)) is model
+
+    def test_with_ancestor(self):
+        root = Node(name="root", type=NodeType.AGENT)
+        tool = Node(name="add", type=NodeType.TOOL)
+
+        moved = tool.with_ancestor(root)
+        assert moved.ancestor is root
+        assert tool.ancestor is None
+        assert moved.with_ancestor(root) is moved
+        assert tool.model_copy(update={"ancestor": root}) is moved
+
+    def test_messages_share_nodes(self):
+        message = user("hi")
+        restored = BaseMessage.model_validate_json(message.model_dump_json())
+
+        assert restored.source is message.source
+
+
+class TestTraceEvent:
+    def test_serialization(self):
+        agent = Node(name="agent", type=NodeType.AGENT)
+        model = Node(name="gpt", type=NodeType.MODEL, ancestor=agent)
+        event = TraceEvent.create(
+            CallBackEvent.LLM_START, "data", [agent, model], model, {}
+        )
+
+        data = event.to_dict()
+        assert data["current"] == {
+            "name": "gpt",
+            "type": NodeType.MODEL,
+            "ancestor": {
+                "name": "agent",
+                "type": NodeType.AGENT,
+                "ancestor": None,
+            },
+        }
+        assert data["stack"][0] == {
+            "name": "agent",
+            "type": NodeType.AGENT,
+            "ancestor": None,
+        }
+        restored = TraceEvent.model_validate_json(event.model_dump_json())
+        assert restored.current is model
+        assert restored.stack == [agent, model]
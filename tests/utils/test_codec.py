@@ -0,0 +1,131 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+
+from synthora.memories import FullContextMemory
+from synthora.messages import system, user
+from synthora.messages.base import BaseMessage
+from synthora.types import ChatCompletionMessageToolCall
+from synthora.types.enums import CallBackEvent, Err, NodeType, Ok
+from synthora.types.event import TraceEvent
+from synthora.types.node import Node
+from synthora.utils.codec import (
+    CODECS,
+    JsonCodec,
+    decode,
+    encode,
+    from_bytes,
+    get_codec,
+    to_bytes,
+)
+
+
+def _codecs():
+    names = []
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.fixture(params=_codecs())
+def codec(request):
+    return request.param
+
+
+class TestCodec:
+    def test_default(self):
+        assert get_codec().name in _codecs()
+        assert isinstance(get_codec("json"), JsonCodec)
+        with pytest.raises(KeyError):
+            get_codec("xml")
+
+    def test_roundtrip(self, codec):
+        node = Node(name="tool", type=NodeType.TOOL)
+        value = {
+            "ok": Ok(1),
+            "err": Err(ValueError("bad"), "value"),
+            "node": node,
+            "bytes": b"\x00\x01",
+            "list": (1, "a", None, 2.5),
+        }
+        result = from_bytes(to_bytes(value, codec))
+
+        assert result["ok"] == Ok(1)
+        assert isinstance(result["err"].error, ValueError)
+        assert str(result["err"].error) == "bad"
+        assert result["node"] is node
+        assert result["bytes"] == b"\x00\x01"
+        assert result["list"] == [1, "a", None, 2.5]
+
+    def test_unknown_values(self):
+        class Custom(Exception):
+            pass
+
+        error = decode(encode(Custom("boom")))
+        assert type(error) is Exception
+        assert "Custom: boom" in str(error)
+        assert decode(encode(object())).startswith("<object")
+
+
+class TestMessageCodec:
+    def test_roundtrip(self, codec):
+        call = ChatCompletionMessageToolCall(
+            id="call",
+            type="function",
+            function={"name": "add", "arguments": "{}"},
+        )
+        message = BaseMessage.create_message(
+            role="assistant", tool_calls=[call], metadata={"result": Ok(2)}
+        )
+        restored = BaseMessage.from_bytes(message.to_bytes(codec))
+
+        assert restored.tool_calls[0].function.name == "add"
+        assert restored.source is message.source
+        assert restored.metadata == {"result": Ok(2)}
+        assert restored.to_openai_message() == message.to_openai_message()
+
+    def test_not_a_message(self):
+        with pytest.raises(TypeError):
+            BaseMessage.from_bytes(to_bytes([1, 2]))
+
+    def test_memory(self, codec):
+        memory = FullContextMemory([system("be brief"), user("hello")])
+        restored = FullContextMemory.from_bytes(memory.to_bytes(codec))
+
+        assert isinstance(restored, FullContextMemory)
+        assert restored.to_openai_messages() == memory.to_openai_messages()
+
+    def test_event(self, codec):
+        node = Node(name="agent", type=NodeType.AGENT)
+        event = TraceEvent.create(
+            CallBackEvent.AGENT_END,
+            Ok(user("done")),
+            [node],
+            node,
+            {"step": 1},
+        )
+        restored = TraceEvent.from_bytes(event.to_bytes(codec))
+
+        assert restored.id == event.id
+        assert restored.current is node
+        assert restored.data.unwrap().content == "done"
+        assert restored.metadata == {"step": 1}
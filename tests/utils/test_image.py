@@ -0,0 +1,144 @@
+# LICENSE HEADER MANAGED BY add-license-header
+#
+# Copyright 2024-2025 Syntropix
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import base64
+import io
+import os
+
+import pytest
+
+from synthora.messages.base import BaseMessage
+from synthora.types.enums import MessageRole
+from synthora.utils.image import (
+    IMAGE_CACHE,
+    ImageCache,
+    image2base64,
+    image_reference,
+    iter_base64,
+    parse_image,
+)
+
+
+PNG = bytes(range(256)) * 7 + b"\x01"
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "screen.png"
+    path.write_bytes(PNG)
+    return str(path)
+
+
+def _data_uri(data: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(data).decode()
+
+
+class TestEncoding:
+    def test_streaming_encoder(self, image):
+        for chunk_size in (1, 3, 4, 1000, 1 << 20):
+            encoded = "".join(iter_base64(image, chunk_size))
+            assert encoded == base64.b64encode(PNG).decode()
+        assert "".join(iter_base64(io.BytesIO(b"ab"))) == "YWI="
+
+    def test_image2base64(self, image):
+        assert image2base64(image) == _data_uri(PNG)
+        with pytest.raises(FileNotFoundError):
+            image2base64(image + ".missing")
+
+    def test_references(self, image):
+        assert image_reference("https://a.com/x.png") == "https://a.com/x.png"
+        assert image_reference("data:image/png;base64,AA") == (
+            "data:image/png;base64,AA"
+        )
+        assert image_reference(os.path.relpath(image)) == image
+        with pytest.raises(FileNotFoundError):
+            image_reference(image + ".missing")
+
+    def test_recompress_needs_pillow(self, image):
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError):
+                image2base64(image, max_side=16)
+        else:
+            pytest.skip("Pillow is installed")
+
+
+class TestImageCache:
+    def test_hit_and_invalidation(self, image):
+        cache = ImageCache()
+        first = cache.encode(image)
+
+        assert first == _data_uri(PNG)
+        assert cache.encode(image) is first
+
+        with open(image, "ab") as f:
+            f.write(b"\x02")
+        second = cache.encode(image)
+        assert second == _data_uri(PNG + b"\x02")
+        assert second is not first
+
+    def test_eviction(self, tmp_path):
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i}.png"
+            path.write_bytes(bytes([i]) * 30)
+            paths.append(str(path))
+
+        cache = ImageCache(max_size=2)
+        for path in paths:
+            cache.encode(path)
+        assert len(cache) == 2
+
+        size = len(_data_uri(bytes(30)))
+        cache = ImageCache(max_bytes=size * 2)
+        for path in paths:
+            cache.encode(path)
+        assert len(cache) == 2
+        assert cache.size_bytes == size * 2
+
+        cache = ImageCache(max_bytes=size - 1)
+        assert cache.encode(paths[0]) == _data_uri(bytes(30))
+        assert len(cache) == 0
+
+
+class TestLazyImages:
+    def test_encoded_when_sent(self, image):
+        IMAGE_CACHE.clear()
+        message = BaseMessage.create_message(
+            MessageRole.USER, content="look", images=[image]
+        )
+        assert message.images == [image]
+        assert len(IMAGE_CACHE) == 0
+
+        payload = message.to_openai_message()
+        url = payload["content"][1]["image_url"]["url"]
+        assert url == _data_uri(PNG)
+
+        other = BaseMessage.create_message(
+            MessageRole.USER, content="again", images=[image]
+        )
+        assert other.to_openai_message()["content"][1]["image_url"][
+            "url"
+        ] is parse_image(image)
+        assert len(IMAGE_CACHE) == 1
+
+    def test_missing_image(self, image):
+        with pytest.raises(FileNotFoundError):
+            BaseMessage.create_message(
+                MessageRole.USER, content="look", images=[image + ".x"]
+            )